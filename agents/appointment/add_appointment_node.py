@@ -2,8 +2,8 @@ from pydantic import BaseModel, Field
 from typing import Optional
 from agents.models.state import ConversationState
 from agents.llms import get_llm_mini_model
-from logging_config import logger, llm_logger
-from agents.appointment.tools.appointment_tools import check_appointment, commit_appointment
+from logging_config import logger, llm_logger, payload
+from agents.appointment.tools.appointment_tools import check_appointment, commit_appointment, find_next_available_appointments
 from agents.appointment.complete_or_escalate import CompleteOrEscalate
 from agents.appointment.prompts.appointment_prompts import add_appointment_prompt
 from agents.appointment.util.helpers import appointment_template_params
@@ -11,7 +11,10 @@ from agents.appointment.tools.confirmation_tools import confirm_appointment_tool
 
 llm = get_llm_mini_model(temperature=0.0)
 
-add_appointment_node_tools = [check_appointment, commit_appointment, confirm_appointment_tool]
+add_appointment_node_tools = [check_appointment, commit_appointment, confirm_appointment_tool, find_next_available_appointments]
+
+# built once: bind_tools converts every tool to its JSON schema
+add_appointment_chain = add_appointment_prompt | llm.bind_tools(add_appointment_node_tools + [CompleteOrEscalate])
 
 class ToAddAppointment(BaseModel):
     """
@@ -33,10 +36,9 @@ async def add_appointment_node(state: ConversationState) -> dict:
     - Adds an appointment for the user
     """
 
-    chain = add_appointment_prompt | llm.bind_tools(add_appointment_node_tools + [CompleteOrEscalate])
     prompts_template = appointment_template_params(state)
-    response = await chain.ainvoke(prompts_template)
+    response = await add_appointment_chain.ainvoke(prompts_template)
 
-    llm_logger.info(f"add_appointment_node: response: {response}")
+    llm_logger.info("add_appointment_node: response: {}", lambda: payload(response))
 
     return {"messages": [response]}
\ No newline at end of file
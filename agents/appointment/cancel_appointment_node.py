@@ -26,6 +26,9 @@ llm = get_llm_mini_model(temperature=0.0)
 
 cancel_appointment_node_tools = [find_appointment_tool, confirm_appointment_tool, commit_cancel_appointment]
 
+# built once: bind_tools converts every tool to its JSON schema
+cancel_appointment_chain = cancel_appointment_prompt | llm.bind_tools(cancel_appointment_node_tools + [CompleteOrEscalate])
+
 async def cancel_appointment_node(state: ConversationState) -> dict:
     """
     Node: cancel appointment node
@@ -33,9 +36,7 @@ async def cancel_appointment_node(state: ConversationState) -> dict:
     - If the user needs help, and none of your tools are appropriate for it then
     "CompleteOrEscalate" the request to the host assistant. Do not waste users time. Do not make up invalid tools or functions.
     """
-    chain = cancel_appointment_prompt | llm.bind_tools(cancel_appointment_node_tools + [CompleteOrEscalate])
-
     prompts_template = appointment_template_params(state)
-    response = await chain.ainvoke(prompts_template)
+    response = await cancel_appointment_chain.ainvoke(prompts_template)
 
     return {"messages": [response]}
\ No newline at end of file
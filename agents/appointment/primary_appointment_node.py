@@ -13,20 +13,21 @@ primary_appointment_node_tools = [
     list_appointments,
 ]
 
+# built once: bind_tools converts every tool and handoff model to its JSON schema
+primary_appointment_chain = primary_appointment_prompt | llm.bind_tools(primary_appointment_node_tools + [
+    ToCancelAppointment,
+    ToAddAppointment,
+    ToRescheduleAppointment,
+])
+
 async def primary_appointment_node(state: ConversationState) -> dict:
     """
     Node: main appointment node
     - Reads the user info from the state
     - Hands off to a specialized assistant for the user's request (add, cancel, reschedule appointments)
     """
-    chain = primary_appointment_prompt | llm.bind_tools(primary_appointment_node_tools + [
-        ToCancelAppointment,
-        ToAddAppointment,
-        ToRescheduleAppointment,
-    ])
-
     prompts_template = appointment_template_params(state)
     
-    response = await chain.ainvoke(prompts_template)
+    response = await primary_appointment_chain.ainvoke(prompts_template)
 
     return {"messages": [response]}
\ No newline at end of file
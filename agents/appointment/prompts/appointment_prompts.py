@@ -48,6 +48,10 @@ add_appointment_prompt = ChatPromptTemplate.from_messages([
     Do not ask follow-up questions to fill optional fields like 'reason' or 'location'. 
     Call the tool immediately with the data you have.
 
+    When the user asks for the earliest or next available time, or check_appointment reports that
+    the requested day has no free times, call find_next_available_appointments once instead of
+    guessing other dates. Offer the returned slots to the user.
+
     <protocol>
     When the user wants to add an appointment:
 
@@ -237,6 +241,10 @@ reschedule_appointment_prompt = ChatPromptTemplate.from_messages([
     result from prepare_reschedule_appointment as the source of new_date/new_time.
     </protocol>
 
+    When the user asks for the earliest or next available time, or prepare_reschedule_appointment reports
+    that the requested day has no free times, call find_next_available_appointments with the provider of
+    the current appointment instead of guessing other dates. Offer the returned slots to the user.
+
     Some examples for which you should CompleteOrEscalate:
     - "what's the weather like this time of year?"
     - "i want to see my upcoming appointments"
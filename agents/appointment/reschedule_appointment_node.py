@@ -5,7 +5,7 @@ from agents.appointment.complete_or_escalate import CompleteOrEscalate
 from typing import Optional
 from agents.models.state import ConversationState
 from agents.appointment.util.helpers import appointment_template_params
-from agents.appointment.tools.appointment_tools import commit_reschedule_appointment, find_appointment_tool, prepare_reschedule_appointment
+from agents.appointment.tools.appointment_tools import commit_reschedule_appointment, find_appointment_tool, prepare_reschedule_appointment, find_next_available_appointments
 from agents.appointment.tools.confirmation_tools import confirm_appointment_tool
 
 
@@ -25,7 +25,10 @@ class ToRescheduleAppointment(BaseModel):
 
 llm = get_llm_mini_model(temperature=0.0)
 
-reschedule_appointment_node_tools = [find_appointment_tool, prepare_reschedule_appointment, confirm_appointment_tool, commit_reschedule_appointment]
+reschedule_appointment_node_tools = [find_appointment_tool, prepare_reschedule_appointment, confirm_appointment_tool, commit_reschedule_appointment, find_next_available_appointments]
+
+# built once: bind_tools converts every tool to its JSON schema
+reschedule_appointment_chain = reschedule_appointment_prompt | llm.bind_tools(reschedule_appointment_node_tools + [CompleteOrEscalate])
 
 async def reschedule_appointment_node(state: ConversationState) -> dict:
     """
@@ -34,9 +37,7 @@ async def reschedule_appointment_node(state: ConversationState) -> dict:
     - If the user needs help, and none of your tools are appropriate for it then
     "CompleteOrEscalate" the request to the host assistant. Do not waste users time. Do not make up invalid tools or functions.
     """
-    chain = reschedule_appointment_prompt | llm.bind_tools(reschedule_appointment_node_tools + [CompleteOrEscalate])
-
     prompts_template = appointment_template_params(state)
-    response = await chain.ainvoke(prompts_template)
+    response = await reschedule_appointment_chain.ainvoke(prompts_template)
 
     return {"messages": [response]}
\ No newline at end of file
@@ -1,22 +1,26 @@
 from langchain_core.tools import tool
-from typing import Annotated
+from typing import Annotated, Optional
 from agents.models.user import User
 from langgraph.prebuilt import InjectedState
 from services.appointment_service import Appointment, AppointmentConflictError, AppointmentNotFoundError
-import re
-from datetime import datetime
+from datetime import date, datetime
 from logging_config import logger
 from services.appointment_service import appointment_service
 from pydantic import BaseModel, Field
-from langgraph.store.memory import InMemoryStore
+from langchain_core.runnables import RunnableConfig
+from agents.tool_cache import tool_cache
 
-doctor_preference_store = InMemoryStore()
-namespace = ("doctor_preferences", "user_id")
-
-def normalize(s: str) -> str:
-    s = s.lower() # lowercase
-    s = re.sub(r"[^\w\s]", "", s) # remove all non-alphanumeric characters
-    return re.sub(r"\s+", " ", s).strip() # replace multiple spaces with a single space
+class FindNextAvailableAppointmentsInput(BaseModel):
+    provider: Optional[str] = Field(
+        default=None,
+        description="The doctor's name. Leave empty to search all doctors accepting new patients.",
+    )
+    from_date: Optional[str] = Field(
+        default=None,
+        description="First day to search from, normalized to YYYY-MM-DD. Defaults to today.",
+    )
+    days: int = Field(default=14, description="How many days ahead to search")
+    limit: int = Field(default=5, description="How many free slots to return")
 
 class PrepareRescheduleAppointmentInput(BaseModel):
     appointment_id: str = Field(description="The id of the appointment to reschedule")
@@ -41,7 +45,7 @@ class PrepareRescheduleAppointmentInput(BaseModel):
     )
 
 @tool
-def list_appointments(user: Annotated[User, InjectedState("user")]) -> list[dict]:
+def list_appointments(user: Annotated[User, InjectedState("user")], config: RunnableConfig) -> list[dict]:
     """
     List the user's appointments.s
     Returns: 
@@ -50,7 +54,8 @@ def list_appointments(user: Annotated[User, InjectedState("user")]) -> list[dict
     if not user or not user.id:
         return [{"error": "User not found"}]
 
-    appointments = appointment_service.get_appointments(user.id)
+    # prefetched while the identity was verified, unless the schedule changed since
+    appointments = tool_cache.call(config, "get_appointments", user.id)
     if len(appointments) > 0:
         # sort by date and time ascending
         appointments.sort(
@@ -60,7 +65,7 @@ def list_appointments(user: Annotated[User, InjectedState("user")]) -> list[dict
     return [appointment.model_dump() for appointment in appointments]
 
 @tool
-def check_appointment(user: Annotated[User, InjectedState("user")],appointment: Appointment) -> dict:
+def check_appointment(user: Annotated[User, InjectedState("user")],appointment: Appointment, config: RunnableConfig) -> dict:
     """
     Validate and normalize an appointment request for the user, but DO NOT save it.
     Returns:
@@ -77,13 +82,14 @@ def check_appointment(user: Annotated[User, InjectedState("user")],appointment:
         missing.append("date")
     if not appointment.provider:
         # check if this is a preference or the usual doctor
-        preference = doctor_preference_store.get(namespace, user.id)
+        # long-term memory: kept with the appointments, so every worker sees it
+        preference = appointment_service.get_doctor_preference(user.id)
         if preference:
-            appointment.provider = preference.value.get("doctor_name", "")
+            appointment.provider = preference["doctor_name"]
         else:
             # collect doctor names
-            all_user_doctors = appointment_service.list_all_doctors_for_user(user.id)
-            all_open_doctors = appointment_service.list_open_doctors()
+            all_user_doctors = tool_cache.call(config, "list_all_doctors_for_user", user.id)
+            all_open_doctors = tool_cache.call(config, "list_open_doctors")
             return {
                 "ok": False,
                 "error": f"Please provide the doctor's name. These are the doctors you've seen before: {', '.join(all_user_doctors)}. If you'd like to see a different doctor, please choose one from the following list: {', '.join(all_open_doctors)}"
@@ -96,23 +102,13 @@ def check_appointment(user: Annotated[User, InjectedState("user")],appointment:
         }
 
     # 2) Validate / normalize doctor
-    all_user_doctors = appointment_service.list_all_doctors_for_user(user.id)
-    all_open_doctors = appointment_service.list_open_doctors()
+    all_user_doctors = tool_cache.call(config, "list_all_doctors_for_user", user.id)
+    all_open_doctors = tool_cache.call(config, "list_open_doctors")
     all_doctors = all_user_doctors + all_open_doctors
     if not all_doctors:
         return {"ok": False, "error": "No doctors found for the user"}
 
-    query = normalize(appointment.provider)
-    matches = []
-    for d in all_doctors:
-        nd = normalize(d)
-        if nd == query:
-            matches.append(d)
-            break
-        if query in nd.split():
-            matches.append(d)
-        if query in nd:
-            matches.append(d)
+    matches = appointment_service.match_doctors(appointment.provider, all_doctors)
 
     if len(matches) == 0:
         return {
@@ -147,10 +143,7 @@ def check_appointment(user: Annotated[User, InjectedState("user")],appointment:
     # if the doctor is one that user hasn't seen before add it as new preference 
     # next time, the preferred doctor will be seen instead of the usual one
     if is_new_preference:
-        doctor_preference_store.put(namespace, user.id, {
-            "doctor_name": appointment.provider,
-            "reason": "",
-        })
+        appointment_service.set_doctor_preference(user.id, appointment.provider)
     # 3) Parse date
     try:
         appointment.date = datetime.strptime(
@@ -162,10 +155,9 @@ def check_appointment(user: Annotated[User, InjectedState("user")],appointment:
             "error": "Invalid date format. Please use the format YYYY-MM-DD."
         }
 
-    # 4) Check for conflict without writing
+    # 4) Check for conflict without writing, the slot is held for the user until commit_appointment
     try:
-        # Optional: if you have a dry-run or "can_add" check, call it here instead
-        appointment_service.check_conflict(appointment)  # pseudo-method
+        appointment_service.reserve_slot(appointment, holder=user.id)
     except AppointmentConflictError:
         available_times = appointment_service.get_doctor_available_times_for_day(
             appointment.provider, appointment.date
@@ -204,6 +196,57 @@ def check_appointment(user: Annotated[User, InjectedState("user")],appointment:
         ),
     }
 
+@tool
+def find_next_available_appointments(user: Annotated[User, InjectedState("user")], data: FindNextAvailableAppointmentsInput, config: RunnableConfig) -> dict:
+    """
+    Find the earliest free appointment slots for a doctor (or any doctor accepting new patients)
+    across several days, instead of checking one day at a time.
+    Returns:
+    - {"ok": True, "slots": [{"provider": ..., "date": ..., "time": ...}], "message": "..."}
+    - {"ok": False, "error": "..."} on validation errors or when nothing is free
+    """
+    if not user or not user.id:
+        return {"ok": False, "error": "User not found"}
+
+    provider = None
+    if data.provider:
+        all_doctors = tool_cache.call(config, "list_all_doctors_for_user", user.id) + tool_cache.call(config, "list_open_doctors")
+        matches = appointment_service.match_doctors(data.provider, all_doctors)
+        if len(matches) != 1:
+            return {
+                "ok": False,
+                "error": (
+                    f"Doctor {data.provider} not found or ambiguous. "
+                    f"Please choose a doctor from the following list: {', '.join(matches or all_doctors)}"
+                ),
+            }
+        provider = matches[0]
+
+    try:
+        from_date = datetime.strptime(data.from_date, "%Y-%m-%d").date() if data.from_date else date.today()
+    except ValueError:
+        return {"ok": False, "error": "Invalid date format. Please use the format YYYY-MM-DD."}
+    # never search the past, nor more than a quarter ahead
+    from_date = max(from_date, date.today())
+    days = min(max(data.days, 1), 90)
+
+    slots = appointment_service.find_next_available_slots(
+        from_date.strftime("%Y-%m-%d"),
+        days=days,
+        limit=min(max(data.limit, 1), 20),
+        provider=provider,
+    )
+    if not slots:
+        return {"ok": False, "error": f"No free appointment slots found in the next {days} days. Please try a later date."}
+
+    return {
+        "ok": True,
+        "slots": slots,
+        "message": "The earliest available times are: " + ", ".join(
+            f"{s['date']} at {s['time']} with {s['provider']}" for s in slots
+        ) + ". Please choose one.",
+    }
+
 @tool
 def commit_appointment(user: Annotated[User, InjectedState("user")], appointment: Appointment) -> Appointment:
     """
@@ -226,7 +269,7 @@ def commit_appointment(user: Annotated[User, InjectedState("user")], appointment
             if location is not None:
                 appointment.location = location
         
-        added = appointment_service.add_appointment(appointment)
+        added = appointment_service.add_appointment(appointment, holder=user.id)
     except AppointmentConflictError as e:
         # In practice, this should be rare if check_appointment runs first,
         # but we still handle it defensively.
@@ -252,7 +295,7 @@ def commit_appointment(user: Annotated[User, InjectedState("user")], appointment
     return added.model_dump()
 
 @tool
-def find_appointment_tool(user: Annotated[User, InjectedState("user")], appointment: Appointment) -> dict:
+def find_appointment_tool(user: Annotated[User, InjectedState("user")], appointment: Appointment, config: RunnableConfig) -> dict:
     """
     Find an appointment for the user.
     Args:
@@ -269,7 +312,7 @@ def find_appointment_tool(user: Annotated[User, InjectedState("user")], appointm
     
     appointment.user_id = user.id
     
-    found_appointments = appointment_service.find_appointments_for_user(appointment)
+    found_appointments = tool_cache.call(config, "find_appointments_for_user", appointment)
     if len(found_appointments) == 0:
         return {"ok": False, "error": "Appointment not found on that date. Try again with a different date or ask me to list your appointments."}
     if len(found_appointments) > 1:
@@ -334,11 +377,7 @@ def prepare_reschedule_appointment(user: Annotated[User, InjectedState("user")],
     if not data.new_time:
         return {"ok": False, "error": "Missing information. New time is required."}
     
-    current_appointment = next(
-        (a for a in appointment_service.appointments
-         if a.id == data.appointment_id),
-        None,
-    )
+    current_appointment = appointment_service.get_appointment(data.appointment_id)
     if not current_appointment:
         return {
             "ok": False,
@@ -358,7 +397,8 @@ def prepare_reschedule_appointment(user: Annotated[User, InjectedState("user")],
         "time": normalized_time,
     })
     try:
-        appointment_service.check_conflict(updated)
+        # hold the new slot for the user until commit_reschedule_appointment
+        appointment_service.reserve_slot(updated, holder=user.id)
     except AppointmentConflictError as e:
         available_times = appointment_service.get_doctor_available_times_for_day(
             updated.provider, updated.date
@@ -368,6 +408,15 @@ def prepare_reschedule_appointment(user: Annotated[User, InjectedState("user")],
                 "ok": False,
                 "error": "No available times found for the doctor on the given date. Please choose a different date.",
             }
+        return {
+            "ok": False,
+            "error": "New appointment falls in existing doctor's term.",
+            "available_times": available_times,
+            "message": (
+                "The doctor is available at the following times: "
+                f"{', '.join(available_times)}. Please choose one."
+            ),
+        }
     
     # Everything looks good
     return {
@@ -408,7 +457,7 @@ def commit_reschedule_appointment(user: Annotated[User, InjectedState("user")],
     new_date = datetime.strptime(new_date, "%Y-%m-%d").strftime("%Y-%m-%d")
     new_time = datetime.strptime(new_time, "%H:%M").strftime("%H:%M")
     try:
-        rescheduled = appointment_service.reschedule_appointment(current_appointment.id, new_date, new_time)
+        rescheduled = appointment_service.reschedule_appointment(current_appointment.id, new_date, new_time, holder=user.id)
         return {"ok": True, "appointment": rescheduled.model_dump(), "message": (
             f"I rescheduled the following appointment: {current_appointment.date} at {current_appointment.time} with {current_appointment.provider} at {current_appointment.location}. "
             "Would you like me to confirm this? (yes/no)"
@@ -4,6 +4,8 @@ from agents.models.state import ConversationState
 from langchain_core.runnables import RunnableLambda
 from langgraph.prebuilt import ToolNode
 from agents.llms import get_llm_mini_model
+from agents.hooks.metrics import metrics_callback
+from agents.appointment.util.history import compact_history
 
 llm_model = get_llm_mini_model()
 
@@ -26,11 +28,6 @@ def create_entry_node(assistant_name: str, new_appointment_state: str) -> Callab
 
     return appointment_entry_node
 
-def create_tool_node_with_fallback(tools: list) -> dict:
-    return ToolNode(tools).with_fallbacks(
-        [RunnableLambda(handle_tool_error)], exception_key="error"
-    )
-
 def handle_tool_error(state) -> dict:
     error = state.get("error")
     tool_calls = state["messages"][-1].tool_calls
@@ -45,9 +42,10 @@ def handle_tool_error(state) -> dict:
     }
 
 def create_tool_node_with_fallback(tools: list) -> dict:
+    # tool run times for /metrics, only the tool node's runs get the callback
     return ToolNode(tools).with_fallbacks(
         [RunnableLambda(handle_tool_error)], exception_key="error"
-    )
+    ).with_config(callbacks=[metrics_callback])
 
 def pop_appointment_stack_state(state: ConversationState) -> dict:
     """Pop the appointment stack and return to the main assistant.
@@ -91,7 +89,10 @@ def appointment_template_params(state: ConversationState):
                 messages = [HumanMessage(content="Hi")]
             else:
                 messages = [SystemMessage(content="Respond either with a tool call or a message to the user or both if needed.")]
-    
+    else:
+        # old tool exchanges collapsed, whole turns dropped past the token budget
+        messages = compact_history(messages)
+
     name = getattr(user, "name", None) if user is not None else None
 
     return {
@@ -0,0 +1,77 @@
+import json
+import os
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+# the last HISTORY_KEEP_TURNS turns (a turn starts at a user message) go to the LLM verbatim
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "4"))
+# approximate token budget of the history, older turns are dropped first (0 disables the budget)
+HISTORY_MAX_TOKENS = int(os.getenv("HISTORY_MAX_TOKENS", "3000"))
+# length of a tool result kept in the summary of a collapsed tool exchange
+TOOL_RESULT_CHARS = 200
+
+def split_turns(messages: list[BaseMessage]) -> list[list[BaseMessage]]:
+    turns: list[list[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+def summarize_tool_exchange(ai: AIMessage, results: list[ToolMessage]) -> AIMessage:
+    """
+    One AIMessage without tool calls in place of a tool call and its results:
+    what was called with which arguments, and the start of each result.
+    """
+    by_id = {r.tool_call_id: r for r in results}
+    lines = [str(ai.content)] if ai.content else []
+    for call in ai.tool_calls:
+        result = str(by_id[call["id"]].content)
+        if len(result) > TOOL_RESULT_CHARS:
+            result = result[:TOOL_RESULT_CHARS] + "..."
+        lines.append(f"[called {call['name']}({json.dumps(call['args'], ensure_ascii=False, default=str)}) -> {result}]")
+    return AIMessage(content="\n".join(lines), id=ai.id)
+
+def collapse_tool_exchanges(messages: list[BaseMessage]) -> list[BaseMessage]:
+    """
+    Replaces every completed tool exchange (an AIMessage with tool calls, followed by a result
+    for each of them) with its summary. Unfinished exchanges are kept as they are.
+    """
+    compacted: list[BaseMessage] = []
+    i = 0
+    while i < len(messages):
+        message = messages[i]
+        if isinstance(message, AIMessage) and message.tool_calls:
+            results = []
+            j = i + 1
+            while j < len(messages) and isinstance(messages[j], ToolMessage):
+                results.append(messages[j])
+                j += 1
+            if {c["id"] for c in message.tool_calls} <= {r.tool_call_id for r in results}:
+                compacted.append(summarize_tool_exchange(message, results))
+                i = j
+                continue
+        compacted.append(message)
+        i += 1
+    return compacted
+
+def compact_history(messages: list[BaseMessage], keep_turns: int = HISTORY_KEEP_TURNS, max_tokens: int = HISTORY_MAX_TOKENS) -> list[BaseMessage]:
+    """
+    History for an appointment sub-assistant prompt: the last `keep_turns` turns verbatim,
+    the older ones with their tool exchanges collapsed, all within `max_tokens` (approximate)
+    by dropping whole turns from the oldest. The current turn is always kept.
+    """
+    # newest turn first, stop at the budget: the turns that are dropped anyway are never collapsed or counted
+    kept: list[list[BaseMessage]] = []
+    total = 0
+    for age, turn in enumerate(reversed(split_turns(messages))):
+        if age >= keep_turns:
+            turn = collapse_tool_exchanges(turn)
+        if max_tokens:
+            # whole turns only, so no tool result is kept without its call
+            cost = count_tokens_approximately(turn)
+            if kept and total + cost > max_tokens:
+                break
+            total += cost
+        kept.append(turn)
+    return [m for turn in reversed(kept) for m in turn]
@@ -0,0 +1,448 @@
+import asyncio
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Sequence
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    INTERRUPT,
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+from services.sqlite_appointment_store import SQLiteConnectionPool
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+_CHECKPOINT_COLUMNS = "thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata"
+
+SQL_GET_CHECKPOINT = f"SELECT {_CHECKPOINT_COLUMNS} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+SQL_GET_LATEST_CHECKPOINT = f"SELECT {_CHECKPOINT_COLUMNS} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1"
+SQL_LIST_THREAD = f"SELECT {_CHECKPOINT_COLUMNS} FROM checkpoints WHERE thread_id = ? ORDER BY checkpoint_ns, checkpoint_id DESC"
+SQL_LIST_ALL = f"SELECT {_CHECKPOINT_COLUMNS} FROM checkpoints ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC"
+SQL_GET_BLOB = "SELECT type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?"
+SQL_GET_WRITES = "SELECT task_id, channel, type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx"
+SQL_INSERT_CHECKPOINT = f"INSERT OR REPLACE INTO checkpoints ({_CHECKPOINT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+SQL_INSERT_BLOB = "INSERT OR IGNORE INTO blobs (thread_id, checkpoint_ns, channel, version, type, blob) VALUES (?, ?, ?, ?, ?, ?)"
+# regular writes are kept once per (task, idx), special channels (error, interrupt, ...) are overwritten
+SQL_INSERT_WRITE = "INSERT OR IGNORE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+SQL_REPLACE_WRITE = "INSERT OR REPLACE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+# interrupts of the current step are pending writes of the latest checkpoint, found without loading any channel value
+SQL_HAS_PENDING_INTERRUPT = (
+    "SELECT EXISTS (SELECT 1 FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND checkpoint_id = "
+    "(SELECT MAX(checkpoint_id) FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?))"
+)
+SQL_TOUCH_THREAD = "INSERT INTO threads (thread_id, updated_at) VALUES (?, ?) ON CONFLICT (thread_id) DO UPDATE SET updated_at = MAX(updated_at, excluded.updated_at)"
+SQL_EXPIRED_THREADS = "SELECT thread_id FROM threads WHERE updated_at < ? LIMIT ?"
+SQL_DELETE_THREAD = (
+    "DELETE FROM checkpoints WHERE thread_id = ?",
+    "DELETE FROM blobs WHERE thread_id = ?",
+    "DELETE FROM writes WHERE thread_id = ?",
+    "DELETE FROM threads WHERE thread_id = ?",
+)
+
+# Every table is keyed by thread_id first, so the lookups of a conversation are primary key range scans
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+) WITHOUT ROWID;
+
+-- channel values are stored once per version and shared by the checkpoints that reference them
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+) WITHOUT ROWID;
+
+-- last write per thread, drives the TTL eviction of abandoned conversations
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS threads_updated_at ON threads (updated_at);
+"""
+
+WriteOp = Callable[[sqlite3.Connection], Any]
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    Checkpoint saver backed by a SQLite database file (WAL mode).
+
+    Conversations survive a restart and any worker opening the same file can continue any thread.
+    - writes are group committed: a single writer thread commits everything queued while the previous
+      transaction was running in one transaction, callers wait until their write is durable
+    - reads use pooled connections and primary key lookups by thread_id, they never wait for the writer (WAL)
+    - threads without a write for `ttl_seconds` are evicted by the writer thread every `sweep_interval` seconds
+    """
+    def __init__(
+        self,
+        path: str,
+        *,
+        ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+        sweep_interval: float = 60,
+        max_batch: int = 256,
+        pool_size: int = 8,
+        clock: Callable[[], float] = time.time, # wall clock, it is compared across processes
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self.max_batch = max_batch
+        self.clock = clock
+        self.pool = SQLiteConnectionPool(path, size=pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+        self._queue: queue.Queue[tuple[WriteOp, Future] | None] = queue.Queue()
+        self._writer: threading.Thread | None = None
+        self._writer_lock = threading.Lock()
+        self._closed = False
+
+    # ---- writer ----
+
+    def _submit(self, op: WriteOp) -> Future:
+        if self._closed:
+            raise RuntimeError("checkpoint saver is closed")
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run_writer, name="checkpoint-writer", daemon=True)
+                    self._writer.start()
+        future: Future = Future()
+        self._queue.put((op, future))
+        return future
+
+    def _run_writer(self) -> None:
+        next_sweep = time.monotonic() + self.sweep_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, next_sweep - time.monotonic()))
+            except queue.Empty:
+                item = ()
+            stop = item is None
+            batch = [item] if item else []
+            # drain whatever queued up while the previous transaction was committing
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                self._commit(batch)
+            if self.ttl_seconds is not None and time.monotonic() >= next_sweep:
+                try:
+                    self.evict_expired()
+                except sqlite3.Error:
+                    pass # retried on the next sweep
+                next_sweep = time.monotonic() + self.sweep_interval
+            if stop:
+                return
+
+    def _commit(self, batch: list[tuple[WriteOp, Future]]) -> None:
+        with self.pool.connection() as conn:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                results = [op(conn) for op, _ in batch]
+                conn.execute("COMMIT")
+            except Exception as exc:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                if len(batch) > 1:
+                    # one bad write must not fail the others, retry them one transaction each
+                    for item in batch:
+                        self._commit([item])
+                    return
+                batch[0][1].set_exception(exc)
+                return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def flush(self) -> None:
+        """
+        Waits until every write queued so far is committed.
+        """
+        self._submit(lambda conn: None).result()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+        self.pool.close()
+
+    def __enter__(self) -> "SQLiteCheckpointSaver":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---- eviction ----
+
+    def evict_expired(self, chunk: int = 500) -> int:
+        """
+        Deletes every thread that has not been written for ttl_seconds. Returns the number of evicted threads.
+        Runs in chunks, so a large backlog never holds the write lock for long.
+        """
+        if self.ttl_seconds is None:
+            return 0
+        cutoff = self.clock() - self.ttl_seconds
+        evicted = 0
+        while True:
+            with self.pool.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    thread_ids = [(row[0],) for row in conn.execute(SQL_EXPIRED_THREADS, (cutoff, chunk)).fetchall()]
+                    for sql in SQL_DELETE_THREAD:
+                        conn.executemany(sql, thread_ids)
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                conn.execute("COMMIT")
+            evicted += len(thread_ids)
+            if len(thread_ids) < chunk:
+                return evicted
+
+    # ---- reads ----
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self.pool.connection() as conn:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = conn.execute(SQL_GET_CHECKPOINT, (thread_id, checkpoint_ns, checkpoint_id)).fetchone()
+            else:
+                row = conn.execute(SQL_GET_LATEST_CHECKPOINT, (thread_id, checkpoint_ns)).fetchone()
+            if row is None:
+                return None
+            return self._to_tuple(conn, row, self.serde.loads_typed((row[4], row[6])))
+
+    def has_pending_interrupt(self, config: RunnableConfig) -> bool:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self.pool.connection() as conn:
+            return bool(conn.execute(SQL_HAS_PENDING_INTERRUPT, (thread_id, checkpoint_ns, INTERRUPT, thread_id, checkpoint_ns)).fetchone()[0])
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        checkpoint_ns = config["configurable"].get("checkpoint_ns") if config else None
+        checkpoint_id = get_checkpoint_id(config) if config else None
+        before_id = get_checkpoint_id(before) if before else None
+        # rows are read up front, a generator must not keep a pooled connection while the caller iterates
+        with self.pool.connection() as conn:
+            if config:
+                rows = conn.execute(SQL_LIST_THREAD, (config["configurable"]["thread_id"],)).fetchall()
+            else:
+                rows = conn.execute(SQL_LIST_ALL).fetchall()
+            found = []
+            for row in rows:
+                if limit is not None and len(found) >= limit:
+                    break
+                if checkpoint_ns is not None and row[1] != checkpoint_ns:
+                    continue
+                if checkpoint_id and row[2] != checkpoint_id:
+                    continue
+                if before_id and row[2] >= before_id:
+                    continue
+                metadata = self.serde.loads_typed((row[4], row[6]))
+                if filter and not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                found.append(self._to_tuple(conn, row, metadata))
+        yield from found
+
+    def _to_tuple(self, conn: sqlite3.Connection, row: tuple, metadata: CheckpointMetadata) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type_, checkpoint_b, _ = row
+        checkpoint: Checkpoint = self.serde.loads_typed((type_, checkpoint_b))
+        channel_values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            blob = conn.execute(SQL_GET_BLOB, (thread_id, checkpoint_ns, channel, str(version))).fetchone()
+            if blob is not None and blob[0] != "empty":
+                channel_values[channel] = self.serde.loads_typed(blob)
+        writes = conn.execute(SQL_GET_WRITES, (thread_id, checkpoint_ns, checkpoint_id)).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=metadata,
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_checkpoint_id}}
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[(task_id, channel, self.serde.loads_typed((t, v))) for task_id, channel, t, v in writes],
+        )
+
+    # ---- writes ----
+
+    def _put_op(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions) -> tuple[WriteOp, RunnableConfig]:
+        # serialization happens on the caller's thread, the writer only runs the statements
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        c = checkpoint.copy()
+        values: dict[str, Any] = c.pop("channel_values") # type: ignore[misc]
+        blobs = [
+            (thread_id, checkpoint_ns, k, str(v), *(self.serde.dumps_typed(values[k]) if k in values else ("empty", b"")))
+            for k, v in new_versions.items()
+        ]
+        type_, checkpoint_b = self.serde.dumps_typed(c)
+        _, metadata_b = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        row = (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"), type_, checkpoint_b, metadata_b)
+        now = self.clock()
+
+        def op(conn: sqlite3.Connection) -> None:
+            conn.executemany(SQL_INSERT_BLOB, blobs)
+            conn.execute(SQL_INSERT_CHECKPOINT, row)
+            conn.execute(SQL_TOUCH_THREAD, (thread_id, now))
+
+        next_config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+        return op, next_config
+
+    def _put_writes_op(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str, task_path: str) -> WriteOp:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        inserts, replaces = [], []
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            row = (thread_id, checkpoint_ns, checkpoint_id, task_id, write_idx, channel, *self.serde.dumps_typed(value), task_path)
+            (replaces if write_idx < 0 else inserts).append(row)
+        now = self.clock()
+
+        def op(conn: sqlite3.Connection) -> None:
+            conn.executemany(SQL_INSERT_WRITE, inserts)
+            conn.executemany(SQL_REPLACE_WRITE, replaces)
+            conn.execute(SQL_TOUCH_THREAD, (thread_id, now))
+
+        return op
+
+    def _delete_thread_op(self, thread_id: str) -> WriteOp:
+        def op(conn: sqlite3.Connection) -> None:
+            for sql in SQL_DELETE_THREAD:
+                conn.execute(sql, (thread_id,))
+        return op
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions) -> RunnableConfig:
+        op, next_config = self._put_op(config, checkpoint, metadata, new_versions)
+        self._submit(op).result()
+        return next_config
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        self._submit(self._put_writes_op(config, writes, task_id, task_path)).result()
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._submit(self._delete_thread_op(thread_id)).result()
+
+    # ---- async, the event loop never blocks on SQLite ----
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        found = await asyncio.to_thread(lambda: [*self.list(config, filter=filter, before=before, limit=limit)])
+        for item in found:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions) -> RunnableConfig:
+        op, next_config = self._put_op(config, checkpoint, metadata, new_versions)
+        await asyncio.wrap_future(self._submit(op))
+        return next_config
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        await asyncio.wrap_future(self._submit(self._put_writes_op(config, writes, task_id, task_path)))
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.wrap_future(self._submit(self._delete_thread_op(thread_id)))
+
+    def get_next_version(self, current: str | None, channel: None) -> str:
+        # same scheme as InMemorySaver: zero padded counter (sorts as text) plus a random suffix
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+async def ahas_pending_interrupt(checkpointer: BaseCheckpointSaver | None, config: RunnableConfig) -> bool:
+    """
+    Whether the thread is paused on an interrupt() and the next message must resume it.
+
+    Same answer as `(await graph.aget_state(config)).interrupts` for the root graph, but only looks at
+    the pending writes of the latest checkpoint instead of deserializing the whole conversation state.
+    """
+    if checkpointer is None:
+        return False
+    if isinstance(checkpointer, SQLiteCheckpointSaver):
+        return await asyncio.to_thread(checkpointer.has_pending_interrupt, config)
+    # any other saver (InMemorySaver: a dict lookup) through the public API, its internals may change in any release
+    saved = await checkpointer.aget_tuple(config)
+    return saved is not None and any(channel == INTERRUPT for _, channel, _ in saved.pending_writes or [])
+
+
+def create_checkpointer() -> BaseCheckpointSaver:
+    """
+    Checkpointer for the API graph, selected with the CHECKPOINTER env var:
+    - memory (default): InMemorySaver, conversations live in the process and are lost on restart
+    - sqlite: SQLiteCheckpointSaver on CHECKPOINT_DB_PATH, shared by all workers, abandoned threads
+      are evicted after CHECKPOINT_TTL_SECONDS (0 keeps them forever)
+    """
+    backend = os.getenv("CHECKPOINTER", "memory")
+    if backend == "memory":
+        return InMemorySaver()
+    if backend == "sqlite":
+        ttl = float(os.getenv("CHECKPOINT_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        return SQLiteCheckpointSaver(os.getenv("CHECKPOINT_DB_PATH", "checkpoints.db"), ttl_seconds=ttl or None)
+    raise ValueError(f"Unknown CHECKPOINTER backend: {backend}")
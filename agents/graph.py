@@ -1,7 +1,8 @@
 from langgraph.graph import StateGraph
 from agents.models.state import ConversationState
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import InMemorySaver
+from agents.checkpointer import create_checkpointer
+from agents.hooks.metrics import TimedStateGraph
 from agents.identity.identity_collector_node import identity_collector_node
 from agents.identity.identity_verification_node import identity_verification_node, new_patient_confirmation_request_node
 from agents.identity.handoffs import new_patient_handoff_node, urgency_handoff_node
@@ -23,7 +24,8 @@ from langgraph.store.memory import InMemoryStore
 import os
 from agents.route_start import route_start
 
-workflow = StateGraph(ConversationState)
+# nodes record their wall time for /metrics
+workflow = TimedStateGraph(ConversationState)
 
 # "worker" nodes
 workflow.add_node(IdentityRoute.IDENTITY_ROUTING_NODE, identity_routing_node)
@@ -157,7 +159,7 @@ workflow.add_edge("leave_skill", AppointmentRoute.PRIMARY_APPOINTMENT_NODE)
 is_api_mode = os.getenv("RUN_MODE") == "api"
 print(f"is_api_mode: {is_api_mode}")
 if is_api_mode:
-    memory = InMemorySaver()
+    memory = create_checkpointer()
     graph = workflow.compile(checkpointer=memory)
 else:
     graph = workflow.compile()
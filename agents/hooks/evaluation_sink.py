@@ -0,0 +1,90 @@
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+
+# one scored QA pair, as written by the sinks
+RECORD_FIELDS = (
+    "created_at", "thread_id", "node", "question", "answer",
+    "overall_score", "answer_relevance_accuracy", "user_need_relevance", "groundedness", "explanation",
+)
+
+SQL_INSERT_EVALUATION = f"INSERT INTO qa_evaluations ({', '.join(RECORD_FIELDS)}) VALUES ({', '.join('?' * len(RECORD_FIELDS))})"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS qa_evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    thread_id TEXT,
+    node TEXT,
+    question TEXT,
+    answer TEXT,
+    overall_score REAL,
+    answer_relevance_accuracy INTEGER,
+    user_need_relevance INTEGER,
+    groundedness INTEGER,
+    explanation TEXT
+);
+CREATE INDEX IF NOT EXISTS qa_evaluations_node ON qa_evaluations (node, created_at);
+"""
+
+class EvaluationSink(ABC):
+    """
+    Where the QA evaluator writes its scores.
+
+    Implementations:
+    - JsonlEvaluationSink: one JSON object per line, appended
+    - SQLiteEvaluationSink: qa_evaluations table, for querying scores by node / thread
+
+    write() blocks (file I/O), the evaluator calls it from a worker thread.
+    """
+    @abstractmethod
+    def write(self, records: list[dict]) -> None: ...
+
+    def close(self) -> None:
+        pass
+
+class JsonlEvaluationSink(EvaluationSink):
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, records: list[dict]) -> None:
+        lines = [json.dumps({f: r.get(f) for f in RECORD_FIELDS}, ensure_ascii=False) + "\n" for r in records]
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+class SQLiteEvaluationSink(EvaluationSink):
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def write(self, records: list[dict]) -> None:
+        rows = [tuple(r.get(f) for f in RECORD_FIELDS) for r in records]
+        with self._lock, self._conn:
+            self._conn.executemany(SQL_INSERT_EVALUATION, rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def create_evaluation_sink() -> Optional[EvaluationSink]:
+    """
+    Creates the sink selected by the EVAL_SINK env variable:
+    - none (default): scores are only logged
+    - jsonl: appended to EVAL_SINK_PATH (default qa_evaluations.jsonl)
+    - sqlite: qa_evaluations table in EVAL_SINK_PATH (default qa_evaluations.db)
+    """
+    backend = os.getenv("EVAL_SINK", "none")
+    if backend == "none":
+        return None
+    if backend == "jsonl":
+        return JsonlEvaluationSink(os.getenv("EVAL_SINK_PATH", "qa_evaluations.jsonl"))
+    if backend == "sqlite":
+        return SQLiteEvaluationSink(os.getenv("EVAL_SINK_PATH", "qa_evaluations.db"))
+    raise ValueError(f"Unknown EVAL_SINK backend: {backend}")
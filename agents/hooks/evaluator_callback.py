@@ -1,4 +1,8 @@
 import asyncio
+import contextvars
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from agents.llms import get_llm_large_model
 from logging_config import qa_evaluator_logger
 from langchain_core.callbacks.base import AsyncCallbackHandler
@@ -9,9 +13,11 @@ from langchain_core.messages import BaseMessage
 from langchain_core.messages import AIMessage, HumanMessage
 import hashlib
 from pydantic import BaseModel, Field
-from typing import Tuple
+from typing import Literal, Optional, Tuple
 
-from agents.hooks.prompts.evaluator_prompts import conversation_evaluator_prompt
+from agents.hooks.evaluation_sink import EvaluationSink, create_evaluation_sink
+from agents.hooks.prompts.evaluator_prompts import batch_evaluator_prompt, conversation_evaluator_prompt, format_evaluation_pairs
+from agents.hooks.sampling import SamplingPolicy, create_sampling_policy
 
 class AnswerQuality(BaseModel):
     """
@@ -34,15 +40,90 @@ class AnswerQuality(BaseModel):
         description="Short explanation of why the scores were assigned."
     )
 
+class IndexedAnswerQuality(AnswerQuality):
+    index: int = Field(description="Number of the evaluated pair.")
+
+class BatchAnswerQuality(BaseModel):
+    """
+    Evaluations of several numbered QA pairs, one per pair.
+    """
+    evaluations: list[IndexedAnswerQuality]
+
+@dataclass
+class QAPair:
+    human: HumanMessage | None
+    ai: AIMessage | None = None
+    node: str | None = None # langgraph node that made the LLM call
+    thread_id: str | None = None
+
 class EvaluatorCallbackHandler(AsyncCallbackHandler):
-    def __init__(self) -> None:
+    """
+    Evaluates a sample of the new human/AI pairs in the background, off the request path.
+
+    `sampling` picks the pairs worth scoring (default: create_sampling_policy(), from the env).
+    Sampled pairs go to a bounded queue drained by a few worker tasks in batches of up to `batch_size`.
+    When the queue is full new pairs are dropped (counted in `dropped`) instead of piling up
+    behind the evaluator. Already evaluated pairs are remembered in a size-bounded LRU.
+
+    A batch is scored either with `abatch` (one evaluator request per pair, at most
+    `max_concurrency` at a time) or, with batch_mode="request", in a single evaluator request.
+    Scores are logged and written to `sink` (default: create_evaluation_sink(), from the env).
+    """
+    def __init__(
+        self,
+        max_queue: int = 1000,
+        workers: int = 2,
+        batch_size: int = 8,
+        batch_wait: float = 0.05,
+        max_evaluated_pairs: int = 10_000,
+        sampling: Optional[SamplingPolicy] = None,
+        sink: Optional[EvaluationSink] = None,
+        batch_mode: Literal["abatch", "request"] = "abatch",
+        max_concurrency: int = 4,
+        eval_llm=None,
+    ) -> None:
         super().__init__()
-        # Messages seen by this LLM call (per run_id)
-        self._history_by_run: dict[UUID, list[BaseMessage]] = {}
-        # QA pairs we've already evaluated, so we don't re-evaluate
-        self._evaluated_pairs: set[tuple[str, str]] = set()
-        eval_llm = get_llm_large_model()
+        self.max_queue = max_queue
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait # how long a worker waits for a batch to fill up
+        self.max_evaluated_pairs = max_evaluated_pairs
+        self.sampling = sampling if sampling is not None else create_sampling_policy()
+        self.sink = sink if sink is not None else create_evaluation_sink()
+        self.batch_mode = batch_mode
+        self.max_concurrency = max_concurrency
+        # Last human message (and where it came from) seen by each running LLM call, dropped when the run ends or fails
+        self._runs: dict[UUID, QAPair] = {}
+        # QA pairs we've already evaluated (most recent last), so we don't re-evaluate
+        self._evaluated_pairs: OrderedDict[tuple[str, str], None] = OrderedDict()
+        # queue and workers live on the event loop that runs the graph, created on first use
+        self._queue: asyncio.Queue[QAPair] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.enqueued = 0
+        self.dropped = 0
+        self.evaluated = 0
+        self.scored = 0
+        self.failed = 0
+        self.evaluator_requests = 0
+        eval_llm = eval_llm if eval_llm is not None else get_llm_large_model()
         self._eval_chain = conversation_evaluator_prompt | eval_llm.with_structured_output(AnswerQuality)
+        self._batch_eval_chain = batch_evaluator_prompt | eval_llm.with_structured_output(BatchAnswerQuality)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "evaluated": self.evaluated,
+            "scored": self.scored,
+            "failed": self.failed,
+            "evaluator_requests": self.evaluator_requests,
+            "sampled": self.sampling.sampled,
+            "skipped": self.sampling.skipped,
+            "runs_in_flight": len(self._runs),
+            "evaluated_pairs": len(self._evaluated_pairs),
+        }
 
     def _pair_key(self, human: HumanMessage, ai: AIMessage) -> tuple[str, str]:
         def msg_key(m: BaseMessage) -> str:
@@ -88,51 +169,140 @@ class EvaluatorCallbackHandler(AsyncCallbackHandler):
 
 
     async def on_chat_model_start(self, serialized: dict[str, Any], messages: list[list[BaseMessage]], *, run_id: UUID, parent_run_id: UUID | None = None, tags: list[str] | None = None, metadata: dict[str, Any] | None = None, **kwargs: Any) -> None:
-       # Usually there is only one batch
+       # Usually there is only one batch, only its last human message is needed
         if messages:
-            batch = messages[0]
-            self._history_by_run[run_id] = batch
-            
+            metadata = metadata or {}
+            self._runs[run_id] = QAPair(
+                human=self._get_last_human(messages[0]),
+                node=metadata.get("langgraph_node"),
+                thread_id=metadata.get("thread_id"),
+            )
+
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, parent_run_id: UUID | None = None, **kwargs: Any) -> None:
+        # failed or cancelled runs never reach on_llm_end
+        self._runs.pop(run_id, None)
+
     async def on_llm_end(self, response: LLMResult, *, run_id: UUID, parent_run_id: UUID | None = None, tags: list[str] | None = None, **kwargs: Any) -> None:
-        messages = self._history_by_run.pop(run_id, [])
-        
-        human = self._get_last_human(messages)
+        pair = self._runs.pop(run_id, None)
         ai = self._get_ai_from_result(response)
 
-        if human is None or ai is None:
+        if pair is None or pair.human is None or ai is None:
             return
+        pair.ai = ai
 
         # skip already evaluated pair
-        pair_key = self._pair_key(human, ai)
+        pair_key = self._pair_key(pair.human, ai)
         if pair_key in self._evaluated_pairs:
             # Already evaluated this Human–AI pair in a previous run
+            self._evaluated_pairs.move_to_end(pair_key)
             return
         
-        self._evaluated_pairs.add(pair_key)
-        asyncio.create_task(self._run_evaluator(human, ai))
-    
+        self._evaluated_pairs[pair_key] = None
+        if len(self._evaluated_pairs) > self.max_evaluated_pairs:
+            self._evaluated_pairs.popitem(last=False)
+        if self.sampling.sample("/".join(pair_key), node=pair.node, thread_id=pair.thread_id):
+            self._enqueue(pair)
 
-    async def _run_evaluator(self, human: HumanMessage, ai: AIMessage) -> None:
+    def _enqueue(self, pair: QAPair) -> None:
+        queue = self._ensure_workers()
         try:
-            if not human or not ai:
-                return
-            eval_input = {
-                "question": human.content,
-                "answer": ai.content,
-                "context": "",
-            }
-            qa_evaluator_logger.info(f"QA_EVAL: eval_input={eval_input}")
-            # result: AnswerQuality = await self._eval_chain.ainvoke(eval_input)
-            # qa_evaluator_logger.info(
-            #     f"QA_EVAL: "
-            #     f"overall={result.overall_score:.2f}, "
-            #     f"rel_acc={result.answer_relevance_accuracy}, "
-            #     f"user_need={result.user_need_relevance}, "
-            #     f"grounded={result.groundedness}, "
-            #     f"human={human.content!r}, "
-            #     f"ai={ai.content!r}, "
-            #     f"explanation={result.explanation}"
-            # )
+            queue.put_nowait(pair)
+            self.enqueued += 1
+        except asyncio.QueueFull:
+            # load shedding: the evaluator is behind, skip this pair rather than hold it in memory
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                qa_evaluator_logger.warning(f"QA_EVAL: queue full, {self.dropped} pairs dropped so far")
+
+    def _ensure_workers(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            # first use, or the previous loop is gone (e.g. one loop per test): start over on this one
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            # a fresh context: copying the one of the LLM run that got here first would make every later
+            # evaluator call inherit its callbacks, parent run and metadata (langchain's config context var)
+            self._workers = [loop.create_task(self._worker(self._queue), context=contextvars.Context()) for _ in range(self.workers)]
+        return self._queue
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            # collect what arrives shortly after, so the evaluator gets batches instead of single pairs
+            deadline = asyncio.get_running_loop().time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._run_evaluator_batch(batch)
+            finally:
+                self.evaluated += len(batch)
+                for _ in batch:
+                    queue.task_done()
+
+    async def join(self) -> None:
+        """
+        Waits until every queued pair has been evaluated (tests, shutdown).
+        """
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def aclose(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers, self._queue, self._loop = [], None, None
+
+    async def _run_evaluator_batch(self, pairs: list[QAPair]) -> None:
+        try:
+            eval_inputs = [
+                {
+                    "question": pair.human.content,
+                    "answer": pair.ai.content,
+                    "context": "",
+                }
+                for pair in pairs
+            ]
+            if self.batch_mode == "request":
+                results = await self._score_in_one_request(eval_inputs)
+            else:
+                self.evaluator_requests += len(eval_inputs)
+                results = await self._eval_chain.abatch(eval_inputs, config={"max_concurrency": self.max_concurrency}, return_exceptions=True)
+
+            records = []
+            for pair, result in zip(pairs, results):
+                if not isinstance(result, AnswerQuality):
+                    self.failed += 1
+                    qa_evaluator_logger.error("QA_EVAL: no score for human={!r}, error={}", pair.human.content, result)
+                    continue
+                qa_evaluator_logger.info(
+                    "QA_EVAL: node={}, overall={:.2f}, rel_acc={}, user_need={}, grounded={}, human={!r}, ai={!r}, explanation={}",
+                    pair.node, result.overall_score, result.answer_relevance_accuracy, result.user_need_relevance,
+                    result.groundedness, pair.human.content, pair.ai.content, result.explanation,
+                )
+                records.append({
+                    "created_at": time.time(),
+                    "thread_id": pair.thread_id,
+                    "node": pair.node,
+                    "question": str(pair.human.content),
+                    "answer": str(pair.ai.content),
+                    **result.model_dump(include=set(AnswerQuality.model_fields)),
+                })
+            self.scored += len(records)
+            if records and self.sink is not None:
+                await asyncio.to_thread(self.sink.write, records)
         except Exception as e:
             qa_evaluator_logger.error(f"QA_EVAL: error={e}")
-        
\ No newline at end of file
+
+    async def _score_in_one_request(self, eval_inputs: list[dict]) -> list[AnswerQuality | None]:
+        self.evaluator_requests += 1
+        batch: BatchAnswerQuality = await self._batch_eval_chain.ainvoke({"pairs": format_evaluation_pairs(eval_inputs)})
+        # the model may skip or repeat pairs, keep one evaluation per index
+        by_index = {e.index: e for e in batch.evaluations}
+        return [by_index.get(i) for i in range(len(eval_inputs))]
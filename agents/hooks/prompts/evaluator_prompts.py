@@ -1,10 +1,7 @@
 # agents/prompts/quality.py
 from langchain_core.prompts import ChatPromptTemplate
 
-conversation_evaluator_prompt = ChatPromptTemplate.from_messages([
-    (
-        "system",
-        """You are a strict QA evaluator for a medical appointment assistant.
+EVALUATOR_SYSTEM_PROMPT = """You are a strict QA evaluator for a medical appointment assistant.
 
     You are given:
     - The user's latest question or message.
@@ -39,7 +36,9 @@ conversation_evaluator_prompt = ChatPromptTemplate.from_messages([
 
     Return structured data only (no chit-chat).
     """
-        ),
+
+conversation_evaluator_prompt = ChatPromptTemplate.from_messages([
+        ("system", EVALUATOR_SYSTEM_PROMPT),
         (
             "human",
             """User question:
@@ -54,4 +53,21 @@ conversation_evaluator_prompt = ChatPromptTemplate.from_messages([
     ----------------
     {context}"""
         ),
-])
\ No newline at end of file
+])
+
+# several pairs scored in one request, {pairs} is rendered by format_evaluation_pairs
+batch_evaluator_prompt = ChatPromptTemplate.from_messages([
+        ("system", EVALUATOR_SYSTEM_PROMPT + """
+    You are given several numbered question/answer pairs. Evaluate each pair on its own
+    and return one evaluation per pair, with the pair's number as its index.
+    """),
+        ("human", "{pairs}"),
+])
+
+def format_evaluation_pairs(eval_inputs: list[dict]) -> str:
+    return "\n\n".join(
+        f"Pair {i}\nUser question:\n----------------\n{e['question']}\n\n"
+        f"Assistant answer:\n----------------\n{e['answer']}\n\n"
+        f"Context (if any, may be empty):\n----------------\n{e['context']}"
+        for i, e in enumerate(eval_inputs)
+    )
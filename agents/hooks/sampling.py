@@ -0,0 +1,57 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Optional
+
+class SamplingPolicy:
+    """
+    Decides which QA pairs the evaluator scores.
+
+    - rate: share of pairs scored, per node when `node_rates` has the node (stratified: rarely
+      visited nodes can be sampled more than the busy ones)
+    - per_thread_cap: at most this many scored pairs per conversation (None: no cap)
+
+    The decision for a pair is a hash of its key, so it is the same on every worker and on retries.
+    Per-thread counts are kept for the `max_threads` most recent threads.
+    """
+    def __init__(self, rate: float = 0.05, per_thread_cap: Optional[int] = 3, node_rates: Optional[dict[str, float]] = None, max_threads: int = 10_000):
+        self.rate = rate
+        self.per_thread_cap = per_thread_cap
+        self.node_rates = node_rates or {}
+        self.max_threads = max_threads
+        self._per_thread: OrderedDict[str, int] = OrderedDict()
+        self.sampled = 0
+        self.skipped = 0
+
+    def rate_for(self, node: Optional[str]) -> float:
+        return self.node_rates.get(node, self.rate)
+
+    def sample(self, key: str, node: Optional[str] = None, thread_id: Optional[str] = None) -> bool:
+        if _unit_interval(key) >= self.rate_for(node) or self._thread_is_full(thread_id):
+            self.skipped += 1
+            return False
+        if thread_id is not None:
+            self._per_thread[thread_id] = self._per_thread.get(thread_id, 0) + 1
+            self._per_thread.move_to_end(thread_id)
+            if len(self._per_thread) > self.max_threads:
+                self._per_thread.popitem(last=False)
+        self.sampled += 1
+        return True
+
+    def _thread_is_full(self, thread_id: Optional[str]) -> bool:
+        return thread_id is not None and self.per_thread_cap is not None and self._per_thread.get(thread_id, 0) >= self.per_thread_cap
+
+def _unit_interval(key: str) -> float:
+    return int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big") / 2**64
+
+def create_sampling_policy() -> SamplingPolicy:
+    """
+    EVAL_SAMPLE_RATE (default 0.05), EVAL_PER_THREAD_CAP (default 3, 0 for no cap),
+    EVAL_NODE_RATES: per node rates, e.g. "cancel_appointment=0.5,reschedule_appointment=0.5".
+    """
+    node_rates = {}
+    for item in filter(None, os.getenv("EVAL_NODE_RATES", "").split(",")):
+        node, rate = item.split("=")
+        node_rates[node.strip()] = float(rate)
+    cap = int(os.getenv("EVAL_PER_THREAD_CAP", "3"))
+    return SamplingPolicy(rate=float(os.getenv("EVAL_SAMPLE_RATE", "0.05")), per_thread_cap=cap or None, node_rates=node_rates)
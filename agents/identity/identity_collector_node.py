@@ -4,11 +4,17 @@ from agents.models.state import ConversationState
 from agents.models.user import User
 from typing import Optional
 from pydantic import BaseModel, Field
-from logging_config import llm_logger, logger
+from logging_config import llm_logger, logger, payload
 from langchain_core.messages import AIMessage, HumanMessage
 from agents.identity.prompts.identity_assistant import identity_collector_prompt
 from langgraph.types import interrupt
+from langgraph.constants import TAG_NOSTREAM
 from agents.identity.prompts.intent_prompt import IntentResult, intent_prompt
+from agents.identity.intent_cache import create_intent_cache
+from agents.intent_classifier import classify_intent_locally
+from agents.identity.identity_extractor import extract_identity
+from agents.prefetch import identity_prefetch, thread_id_of
+from langchain_core.runnables import RunnableConfig
 from typing import Literal
 import asyncio
 
@@ -32,6 +38,30 @@ class UpdateInfoWithResponse(UpdateInfo):
     """
     response: str = Field(default=None, description="The response to the user based on the collected information")
 
+# built once, with_structured_output converts the schema to a tool on every call.
+# Structured output is JSON, not something to stream to the user (see /chat/stream)
+identity_collector_chain = identity_collector_prompt | llm.with_structured_output(UpdateInfoWithResponse).with_config(tags=[TAG_NOSTREAM])
+intent_chain = intent_prompt | llm.with_structured_output(IntentResult).with_config(tags=[TAG_NOSTREAM])  # a separate prompt just for intent
+
+# opening messages repeat a lot ("book an appointment"), the same phrasing is only classified once
+intent_cache = create_intent_cache()
+
+async def classify_intent(text: str) -> IntentResult:
+    """
+    Intent of the message: the local classifier when it is confident,
+    otherwise the cache or the intent LLM call (successful results are cached).
+    """
+    local = classify_intent_locally(text)
+    if local is not None:
+        return local
+    cached = intent_cache.get(text)
+    if cached is not None:
+        return cached
+    result = await intent_chain.ainvoke({"text": text})
+    if isinstance(result, IntentResult):
+        intent_cache.put(text, result)
+    return result
+
 def init_state(state: ConversationState) -> ConversationState:
     """
     Initializes the state.
@@ -159,7 +189,21 @@ async def ask_user_to_complete_information(state: ConversationState):
         "user": user,
     }
 
-async def identity_collector_node(state: ConversationState) -> dict:
+async def extracted_identity_response(state: ConversationState, user: User) -> UpdateInfoWithResponse:
+    """
+    The collector answer when the rules found every required field, without the LLM round trip.
+    """
+    return UpdateInfoWithResponse(
+        name=user.name,
+        date_of_birth=user.date_of_birth,
+        ssn_last_4=user.ssn_last_4,
+        phone_number=user.phone,
+        urgency_level=state.get("urgency_level", 1),
+        urgency_reason=state.get("urgency_reason", "No urgency"),
+        response=f"Thank you, {user.name.split()[0]}. I'm connecting you to an appointment agent.",
+    )
+
+async def identity_collector_node(state: ConversationState, config: RunnableConfig | None = None) -> dict:
     """
     Graph node: call the identity_collector_runnable_node (LLM)
     which returns a User, then merge into state["User"].
@@ -171,37 +215,48 @@ async def identity_collector_node(state: ConversationState) -> dict:
 
     # structured_llm = llm.with_structured_output(UpdateInfo)
     # chain = identity_collector_prompt | structured_llm
-    structured_llm = llm.with_structured_output(UpdateInfoWithResponse)
-    chain = identity_collector_prompt | structured_llm
-
-    structured_intent_llm = llm.with_structured_output(IntentResult)
-    intent_chain = intent_prompt | structured_intent_llm  # a separate prompt just for intent
     last_human_msg = next(
         (m for m in reversed(state["messages"]) if m.type == "human"), None
     )
     intent_task = None
+    extracted = None
     if last_human_msg:
-        intent_task = intent_chain.ainvoke({"text": last_human_msg.content})
+        intent_task = classify_intent(last_human_msg.content)
+        if isinstance(last_human_msg.content, str):
+            # the name the LLM took from an earlier turn, a message starting with it is not a guess
+            extracted = extract_identity(last_human_msg.content, confirmed_name=user.name)
 
+    if extracted is not None and extracted.fields():
+        # fields the rules are sure about count as collected, the LLM only has to ask for the rest
+        user = merge_users(user, UpdateInfo(**extracted.fields()))
+        state = {**state, "user": user}
+        if not missing_required_fields(user):
+            # verifiable already: the user lookup and their appointment context load during the LLM calls below
+            identity_prefetch.start(thread_id_of(config), user)
 
     # parallel invocation
-    template_params = user_to_prompt_vars(state)
-
-    identity_task = chain.ainvoke(template_params)
+    if extracted is not None and extracted.fields() and not extracted.needs_review and not missing_required_fields(user):
+        identity_task = extracted_identity_response(state, user)
+    else:
+        template_params = user_to_prompt_vars(state)
+        identity_task = identity_collector_chain.ainvoke(template_params)
     identity_res, intent_res = await asyncio.gather(
         identity_task,
         intent_task,
         return_exceptions=True,
     )
 
-    llm_logger.info(f"identity_collector_node response: {identity_res}")
-    llm_logger.info(f"identity_collector_node intent response: {intent_res}")
+    llm_logger.info("identity_collector_node response: {}", lambda: payload(identity_res))
+    llm_logger.info("identity_collector_node intent response: {}", lambda: payload(intent_res))
 
     messages = []
     if isinstance(identity_res, UpdateInfoWithResponse):
         messages.append(AIMessage(content=identity_res.response))
 
     user = merge_users(user, identity_res)
+    if not missing_required_fields(user):
+        # no-op when the extracted identity was already complete and the LLM kept it
+        identity_prefetch.start(thread_id_of(config), user)
 
     out = {
         "messages": messages,
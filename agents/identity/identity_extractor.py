@@ -0,0 +1,193 @@
+import re
+from dataclasses import dataclass, asdict
+from datetime import date
+from typing import Optional
+
+MONTHS = {
+    name: number
+    for number, names in enumerate([
+        ("january", "jan"), ("february", "feb"), ("march", "mar"), ("april", "apr"), ("may",), ("june", "jun"),
+        ("july", "jul"), ("august", "aug"), ("september", "sep", "sept"), ("october", "oct"), ("november", "nov"), ("december", "dec"),
+    ], start=1)
+    for name in names
+}
+_MONTH = "|".join(sorted(MONTHS, key=len, reverse=True))
+
+DATE_PATTERNS = [
+    # 1960-01-01
+    (re.compile(r"\b(?P<y>(?:19|20)\d{2})-(?P<m>\d{1,2})-(?P<d>\d{1,2})\b"), "ymd"),
+    # 01/01/1960, 01-01-1960, 01.01.1960 (month first unless the first number can't be a month,
+    # a guess the LLM reviews when both could be: 05/04/1960)
+    (re.compile(r"\b(?P<a>\d{1,2})[/.\-](?P<b>\d{1,2})[/.\-](?P<y>(?:19|20)\d{2})\b"), "ab"),
+    # January 1st 1960, Jan 1, 1960
+    (re.compile(rf"\b(?P<m>{_MONTH})\.?\s+(?P<d>\d{{1,2}})(?:st|nd|rd|th)?,?\s+(?P<y>(?:19|20)\d{{2}})\b", re.IGNORECASE), "mdy"),
+    # 1 January 1960, 1st of January, 1960
+    (re.compile(rf"\b(?P<d>\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<m>{_MONTH})\.?,?\s+(?P<y>(?:19|20)\d{{2}})\b", re.IGNORECASE), "dmy"),
+]
+DOB_KEYWORD = re.compile(r"\b(born|birth|dob|birthday|b\.?\s?d\.?)\b", re.IGNORECASE)
+
+PHONE = re.compile(r"(?<![\d\-])(?:\+?1[\s.\-]?)?\(?(\d{3})\)?[\s.\-]?(\d{3})[\s.\-]?(\d{4})(?![\d\-])")
+FULL_SSN = re.compile(r"(?<![\d\-])\d{3}-\d{2}-(\d{4})(?![\d\-])")
+SSN_KEYWORD = re.compile(r"\b(?:ssn|social(?: security)?(?: number)?|last (?:4|four)(?: digits)?)\b[^\d]{0,30}?(\d{4})(?!\d)", re.IGNORECASE)
+BARE_FOUR_DIGITS = re.compile(r"(?<![\d\-/.])(\d{4})(?![\d\-/]|\.\d)")
+# a bare number right after these words is a year or a time, not an SSN
+NOT_SSN_BEFORE = re.compile(r"(\b(born|in|year|at|since|of|by|before|after)|\d)\s*$", re.IGNORECASE)
+
+_NAME_TOKEN = r"[A-Z][a-zA-Z'\-]+"
+# "I'm Really Scared" or "This is Urgent Care" are not names, those are left to the LLM
+EXPLICIT_NAME = re.compile(rf"\b(?:[Mm]y name is|[Nn]ame is|[Nn]ame:)\s+(?P<name>{_NAME_TOKEN}(?:\s+{_NAME_TOKEN}){{1,2}})\b")
+# a message starting with the full name: "John Doe, 01/01/1960, 1111", but just as well "Need Help Now, ...":
+# a guess for the LLM to review, unless it is the name the LLM already confirmed
+LEADING_NAME = re.compile(rf"^\s*(?:(?:[Hh]i|[Hh]ello|[Hh]ey)[,!.]?\s+)?(?P<name>{_NAME_TOKEN}(?:\s+{_NAME_TOKEN}){{1,2}})\s*(?:[,;.\-]|$)")
+NAME_PATTERNS = [EXPLICIT_NAME, LEADING_NAME]
+# capitalized words that are not names
+NOT_NAME = {
+    "i", "i'm", "im", "it's", "its", "it", "this", "name", "hi", "hello", "hey", "my", "the", "dr", "doctor", "yes", "no", "please", "thanks", "thank", "ssn", "dob",
+    "born", "phone", "book", "cancel", "reschedule", "appointment", "today", "tomorrow", "good", "morning",
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday", *MONTHS,
+}
+
+# Words a message may hold besides the identity values and still get the fixed reply without the LLM.
+# Anything else (symptoms, corrections, questions, other numbers) is for the LLM to read, it also rates the urgency:
+# an allowlist, because a list of alarming words is never complete.
+IDENTITY_WORDS = frozenset("""
+    hi hello hey good morning afternoon evening thanks thank you please
+    i im i'm i'd id am is it it's its this my me name full first last
+    date of birth born dob birthday b d
+    ssn social security number four 4 digits digit are phone cell mobile tel
+    and or the a an to with for here
+    like want would need book schedule make new appointment cancel reschedule
+""".split())
+WORD = re.compile(r"[\w']+")
+
+@dataclass(frozen=True)
+class IdentityExtraction:
+    """
+    Identity fields found in a message with deterministic rules (None when absent or ambiguous).
+    """
+    name: Optional[str] = None
+    date_of_birth: Optional[str] = None # ISO (YYYY-MM-DD)
+    phone_number: Optional[str] = None # 111-111-1111
+    ssn_last_4: Optional[str] = None
+    needs_review: bool = False # the message has more than identity details for the LLM to handle
+
+    def fields(self) -> dict[str, str]:
+        """
+        The fields that were found, as UpdateInfo keyword arguments.
+        """
+        return {k: v for k, v in asdict(self).items() if k != "needs_review" and v is not None}
+
+def _to_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+def extract_dates(text: str) -> list[tuple[date, re.Match]]:
+    found = []
+    for pattern, order in DATE_PATTERNS:
+        for match in pattern.finditer(text):
+            g = match.groupdict()
+            year = int(g["y"])
+            if order == "ab":
+                a, b = int(g["a"]), int(g["b"])
+                month, day = (a, b) if a <= 12 else (b, a)
+            else:
+                month = MONTHS[g["m"].lower()] if not g["m"].isdigit() else int(g["m"])
+                day = int(g["d"])
+            if (d := _to_date(year, month, day)) is not None:
+                found.append((d, match))
+    return found
+
+def day_month_ambiguous(match: re.Match) -> bool:
+    # 05/04/1960: May 4 or April 5
+    g = match.groupdict()
+    return "a" in g and g["a"] != g["b"] and int(g["a"]) <= 12 and int(g["b"]) <= 12
+
+def extract_date_of_birth(text: str, today: date) -> tuple[Optional[str], list[tuple[int, int]], bool]:
+    """
+    The date of birth, the spans of every date in the text and whether its day and month could be swapped.
+    A single date in the past is the DOB, with several dates only the one right after "born"/"DOB".
+    """
+    dates = extract_dates(text)
+    spans = [m.span() for _, m in dates]
+    past = [(d, m) for d, m in dates if date(1900, 1, 1) <= d < today]
+    if len({d for d, _ in past}) == 1 and len(dates) == len(past):
+        return past[0][0].isoformat(), spans, any(day_month_ambiguous(m) for _, m in past)
+    for d, m in past:
+        if DOB_KEYWORD.search(text[max(0, m.start() - 20):m.start()]):
+            return d.isoformat(), spans, day_month_ambiguous(m)
+    return None, spans, False
+
+def _outside(span: tuple[int, int], taken: list[tuple[int, int]]) -> bool:
+    return all(span[1] <= start or span[0] >= end for start, end in taken)
+
+def extract_phone(text: str, taken: list[tuple[int, int]]) -> tuple[Optional[str], list[tuple[int, int]]]:
+    phones = {(m.group(1), m.group(2), m.group(3)): m.span() for m in PHONE.finditer(text) if _outside(m.span(), taken)}
+    if len(phones) != 1:
+        return None, list(phones.values())
+    (area, prefix, line), span = next(iter(phones.items()))
+    return f"{area}-{prefix}-{line}", [span]
+
+def extract_ssn_last_4(text: str, taken: list[tuple[int, int]]) -> Optional[str]:
+    for pattern in (FULL_SSN, SSN_KEYWORD):
+        found = {m.group(1) for m in pattern.finditer(text) if _outside(m.span(1), taken)}
+        if len(found) == 1:
+            return found.pop()
+        if found:
+            return None
+    bare = [m for m in BARE_FOUR_DIGITS.finditer(text) if _outside(m.span(), taken) and not NOT_SSN_BEFORE.search(text[:m.start()])]
+    return bare[0].group(1) if len(bare) == 1 else None
+
+def extract_name(text: str) -> tuple[Optional[str], bool]:
+    """
+    The name and whether the patient said it was their name ("my name is", "name:").
+    """
+    names, explicit = set(), set()
+    for pattern in NAME_PATTERNS:
+        for match in pattern.finditer(text):
+            tokens = match.group("name").split()
+            if not any(t.lower().strip(".") in NOT_NAME for t in tokens):
+                names.add(" ".join(tokens))
+                if pattern is EXPLICIT_NAME:
+                    explicit.add(" ".join(tokens))
+    if len(names) != 1:
+        return None, False
+    name = names.pop()
+    return name, name in explicit
+
+def needs_review(text: str, name: Optional[str], ssn_last_4: Optional[str], taken: list[tuple[int, int]]) -> bool:
+    """
+    True unless the text is only identity values (dates, phone and SSN spans, the name) and IDENTITY_WORDS.
+    """
+    if "?" in text:
+        return True
+    for start, end in sorted(taken, reverse=True):
+        text = text[:start] + " " + text[end:]
+    name_words = set(name.lower().split()) if name else set()
+    for word in WORD.findall(text.lower()):
+        word = word.strip("'")
+        if word and word not in IDENTITY_WORDS and word not in name_words and word != ssn_last_4:
+            return True
+    return False
+
+def extract_identity(text: str, today: Optional[date] = None, confirmed_name: Optional[str] = None) -> IdentityExtraction:
+    """
+    Name, DOB, phone number and SSN last 4 in common formats. A field is only filled when the rules
+    find exactly one unambiguous value for it, anything unclear is left to the LLM.
+    Guesses are filled but need review: a name the message merely starts with (unless it is
+    `confirmed_name`, the one the LLM took from an earlier turn) and a date whose day and month could be swapped.
+    """
+    date_of_birth, date_spans, date_ambiguous = extract_date_of_birth(text, today or date.today())
+    phone, phone_spans = extract_phone(text, date_spans)
+    name, name_explicit = extract_name(text)
+    name_guessed = name is not None and not name_explicit and (confirmed_name or "").lower() != name.lower()
+    ssn_last_4 = extract_ssn_last_4(text, date_spans + phone_spans)
+    ssn_spans = [m.span() for m in FULL_SSN.finditer(text)]
+    return IdentityExtraction(
+        name=name,
+        date_of_birth=date_of_birth,
+        phone_number=phone,
+        ssn_last_4=ssn_last_4,
+        needs_review=name_guessed or date_ambiguous or needs_review(text, name, ssn_last_4, date_spans + phone_spans + ssn_spans),
+    )
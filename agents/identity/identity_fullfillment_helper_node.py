@@ -2,14 +2,18 @@ from agents.models.state import ConversationState
 from agents.llms import get_llm_mini_model
 from agents.identity.prompts.identity_assistant import identity_fullfillment_helper_prompt
 from agents.identity.identity_collector_node import UpdateInfo, user_to_prompt_vars, merge_users
-from logging_config import llm_logger
+from logging_config import llm_logger, payload
 from typing import Literal
 from langchain_core.messages import HumanMessage
 from langgraph.types import interrupt
+from langgraph.constants import TAG_NOSTREAM
 from services.user_service import user_service
 
 llm = get_llm_mini_model(temperature=0.0)
 
+# built once, with_structured_output converts the schema to a tool on every call
+identity_fullfillment_helper_chain = identity_fullfillment_helper_prompt | llm.with_structured_output(UpdateInfo).with_config(tags=[TAG_NOSTREAM])
+
 def ask_user_to_correct_information(state: ConversationState):
     """
     Ask the user to correct their information.
@@ -49,7 +53,7 @@ def validate_corrected_input(state: ConversationState) -> Literal["success", "fa
         return "success"
     return "retry"
 
-def identity_fullfillment_helper_node(state: ConversationState) -> dict:
+async def identity_fullfillment_helper_node(state: ConversationState) -> dict:
     """
     Helper node to help the user with their identity information.
     If user has made too many corrections, finish the conversation and offer them either new patient form or support line
@@ -58,12 +62,9 @@ def identity_fullfillment_helper_node(state: ConversationState) -> dict:
     user = state.get("user")
 
     number_of_corrections = state.get("identity_fullfillment_number_of_corrections", 0)
-    llm_with_structured_output = llm.with_structured_output(UpdateInfo)
-    chain = identity_fullfillment_helper_prompt | llm_with_structured_output
-
     template_params = user_to_prompt_vars(state)
-    response = chain.invoke(template_params)
-    llm_logger.info(f"identity_fullfillment_helper_node response: {response}")
+    response = await identity_fullfillment_helper_chain.ainvoke(template_params)
+    llm_logger.info("identity_fullfillment_helper_node response: {}", lambda: payload(response))
 
     updated_user = merge_users(user, response)
     number_of_corrections = number_of_corrections + 1
@@ -7,8 +7,10 @@ from pydantic import BaseModel, Field
 from agents.llms import get_llm_mini_model
 from langchain_core.messages import SystemMessage
 from langgraph.types import interrupt
-from logging_config import llm_logger
-from services.user_service import user_service
+from langgraph.constants import TAG_NOSTREAM
+from logging_config import llm_logger, payload
+from agents.prefetch import identity_prefetch, thread_id_of
+from langchain_core.runnables import RunnableConfig
 
 llm = get_llm_mini_model(temperature=0.0)
 
@@ -21,7 +23,10 @@ class NewPatientIntent(BaseModel):
         description="A brief explanation of why you classified the intent this way."
     )
 
-def new_patient_confirmation_request_node(state: ConversationState):
+# built once, with_structured_output converts the schema to a tool on every call
+new_patient_classifier = llm.with_structured_output(NewPatientIntent).with_config(tags=[TAG_NOSTREAM])
+
+async def new_patient_confirmation_request_node(state: ConversationState):
     """
     Asks the user if they are a new patient.
     """
@@ -29,14 +34,13 @@ def new_patient_confirmation_request_node(state: ConversationState):
     user_response_text = interrupt(msg)
 
     new_human_message = HumanMessage(content=user_response_text)
-    structured_llm = llm.with_structured_output(NewPatientIntent)
     messages_to_send = [
         SystemMessage(content="The user was asked if they are a new patient. Classify their response."),
         new_human_message,
     ]
-    classification = structured_llm.invoke(messages_to_send)
+    classification = await new_patient_classifier.ainvoke(messages_to_send)
     
-    llm_logger.info(classification)
+    llm_logger.info("new patient classification: {}", lambda: payload(classification))
 
     return {
         "messages": [new_human_message],
@@ -45,7 +49,7 @@ def new_patient_confirmation_request_node(state: ConversationState):
     }
 
 
-def identity_verification_node(state: ConversationState) -> dict:
+async def identity_verification_node(state: ConversationState, config: RunnableConfig | None = None) -> dict:
     """
         Decides the next step:
         1. If tool calls exist -> update state.
@@ -56,7 +60,8 @@ def identity_verification_node(state: ConversationState) -> dict:
 
     # simple check if user provided all details and if found in the database
     if user.name and user.date_of_birth and (user.phone or user.ssn_last_4):
-        user = user_service.get_user(user.name, user.date_of_birth, user.phone, user.ssn_last_4)
+        # usually answered already by the lookup the identity collector started
+        user = await identity_prefetch.verified_user(thread_id_of(config), user)
         if user is not None:
             return {
                 "user_verified": True,
@@ -0,0 +1,90 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+from agents.identity.prompts.intent_prompt import IntentResult
+
+def normalize_intent_text(text: str) -> str:
+    """
+    Phrasings that only differ in case, punctuation or spacing share a key.
+    """
+    text = re.sub(r"[^\w\s]", "", text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+class IntentCache:
+    """
+    LRU + TTL cache of IntentResult by normalized message text, in front of the intent LLM call.
+
+    Holds at most `max_size` entries (least recently used evicted first), entries older than
+    `ttl_seconds` are dropped when they are looked up. Thread safe, hits/misses/evictions are counted.
+    """
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = 3600, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: OrderedDict[str, tuple[IntentResult, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, text: str) -> Optional[IntentResult]:
+        """
+        The cached intent for the text (with original_message set to this text), or None.
+        """
+        key = normalize_intent_text(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None and self.clock() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry[0].model_copy(update={"original_message": text})
+
+    def put(self, text: str, result: IntentResult) -> None:
+        if self.max_size <= 0:
+            return
+        key = normalize_intent_text(text)
+        with self._lock:
+            self._entries[key] = (result, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hit_ratio,
+        }
+
+def create_intent_cache() -> IntentCache:
+    """
+    INTENT_CACHE_SIZE (0 disables the cache), INTENT_CACHE_TTL_SECONDS (0 keeps entries until evicted).
+    """
+    ttl = float(os.getenv("INTENT_CACHE_TTL_SECONDS", "3600"))
+    return IntentCache(max_size=int(os.getenv("INTENT_CACHE_SIZE", "1024")), ttl_seconds=ttl or None)
@@ -1,20 +1,139 @@
-from agents.models.intent import Intent, BOOK_APPOINTMENT_INTENT, ID_VERIFICATION_INTENT
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from typing import Iterable, Optional, Sequence
+from langchain_core.messages import BaseMessage, HumanMessage
+from agents.identity.intent_cache import normalize_intent_text
+from agents.identity.prompts.intent_prompt import IntentResult
+from agents.intent_examples import INTENT_TRAINING_EXAMPLES
 from agents.models.state import ConversationState
-from langchain_core.messages import HumanMessage
-from typing import Sequence
-from langchain_core.messages import BaseMessage
 
-def detect_intents_from_messages(messages: Sequence[BaseMessage]) -> list[Intent]:
+# local answers below this confidence go to the intent LLM (above 1 disables the local classifier)
+LOCAL_INTENT_THRESHOLD = float(os.getenv("INTENT_LOCAL_THRESHOLD", "0.9"))
+RULE_CONFIDENCE = 0.95
+
+_APPOINTMENT = r"(appointment|appt|booking|visit|checkup|check up)s?"
+# a question about booking or cancelling ("did I book ...", "how do I cancel ...") is not a request to do it
+_REQUEST = r"^(?!(did|do|does|how|what|why|where|who|was|were|is|are|have|has)\b)"
+
+# checked in order, the first intent with a matching pattern wins:
+# specific verbs (reschedule, cancel) before the generic "I want an appointment" of add_appointment
+INTENT_RULES: list[tuple[str, list[re.Pattern]]] = [
+    ("reschedule_appointment", [re.compile(p) for p in [
+        r"\b(reschedul|rebook)",
+        rf"\b(move|change|shift|push|switch)\b.*\b{_APPOINTMENT}\b",
+        r"\bpostpone\b",
+        r"\bcancel\b.*\b(book|schedule|make)\b.*\b(new|another|instead)\b",
+    ]]),
+    ("cancel_appointment", [re.compile(p) for p in [
+        rf"{_REQUEST}.*\bcancel(l?ing|l?ed)?\b.*\b({_APPOINTMENT}|it|that|this|them)\b",
+        rf"{_REQUEST}.*\bcall (it )?off\b",
+        rf"{_REQUEST}.*\b(drop|delete|remove|scrap)\b.*\b{_APPOINTMENT}\b",
+    ]]),
+    ("list_appointments", [re.compile(p) for p in [
+        rf"\b(list|show|view|see|check|tell me)\b.*\b(my|upcoming|scheduled)\b.*\b({_APPOINTMENT}|schedule|calendar)\b",
+        rf"\bwhat {_APPOINTMENT} do i have\b",
+        rf"\bwhen is my (next )?{_APPOINTMENT}\b",
+        rf"\bdo i have (any )?{_APPOINTMENT}\b",
+    ]]),
+    ("add_appointment", [re.compile(p) for p in [
+        rf"{_REQUEST}.*\bbook\b.*\b(me|us|him|her|an?|new|{_APPOINTMENT}|slot|time)\b",
+        rf"{_REQUEST}.*\b(make|schedule|set up|get|need|want|like)\b.*\b(an?|new)( new)? {_APPOINTMENT}\b",
+        rf"{_REQUEST}.*\b(see|visit) (a |the )?(dr|doctor|physician)\b",
+    ]]),
+]
+
+# "I don't want to cancel" must not hit the cancel rule
+NEGATION = re.compile(r"\b(dont|do not|not|never|no longer|wont|cant|cannot)\b")
+
+def tokenize(text: str) -> list[str]:
+    """
+    Normalized words and word bigrams, numbers (dates, SSN, phone numbers) collapse to one token.
+    """
+    words = ["<num>" if w.isdigit() else w for w in normalize_intent_text(text).split()]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+class LocalIntentClassifier:
+    """
+    Intent classification without an LLM call: keyword rules for the obvious phrasings,
+    then a multinomial naive Bayes model over words and word bigrams (Laplace smoothed)
+    trained on labelled examples. The confidence is the rule confidence or the model's posterior.
+    """
+    def __init__(self, examples: Iterable[tuple[str, str]], rules: list[tuple[str, list[re.Pattern]]] = INTENT_RULES):
+        self.rules = rules
+        self.train(examples)
+
+    def train(self, examples: Iterable[tuple[str, str]]) -> None:
+        docs: dict[str, int] = Counter()
+        counts: dict[str, Counter] = defaultdict(Counter)
+        for text, intent in examples:
+            docs[intent] += 1
+            counts[intent].update(tokenize(text))
+        vocabulary = {token for c in counts.values() for token in c}
+        total_docs = sum(docs.values())
+        self.intents = sorted(docs)
+        self.log_prior = {i: math.log(docs[i] / total_docs) for i in self.intents}
+        self.log_likelihood: dict[str, dict[str, float]] = {}
+        self.log_unknown: dict[str, float] = {}
+        for intent in self.intents:
+            denominator = sum(counts[intent].values()) + len(vocabulary)
+            self.log_likelihood[intent] = {t: math.log((n + 1) / denominator) for t, n in counts[intent].items()}
+            self.log_unknown[intent] = math.log(1 / denominator)
+        self.vocabulary = vocabulary
+
+    def match_rules(self, text: str) -> Optional[str]:
+        normalized = normalize_intent_text(text)
+        if NEGATION.search(normalized):
+            return None
+        for intent, patterns in self.rules:
+            if any(p.search(normalized) for p in patterns):
+                return intent
+        return None
+
+    def predict(self, text: str) -> tuple[str, float]:
+        """
+        Naive Bayes intent and posterior. Tokens never seen in training are ignored,
+        a message without known tokens gets the prior.
+        """
+        tokens = [t for t in tokenize(text) if t in self.vocabulary]
+        scores = {
+            intent: self.log_prior[intent] + sum(self.log_likelihood[intent].get(t, self.log_unknown[intent]) for t in tokens)
+            for intent in self.intents
+        }
+        best = max(scores, key=scores.get)
+        total = sum(math.exp(s - scores[best]) for s in scores.values())
+        return best, 1 / total
+
+    def classify(self, text: str) -> IntentResult:
+        intent = self.match_rules(text)
+        if intent is not None:
+            return IntentResult(intent=intent, confidence=RULE_CONFIDENCE, original_message=text)
+        intent, posterior = self.predict(text)
+        return IntentResult(intent=intent, confidence=round(posterior, 4), original_message=text)
+
+local_intent_classifier = LocalIntentClassifier(INTENT_TRAINING_EXAMPLES)
+
+def classify_intent_locally(text: str) -> Optional[IntentResult]:
+    """
+    The local classification when it is confident enough (LOCAL_INTENT_THRESHOLD), otherwise None.
+    """
+    result = local_intent_classifier.classify(text)
+    return result if result.confidence >= LOCAL_INTENT_THRESHOLD else None
+
+def detect_intents_from_messages(messages: Sequence[BaseMessage]) -> list[IntentResult]:
     """
-    Detect the intents from the messages.
+    Detect the intents from the messages (the last human message), only confident local classifications.
     """
     last_user = next(
         (m for m in reversed(messages) if isinstance(m, HumanMessage)), None)
-    
+    if last_user is None or not isinstance(last_user.content, str):
+        return []
+    result = classify_intent_locally(last_user.content)
+    return [result] if result is not None else []
 
-def classify_intent(state: ConversationState) -> list[Intent]:
+def classify_intent(state: ConversationState) -> list[IntentResult]:
     """
     Classify the intent of the message.
     """
-    # TODO: Implement intent classification logic
-    return [BOOK_APPOINTMENT_INTENT, ID_VERIFICATION_INTENT]
\ No newline at end of file
+    return detect_intents_from_messages(state.get("messages", []))
@@ -0,0 +1,108 @@
+# Labelled messages the local intent classifier is trained on (agents/intent_classifier.py).
+# The held-out set it is measured on is tests/fixtures/intents.jsonl, keep the two disjoint.
+
+INTENT_TRAINING_EXAMPLES: list[tuple[str, str]] = [
+    # add_appointment
+    ("I want to add an appointment for tomorrow at 10am", "add_appointment"),
+    ("I need to see a doctor for a headache", "add_appointment"),
+    ("book an appointment", "add_appointment"),
+    ("I'd like to book an appointment with Dr. Smith", "add_appointment"),
+    ("can I get an appointment next week", "add_appointment"),
+    ("schedule a visit for Monday morning", "add_appointment"),
+    ("I would like to make an appointment", "add_appointment"),
+    ("set up a checkup for next month", "add_appointment"),
+    ("do you have any openings on Friday", "add_appointment"),
+    ("is Dr. Lang Smith available on Tuesday", "add_appointment"),
+    ("I need a new appointment", "add_appointment"),
+    ("I want to come in for a check up", "add_appointment"),
+    ("new appointment please", "add_appointment"),
+    ("get me in with the doctor as soon as possible", "add_appointment"),
+    ("when is the next free slot", "add_appointment"),
+    ("my back hurts and I need to be seen", "add_appointment"),
+    ("I'd like to schedule a follow up visit", "add_appointment"),
+    ("can you fit me in this afternoon", "add_appointment"),
+    ("reserve a slot for me on the 12th", "add_appointment"),
+    ("I want to see Dr. Doe next week", "add_appointment"),
+    # cancel_appointment
+    ("I want to cancel my appointment for tomorrow", "cancel_appointment"),
+    ("cancel my appointment", "cancel_appointment"),
+    ("please cancel the appointment on Friday", "cancel_appointment"),
+    ("I can't make it to my appointment, cancel it", "cancel_appointment"),
+    ("I won't be able to come, please call it off", "cancel_appointment"),
+    ("remove my booking for next week", "cancel_appointment"),
+    ("delete my appointment with Dr. Smith", "cancel_appointment"),
+    ("I no longer need my appointment", "cancel_appointment"),
+    ("drop my visit on Monday", "cancel_appointment"),
+    ("cancel the 3pm one", "cancel_appointment"),
+    ("I'd like to cancel", "cancel_appointment"),
+    ("I won't need the appointment anymore", "cancel_appointment"),
+    ("scrap my checkup tomorrow", "cancel_appointment"),
+    ("cancel all my appointments", "cancel_appointment"),
+    ("I'm feeling better, no need for the visit", "cancel_appointment"),
+    # reschedule_appointment
+    ("I want to reschedule my appointment for next week", "reschedule_appointment"),
+    ("reschedule my appointment", "reschedule_appointment"),
+    ("can I move my appointment to Thursday", "reschedule_appointment"),
+    ("change my appointment time to 3pm", "reschedule_appointment"),
+    ("push my appointment back a week", "reschedule_appointment"),
+    ("I need a different time for my visit", "reschedule_appointment"),
+    ("postpone my checkup", "reschedule_appointment"),
+    ("can we shift my appointment to the afternoon", "reschedule_appointment"),
+    ("move the Friday appointment to Monday", "reschedule_appointment"),
+    ("I'd like to switch my appointment to another day", "reschedule_appointment"),
+    ("something came up, can we do a later date", "reschedule_appointment"),
+    ("change the date of my booking", "reschedule_appointment"),
+    ("can I come in earlier than my current appointment", "reschedule_appointment"),
+    ("rebook my appointment for next month", "reschedule_appointment"),
+    ("I need to change when I'm seeing Dr. Smith", "reschedule_appointment"),
+    # list_appointments
+    ("show me my upcoming appointments", "list_appointments"),
+    ("what appointments do I have", "list_appointments"),
+    ("list my appointments", "list_appointments"),
+    ("when is my next appointment", "list_appointments"),
+    ("do I have any appointments this week", "list_appointments"),
+    ("can you check my schedule", "list_appointments"),
+    ("which doctor am I seeing on Friday", "list_appointments"),
+    ("remind me when my visit is", "list_appointments"),
+    ("what time is my appointment tomorrow", "list_appointments"),
+    ("show my bookings", "list_appointments"),
+    ("view my scheduled visits", "list_appointments"),
+    ("am I booked for anything next week", "list_appointments"),
+    ("tell me my appointments", "list_appointments"),
+    ("what's on my calendar", "list_appointments"),
+    ("see all my appointments", "list_appointments"),
+    # questions about bookings are not requests to book or cancel
+    ("did I book an appointment already", "list_appointments"),
+    ("have I booked anything with Dr. Smith", "list_appointments"),
+    ("did I already make a booking for next week", "list_appointments"),
+    # other
+    ("I'm not sure what I want to do", "other"),
+    ("My name is Patrick", "other"),
+    ("My date of birth is Jan 1st 2000", "other"),
+    ("My last 4 digits of my SSN are 1234", "other"),
+    ("My phone number is 123-456-7890", "other"),
+    ("hello", "other"),
+    ("hi there", "other"),
+    ("yes", "other"),
+    ("no", "other"),
+    ("thanks", "other"),
+    ("John Doe, born 1960-01-01", "other"),
+    ("it's Jane Smith", "other"),
+    ("ssn 5678", "other"),
+    ("born March 3 1985", "other"),
+    ("what are your opening hours", "other"),
+    ("where is the clinic", "other"),
+    ("do you take my insurance", "other"),
+    ("can I talk to a human", "other"),
+    ("ok", "other"),
+    ("sure", "other"),
+    ("that's right", "other"),
+    ("my phone is 555 1234", "other"),
+    ("good morning", "other"),
+    ("bye", "other"),
+    ("how much does a visit cost", "other"),
+    ("how do I cancel my subscription", "other"),
+    ("can I cancel my insurance here", "other"),
+    ("what is your cancellation policy", "other"),
+    ("how does booking work", "other"),
+]
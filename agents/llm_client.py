@@ -0,0 +1,245 @@
+import asyncio
+import os
+import random
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Iterator
+import httpx
+import openai
+from langchain_core.messages import BaseMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from agents.hooks.metrics import graph_metrics
+from agents.llm_limiter import LLMConcurrencyLimiter, TokenBucket
+
+# transient provider errors worth another attempt: rate limits, timeouts, dropped connections, 5xx
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+def retry_after(exc: BaseException) -> float | None:
+    # seconds form of the Retry-After header, the HTTP date form is ignored
+    response = getattr(exc, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: float | None = None) -> float:
+    """
+    Full jitter: uniform in [0, min(cap, base * 2**attempt)], so clients that failed together
+    don't come back together. A Retry-After sent by the provider is the minimum.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    return max(delay, retry_after) if retry_after is not None else delay
+
+class LLMTier:
+    """
+    Traffic shaping of one model tier: a cap on the requests in flight, request and token per minute
+    budgets (0: none) and jittered retries of transient errors. The time a request waits for its budget
+    and slot (llm_queue_wait_seconds) is recorded apart from the provider call (llm_request_duration_seconds).
+    A request gives its slot back while it backs off.
+    """
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 32,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+    ):
+        self.name = name
+        self.limiter = LLMConcurrencyLimiter(max_concurrency)
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    @asynccontextmanager
+    async def admitted(self, estimated_tokens: int) -> AsyncIterator[None]:
+        start = time.perf_counter()
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None:
+            await self.tokens.acquire(estimated_tokens)
+        async with self.limiter.slot():
+            with self._timed(start):
+                yield
+
+    @contextmanager
+    def admitted_sync(self, estimated_tokens: int) -> Iterator[None]:
+        start = time.perf_counter()
+        if self.requests is not None:
+            self.requests.acquire_sync(1)
+        if self.tokens is not None:
+            self.tokens.acquire_sync(estimated_tokens)
+        with self.limiter.sync_slot():
+            with self._timed(start):
+                yield
+
+    @contextmanager
+    def _timed(self, queued_at: float) -> Iterator[None]:
+        if graph_metrics.enabled:
+            graph_metrics.llm_queue_wait.observe(time.perf_counter() - queued_at, self.name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if graph_metrics.enabled:
+                graph_metrics.llm_request_duration.observe(time.perf_counter() - start, self.name)
+
+    def should_retry(self, attempt: int, exc: BaseException) -> bool:
+        return attempt < self.max_retries and isinstance(exc, RETRYABLE_ERRORS)
+
+    def _backoff_delay(self, attempt: int, exc: BaseException) -> float:
+        if graph_metrics.enabled:
+            graph_metrics.llm_retries.inc(self.name, type(exc).__name__)
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after(exc))
+
+    async def backoff(self, attempt: int, exc: BaseException) -> None:
+        await asyncio.sleep(self._backoff_delay(attempt, exc))
+
+    def backoff_sync(self, attempt: int, exc: BaseException) -> None:
+        time.sleep(self._backoff_delay(attempt, exc))
+
+    def reconcile(self, estimated_tokens: int, used_tokens: int | None) -> None:
+        # the token budget was taken on an estimate, settle it with the usage the provider reported
+        if self.tokens is not None and used_tokens is not None:
+            self.tokens.debit(used_tokens - estimated_tokens)
+
+class TierLimited:
+    """
+    Chat model mixin sending the provider requests (_agenerate, _astream and the sync _generate, _stream)
+    through the LLMTier named by the model's `tier` field. Goes before the model class:
+    class LimitedChatOpenAI(TierLimited, ChatOpenAI). A stream is only retried when it failed before its first chunk.
+    """
+    def _estimated_tokens(self, messages: list[BaseMessage]) -> int:
+        return count_tokens_approximately(messages) + (getattr(self, "max_tokens", None) or 0)
+
+    async def _agenerate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tier = llm_tiers[self.tier]
+        estimate = self._estimated_tokens(messages)
+        attempt = 0
+        while True:
+            try:
+                async with tier.admitted(estimate):
+                    result = await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as exc:
+                if not tier.should_retry(attempt, exc):
+                    raise
+                await tier.backoff(attempt, exc)
+                attempt += 1
+                continue
+            tier.reconcile(estimate, _total_tokens(g.message for g in result.generations))
+            return result
+
+    async def _astream(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        tier = llm_tiers[self.tier]
+        estimate = self._estimated_tokens(messages)
+        attempt = 0
+        while True:
+            streamed = False
+            used = None
+            try:
+                async with tier.admitted(estimate):
+                    async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                        streamed = True
+                        used = _total_tokens([chunk.message]) or used
+                        yield chunk
+            except Exception as exc:
+                if streamed or not tier.should_retry(attempt, exc):
+                    raise
+                await tier.backoff(attempt, exc)
+                attempt += 1
+                continue
+            tier.reconcile(estimate, used)
+            return
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tier = llm_tiers[self.tier]
+        estimate = self._estimated_tokens(messages)
+        attempt = 0
+        while True:
+            try:
+                with tier.admitted_sync(estimate):
+                    result = super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as exc:
+                if not tier.should_retry(attempt, exc):
+                    raise
+                tier.backoff_sync(attempt, exc)
+                attempt += 1
+                continue
+            tier.reconcile(estimate, _total_tokens(g.message for g in result.generations))
+            return result
+
+    def _stream(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        tier = llm_tiers[self.tier]
+        estimate = self._estimated_tokens(messages)
+        attempt = 0
+        while True:
+            streamed = False
+            used = None
+            try:
+                with tier.admitted_sync(estimate):
+                    for chunk in super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                        streamed = True
+                        used = _total_tokens([chunk.message]) or used
+                        yield chunk
+            except Exception as exc:
+                if streamed or not tier.should_retry(attempt, exc):
+                    raise
+                tier.backoff_sync(attempt, exc)
+                attempt += 1
+                continue
+            tier.reconcile(estimate, used)
+            return
+
+def _total_tokens(messages: Iterator[Any]) -> int | None:
+    for message in messages:
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            return usage.get("total_tokens")
+    return None
+
+def create_llm_tiers() -> dict[str, LLMTier]:
+    """
+    One LLMTier per model tier, settings per worker process (TIER is MINI or LARGE):
+    - LLM_{TIER}_MAX_CONCURRENCY: requests in flight (default LLM_MAX_CONCURRENCY, 32; 0: no cap)
+    - LLM_{TIER}_RPM, LLM_{TIER}_TPM: requests and tokens per minute (default 0: no budget)
+    - LLM_MAX_RETRIES (3), LLM_BACKOFF_BASE_SECONDS (0.5), LLM_BACKOFF_MAX_SECONDS (20): retries of transient errors
+    """
+    default_concurrency = os.getenv("LLM_MAX_CONCURRENCY", "32")
+    return {
+        name: LLMTier(
+            name,
+            max_concurrency=int(os.getenv(f"LLM_{name.upper()}_MAX_CONCURRENCY", default_concurrency)),
+            requests_per_minute=int(os.getenv(f"LLM_{name.upper()}_RPM", "0")),
+            tokens_per_minute=int(os.getenv(f"LLM_{name.upper()}_TPM", "0")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+            backoff_base=float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5")),
+            backoff_max=float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "20")),
+        )
+        for name in ("mini", "large")
+    }
+
+llm_tiers = create_llm_tiers()
+
+http_clients: tuple[httpx.Client, httpx.AsyncClient] | None = None
+
+def get_http_clients() -> tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    Keep-alive HTTP pools (sync, async) shared by the OpenAI models of every tier:
+    LLM_POOL_MAX_CONNECTIONS (default 64) connections, of which LLM_POOL_MAX_KEEPALIVE (32)
+    are kept open for LLM_POOL_KEEPALIVE_SECONDS (30) when idle.
+    """
+    global http_clients
+    if http_clients is None:
+        limits = httpx.Limits(
+            max_connections=int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "64")),
+            max_keepalive_connections=int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "32")),
+            keepalive_expiry=float(os.getenv("LLM_POOL_KEEPALIVE_SECONDS", "30")),
+        )
+        http_clients = (httpx.Client(limits=limits), httpx.AsyncClient(limits=limits))
+    return http_clients
@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Callable, Iterator
+
+class _ThreadWaiter:
+    def __init__(self):
+        self.event = threading.Event()
+
+    def grant(self) -> bool:
+        self.event.set()
+        return True
+
+class _LoopWaiter:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False # set under the limiter lock
+
+    def grant(self) -> bool:
+        try:
+            self.loop.call_soon_threadsafe(self._wake)
+        except RuntimeError:
+            return False # the loop is closed, nobody is waiting there anymore
+        self.granted = True
+        return True
+
+    def _wake(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+class LLMConcurrencyLimiter:
+    """
+    Caps the LLM requests in flight, one per model tier (see agents/llm_client.py).
+    Requests over the cap wait for a slot in FIFO order, `limit` 0 disables the cap.
+    One count of the slots per process: async requests (slot, from any event loop) and sync ones
+    (sync_slot, from threads) take them from the same `limit`, a released slot is handed to the
+    first waiter directly. A new limit takes effect for the requests after the change.
+    """
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.peak = 0
+        self.waited = 0 # requests that found every slot taken
+        self._waiters: deque[_ThreadWaiter | _LoopWaiter] = deque()
+        # the slots and counters are taken from the loops and from threads
+        self._lock = threading.Lock()
+
+    def _take(self, waiter: _ThreadWaiter | _LoopWaiter) -> bool:
+        # a free slot (True) or a place in the queue (False)
+        with self._lock:
+            if self.in_flight < self.limit and not self._waiters:
+                self._occupy()
+                return True
+            self._waiters.append(waiter)
+            self.waited += 1
+            return False
+
+    def _occupy(self) -> None:
+        # the caller holds the lock
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+
+    def _release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            while self._waiters and self.in_flight < self.limit:
+                if self._waiters.popleft().grant():
+                    self._occupy()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if not self.limit:
+            yield
+            return
+        waiter = _LoopWaiter(asyncio.get_running_loop())
+        if not self._take(waiter):
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self._lock:
+                    granted = waiter.granted
+                    if not granted:
+                        self._waiters.remove(waiter)
+                if granted:
+                    self._release()
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    @contextmanager
+    def sync_slot(self) -> Iterator[None]:
+        if not self.limit:
+            yield
+            return
+        waiter = _ThreadWaiter()
+        if not self._take(waiter):
+            waiter.event.wait()
+        try:
+            yield
+        finally:
+            self._release()
+
+class TokenBucket:
+    """
+    Per minute budget (requests or tokens) refilled continuously, holding at most one minute's worth.
+    acquire() (acquire_sync() from threads) waits until the amount is available, callers are served
+    in FIFO order so a large request is not starved by small ones. The level may go below zero when a request turned out
+    bigger than estimated (debit), later callers then wait for the debt to be refilled.
+    """
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60 # per second
+        self.clock = clock
+        self.level = float(per_minute)
+        self._updated = clock()
+        self._locks: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock] = weakref.WeakKeyDictionary()
+        self._thread_lock = threading.Lock() # FIFO among the sync callers
+        self._level_lock = threading.Lock() # the level, never held while waiting
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.level = min(self.per_minute, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self, amount: float) -> float:
+        # takes the amount and returns 0, or returns the seconds until it is available
+        with self._level_lock:
+            self._refill()
+            if self.level < amount:
+                return (amount - self.level) / self.rate
+            self.level -= amount
+            return 0.0
+
+    async def acquire(self, amount: float) -> None:
+        # a request larger than the whole budget would wait forever, it waits for a full bucket instead
+        amount = min(amount, self.per_minute)
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = self._locks[loop] = asyncio.Lock()
+        async with lock:
+            while (wait := self._take(amount)) > 0:
+                await asyncio.sleep(wait)
+
+    def acquire_sync(self, amount: float) -> None:
+        amount = min(amount, self.per_minute)
+        with self._thread_lock:
+            while (wait := self._take(amount)) > 0:
+                time.sleep(wait)
+
+    def debit(self, amount: float) -> None:
+        """
+        Corrects the last acquire by `amount` (negative: gives back what was not used).
+        """
+        with self._level_lock:
+            self._refill()
+            self.level = min(self.per_minute, self.level - amount)
@@ -1,5 +1,8 @@
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from agents.hooks.metrics import metrics_callback
+from agents.llm_client import TierLimited, get_http_clients
+from agents.scripted_llm import RecordingCallbackHandler, get_scripted_llm
 import os
 
 load_dotenv()
@@ -7,12 +10,40 @@ load_dotenv()
 mini_model = None
 large_model = None
 
-def get_llm_mini_model(temperature: float = 0.0, max_tokens: int = 1000, top_p: float = 1, max_retries: int = 3, timeout: int = 10):
+class LimitedChatOpenAI(TierLimited, ChatOpenAI):
+    """
+    ChatOpenAI shaped by the LLMTier named `tier` (agents/llm_client.py), on the shared HTTP pool,
+    for async and sync calls alike. Retries are the tier's (jittered backoff), the OpenAI client's own
+    are turned off: LLM_MAX_RETRIES replaces the max_retries argument the model getters used to take.
+    """
+    tier: str = "mini"
+
+def use_scripted_llm() -> bool:
+    """
+    LLM_PROVIDER=fake replaces both models with one ScriptedChatModel (offline tests and benchmarks).
+    Must be set before the graph modules are imported, the nodes keep the model they got at import.
+    """
+    return os.getenv("LLM_PROVIDER", "openai") == "fake"
+
+def recording_callbacks() -> list | None:
+    # LLM_RECORD_PATH: append every real answer there, to be replayed later with LLM_SCRIPT_PATH
+    path = os.getenv("LLM_RECORD_PATH")
+    return [RecordingCallbackHandler(path)] if path else None
+
+def model_callbacks() -> list:
+    # LLM call times and token usage for /metrics, plus the recording if enabled
+    return [metrics_callback, *(recording_callbacks() or [])]
+
+def get_llm_mini_model(temperature: float = 0.0, max_tokens: int = 1000, top_p: float = 1, timeout: int = 10):
     global mini_model
     
     if mini_model is not None:
         return mini_model
 
+    if use_scripted_llm():
+        mini_model = get_scripted_llm()
+        return mini_model
+
     # model = ChatGoogleGenerativeAI(
     #     model="gemini-2.5-flash",
     #     api_key=os.getenv("GEMINI_API_KEY"),
@@ -22,33 +53,46 @@ def get_llm_mini_model(temperature: float = 0.0, max_tokens: int = 1000, top_p:
     #     max_retries=max_retries,
     #     timeout=timeout
     # )
-    model = ChatOpenAI(
+    http_client, http_async_client = get_http_clients()
+    model = LimitedChatOpenAI(
         model="gpt-4.1-mini", # gpt-5-mini (super slow)
         api_key=os.getenv("OPENAI_API_KEY"),
         temperature=temperature,
         max_tokens=max_tokens,
         top_p=top_p,
-        max_retries=max_retries,
-        timeout=timeout
+        max_retries=0,
+        timeout=timeout,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        callbacks=model_callbacks(),
     )
     
     mini_model = model
     return mini_model
 
-def get_llm_large_model(temperature: float = 0.0, max_tokens: int = 1000, top_p: float = 1, max_retries: int = 3, timeout: int = 10):
+def get_llm_large_model(temperature: float = 0.0, max_tokens: int = 1000, top_p: float = 1, timeout: int = 10):
     global large_model
     
     if large_model is not None:
         return large_model
 
-    model = ChatOpenAI(
+    if use_scripted_llm():
+        large_model = get_scripted_llm()
+        return large_model
+
+    http_client, http_async_client = get_http_clients()
+    model = LimitedChatOpenAI(
         model="gpt-5.1", # gpt-5-mini (super slow)
+        tier="large",
         api_key=os.getenv("OPENAI_API_KEY"),
         temperature=temperature,
         max_tokens=max_tokens,
         top_p=top_p,
-        max_retries=max_retries,
-        timeout=timeout
+        max_retries=0,
+        timeout=timeout,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        callbacks=model_callbacks(),
     )
     
     large_model = model
@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class Appointment(BaseModel):
+    id: Optional[str] = Field(default=None, description="The appointment's unique identifier")
+    user_id: Optional[str] = Field(default=None, description="The user's unique identifier")
+    date: Optional[str] = Field(default=None, description="The appointment's date")
+    time: Optional[str] = Field(default=None, description="The appointment's time")
+    location: Optional[str] = Field(default=None, description="The appointment's location")
+    provider: Optional[str] = Field(default=None, description="The appointment's provider")
+    reason: Optional[str] = Field(default=None, description="The appointment's reason")
+    status: Optional[str] = Field(default=None, description="The appointment's status")
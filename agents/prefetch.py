@@ -0,0 +1,119 @@
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from agents.models.user import User
+from agents.tool_cache import ToolResultCache, thread_id_of, tool_cache
+from logging_config import logger
+from services.user_service import UserService, user_service
+
+IdentityKey = tuple[str, str, str, str] # (name, date of birth, phone, SSN last 4)
+
+def identity_key(user: User) -> IdentityKey:
+    return (user.name or "", user.date_of_birth or "", user.phone or "", user.ssn_last_4 or "")
+
+@dataclass
+class PrefetchEntry:
+    identity: IdentityKey
+    lookup: asyncio.Task | None = None # -> the user_service match (User or None)
+    context: asyncio.Task | None = None # referenced so it is not collected mid-flight
+
+    def on_running_loop(self) -> bool:
+        # the instance is shared, a task of another loop (asyncio.run per call, per-test loops) can't be awaited here
+        return self.lookup is not None and self.lookup.get_loop() is asyncio.get_running_loop()
+
+class IdentityPrefetch:
+    """
+    Per-thread prefetch of what verification and the first appointment turn need.
+
+    As soon as a thread has a complete identity, start() looks the user up and, for a match,
+    loads their appointments and doctors concurrently (off the event loop, the store may be SQLite),
+    while the identity collector's LLM calls are still running. Verification awaits the lookup,
+    the appointment context goes into the thread's tool results, where the first appointment turn finds it.
+    """
+    def __init__(self, users: UserService, cache: ToolResultCache, max_threads: int = 10_000):
+        self.users = users
+        self.cache = cache
+        self.max_threads = max_threads
+        self._entries: OrderedDict[str, PrefetchEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, thread_id: str | None, user: User) -> None:
+        """
+        Starts the lookup of the thread's identity, unless it already ran for the same identity.
+        Must be called from the event loop.
+        """
+        if thread_id is None or not self.max_threads:
+            return
+        key = identity_key(user)
+        with self._lock:
+            entry = self._entries.get(thread_id)
+            if entry is not None and entry.identity == key and entry.on_running_loop():
+                self._entries.move_to_end(thread_id)
+                return
+            entry = self._entries[thread_id] = PrefetchEntry(key)
+            self._entries.move_to_end(thread_id)
+            while len(self._entries) > self.max_threads:
+                self._entries.popitem(last=False)
+        entry.lookup = asyncio.create_task(self._lookup(thread_id, entry, user))
+
+    async def _lookup(self, thread_id: str, entry: PrefetchEntry, user: User) -> User | None:
+        # an in-memory index, cheaper in the loop than a thread hop
+        found = self.users.get_user(user.name, user.date_of_birth, user.phone, user.ssn_last_4)
+        if found is not None:
+            # verification gets its answer now, the context keeps loading behind it
+            entry.context = asyncio.create_task(self._load_context(thread_id, found.id))
+            entry.context.add_done_callback(_log_failure)
+        return found
+
+    async def _load_context(self, thread_id: str, user_id: str) -> None:
+        service = self.cache.service
+        # read before the data: a write in between leaves the results stale, never wrong
+        stamp = await asyncio.to_thread(self.cache.stamp, user_id)
+        appointments, doctors = await asyncio.gather(
+            asyncio.to_thread(service.get_appointments, user_id),
+            asyncio.to_thread(service.list_all_doctors_for_user, user_id),
+        )
+        self.cache.put(thread_id, stamp, "get_appointments", (user_id,), appointments)
+        self.cache.put(thread_id, stamp, "list_all_doctors_for_user", (user_id,), doctors)
+
+    async def verified_user(self, thread_id: str | None, user: User) -> User | None:
+        """
+        The user_service match of the identity: the prefetched lookup, started now if it did not run yet.
+        A miss is not kept, the patient may be registered before the next attempt.
+        """
+        self.start(thread_id, user)
+        with self._lock:
+            entry = self._entries.get(thread_id) if thread_id is not None else None
+        if entry is None or not entry.on_running_loop():
+            with self._lock:
+                if entry is not None and self._entries.get(thread_id) is entry:
+                    del self._entries[thread_id]
+            return self.users.get_user(user.name, user.date_of_birth, user.phone, user.ssn_last_4)
+        found = await entry.lookup
+        if found is None:
+            with self._lock:
+                if self._entries.get(thread_id) is entry:
+                    del self._entries[thread_id]
+        return found
+
+    async def context_loaded(self, thread_id: str) -> None:
+        """
+        Waits until the thread's prefetch (lookup and appointment context) is done, failed or not.
+        """
+        with self._lock:
+            entry = self._entries.get(thread_id)
+        if entry is None or not entry.on_running_loop():
+            return
+        await asyncio.gather(entry.lookup, return_exceptions=True)
+        if entry.context is not None:
+            await asyncio.gather(entry.context, return_exceptions=True)
+
+def _log_failure(task: asyncio.Task) -> None:
+    # a failed prefetch only costs the tools their cache hit
+    if not task.cancelled() and task.exception() is not None:
+        logger.opt(exception=task.exception()).warning("appointment context prefetch failed")
+
+# PREFETCH_MAX_THREADS: threads whose prefetch is kept (least recently used go first), 0 disables prefetching
+identity_prefetch = IdentityPrefetch(user_service, tool_cache, max_threads=int(os.getenv("PREFETCH_MAX_THREADS", "10000")))
@@ -0,0 +1,191 @@
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional, Sequence
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult, LLMResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel, PrivateAttr
+from agents.llm_client import TierLimited
+
+# A scripted answer: an AIMessage, plain text, a pydantic object (answer to with_structured_output)
+# or a message dict as written by RecordingCallbackHandler
+ScriptItem = AIMessage | str | BaseModel | dict
+
+class ScriptExhaustedError(RuntimeError):
+    pass
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Deterministic chat model that answers from a script instead of calling a provider.
+
+    Each call takes the first pending answer that fits it:
+    - with_structured_output(Schema) calls take the first answer calling the Schema tool
+      (a pydantic object in the script is turned into such a tool call)
+    - other calls take the first answer whose tool calls (if any) are all bound with bind_tools
+    so concurrent calls (e.g. the identity collector's identity + intent chains) get the right answer
+    whatever order they run in. Answers are streamed word by word.
+    With `repeat` the answers are not used up (an endless script, e.g. for load tests)
+    and `latency` seconds are waited before each answer to stand in for the provider.
+    """
+    model_name: str = "scripted"
+    repeat: bool = False
+    latency: float = 0.0
+
+    _pending: list[AIMessage] = PrivateAttr(default_factory=list)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _ids: Iterator[int] = PrivateAttr(default_factory=itertools.count)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def load(self, script: Iterable[ScriptItem]) -> "ScriptedChatModel":
+        """
+        Replaces the pending answers.
+        """
+        with self._lock:
+            self._pending = [self._to_message(item) for item in script]
+        return self
+
+    def load_recording(self, path: str) -> "ScriptedChatModel":
+        """
+        Replays the answers recorded by RecordingCallbackHandler (one message dict per line).
+        """
+        with open(path) as f:
+            return self.load(json.loads(line) for line in f if line.strip())
+
+    @property
+    def remaining(self) -> list[AIMessage]:
+        return list(self._pending)
+
+    @staticmethod
+    def tool_call(name: str, /, **args) -> AIMessage:
+        return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": None}])
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Optional[str] = None, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], tool_choice=tool_choice, **kwargs)
+
+    def _to_message(self, item: ScriptItem) -> AIMessage:
+        if isinstance(item, AIMessage):
+            message = item
+        elif isinstance(item, str):
+            message = AIMessage(content=item)
+        elif isinstance(item, BaseModel):
+            message = self.tool_call(type(item).__name__, **item.model_dump())
+        elif "type" in item and "data" in item:
+            message = messages_from_dict([item])[0]
+        else:
+            message = AIMessage(**item)
+        tool_calls = [{**tc, "id": tc.get("id") or f"call_{next(self._ids)}"} for tc in message.tool_calls]
+        return message.model_copy(update={"tool_calls": tool_calls})
+
+    def _next_answer(self, messages: list[BaseMessage], tools: list[dict] | None, tool_choice: Any) -> AIMessage:
+        bound = {t["function"]["name"] for t in tools or []}
+        structured = next(iter(bound)) if tool_choice and len(bound) == 1 else None
+        with self._lock:
+            for i, answer in enumerate(self._pending):
+                called = {tc["name"] for tc in answer.tool_calls}
+                if (structured in called) if structured else called <= bound:
+                    if not self.repeat:
+                        del self._pending[i]
+                    return answer.model_copy(deep=True)
+        wanted = f"a {structured} structured answer" if structured else f"an answer using only tools {sorted(bound)}"
+        last = messages[-1].content if messages else ""
+        raise ScriptExhaustedError(f"No scripted answer left for {wanted} (last message: {last!r}), {len(self._pending)} pending")
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        answer = self._next_answer(messages, kwargs.get("tools"), kwargs.get("tool_choice"))
+        return ChatResult(generations=[ChatGeneration(message=answer)])
+
+    async def _agenerate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        # skip the executor hop of the default implementation
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        answer = self._next_answer(messages, kwargs.get("tools"), kwargs.get("tool_choice"))
+        return ChatResult(generations=[ChatGeneration(message=answer)])
+
+    def _stream(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        if self.latency:
+            time.sleep(self.latency)
+        answer = self._next_answer(messages, kwargs.get("tools"), kwargs.get("tool_choice"))
+        for chunk in _chunks(answer):
+            if run_manager is not None:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        answer = self._next_answer(messages, kwargs.get("tools"), kwargs.get("tool_choice"))
+        for chunk in _chunks(answer):
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def _chunks(answer: AIMessage) -> Iterator[ChatGenerationChunk]:
+    words = answer.content.split(" ") if isinstance(answer.content, str) and answer.content else []
+    for i, word in enumerate(words):
+        yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else f" {word}", id=answer.id))
+    # tool calls arrive whole in the last chunk
+    yield ChatGenerationChunk(message=AIMessageChunk(
+        content="",
+        id=answer.id,
+        tool_call_chunks=[
+            {"name": tc["name"], "args": json.dumps(tc["args"]), "id": tc["id"], "index": i}
+            for i, tc in enumerate(answer.tool_calls)
+        ],
+        chunk_position="last",
+    ))
+
+
+class RecordingCallbackHandler(BaseCallbackHandler):
+    """
+    Appends every LLM answer to a JSON lines file, ScriptedChatModel.load_recording replays it.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        lines = [
+            json.dumps(message_to_dict(generation.message)) + "\n"
+            for generations in response.generations
+            for generation in generations
+            if isinstance(generation, ChatGeneration)
+        ]
+        with self._lock, open(self.path, "a") as f:
+            f.writelines(lines)
+
+
+class LimitedScriptedChatModel(TierLimited, ScriptedChatModel):
+    """
+    ScriptedChatModel going through an LLMTier like the real models, its latency stands for the provider.
+    """
+    tier: str = "mini"
+
+scripted_llm: ScriptedChatModel | None = None
+
+def get_scripted_llm() -> ScriptedChatModel:
+    """
+    The scripted model shared by every node when LLM_PROVIDER=fake.
+    Starts with the recording at LLM_SCRIPT_PATH (if set), tests and benchmarks load their own scripts.
+    LLM_SCRIPT_REPEAT=1 replays the script endlessly, LLM_SCRIPT_LATENCY delays every answer (seconds).
+    """
+    global scripted_llm
+    if scripted_llm is None:
+        scripted_llm = LimitedScriptedChatModel(
+            repeat=os.getenv("LLM_SCRIPT_REPEAT", "0") == "1",
+            latency=float(os.getenv("LLM_SCRIPT_LATENCY", "0")),
+        )
+        if path := os.getenv("LLM_SCRIPT_PATH"):
+            scripted_llm.load_recording(path)
+    return scripted_llm
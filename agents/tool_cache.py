@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+from pydantic import BaseModel
+from langchain_core.runnables import RunnableConfig
+from agents.hooks.metrics import graph_metrics
+from agents.models.appointment import Appointment
+from services.appointment_service import AppointmentService, appointment_service
+
+# AppointmentService reads the appointment tools repeat within a conversation
+CACHED_OPERATIONS = frozenset({
+    "get_appointments",
+    "list_all_doctors_for_user",
+    "list_open_doctors",
+    "find_appointments_for_user",
+})
+
+def thread_id_of(config: RunnableConfig | None) -> str | None:
+    return ((config or {}).get("configurable") or {}).get("thread_id")
+
+def _key(operation: str, args: tuple) -> tuple[str, tuple[Hashable, ...]]:
+    # models (the appointment searched for) are keyed by their content
+    return operation, tuple(a.model_dump_json() if isinstance(a, BaseModel) else a for a in args)
+
+def _copy(value: Any) -> Any:
+    # callers sort and extend the lists they get
+    return list(value) if isinstance(value, list) else value
+
+# (epoch, user version) a result was read at, see ToolResultCache.stamp
+Stamp = tuple[int, int]
+
+def _user_of(args: tuple) -> str | None:
+    # every cached read is about one user's schedule: by id, or by the appointment searched for
+    if not args:
+        return None
+    return args[0].user_id if isinstance(args[0], Appointment) else args[0]
+
+class ToolResultCache:
+    """
+    Per-thread memoization of the read-only AppointmentService calls of the appointment tools.
+
+    Each result is kept with the stamp it was read at: the version of its user's schedule (bumped by the
+    service on every booking, cancellation or reschedule of theirs in this process) and the cache epoch.
+    A lookup at another stamp reads again, so another patient's booking does not drop the thread's results.
+    Writes by other processes sharing the store (workers on one SQLite file) only show in the store
+    generation: it is read at most every `generation_ttl` seconds, not on every lookup, and when it moved
+    by more than this process's own writes the epoch moves and every result is read again.
+    Holds `max_threads` threads, least recently used go first. Thread safe (the tools run in executor
+    threads), hits/misses/invalidations are counted and exported per operation on /metrics.
+    """
+    def __init__(self, service: AppointmentService, max_threads: int = 10_000,
+                 generation_ttl: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.service = service
+        self.max_threads = max_threads
+        self.generation_ttl = generation_ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._threads: OrderedDict[str, dict[tuple, tuple[Stamp, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self._seen: tuple[int, int] | None = None # (store generation, own writes) at the last check
+        self._next_check = float("-inf")
+        self._check_lock = threading.Lock()
+
+    def call(self, config: RunnableConfig | None, operation: str, *args: Any) -> Any:
+        """
+        service.<operation>(*args), from the thread's results when they are current.
+        Without a thread id (or with the cache disabled) the service is called every time.
+        """
+        if operation not in CACHED_OPERATIONS:
+            raise ValueError(f"Not a cached operation: {operation}")
+        thread_id = thread_id_of(config)
+        if thread_id is None or not self.max_threads:
+            return getattr(self.service, operation)(*args)
+
+        key = _key(operation, args)
+        # read before the data: a write in between leaves the result stale, never wrong
+        stamp = self.stamp(_user_of(args))
+        with self._lock:
+            found = self._results(thread_id).get(key)
+            if found is not None and found[0] != stamp:
+                self.invalidations += 1
+                found = None
+            if found is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        self._record(operation, "hit" if found is not None else "miss")
+        if found is not None:
+            return _copy(found[1])
+
+        value = getattr(self.service, operation)(*args)
+        self.put(thread_id, stamp, operation, args, value)
+        return _copy(value)
+
+    def stamp(self, user_id: str | None) -> Stamp:
+        """
+        What a result about the user's schedule read now is current for. Take it before reading the data.
+        """
+        return self._current_epoch(), self.service.changes.version(user_id) if user_id is not None else 0
+
+    def put(self, thread_id: str, stamp: Stamp, operation: str, args: tuple, value: Any) -> None:
+        """
+        Stores a result read at `stamp`, e.g. one prefetched before the thread's first tool call.
+        Ignored if the thread already holds the result at a later stamp.
+        """
+        if not self.max_threads:
+            return
+        key = _key(operation, args)
+        with self._lock:
+            results = self._results(thread_id)
+            if key not in results or results[key][0] <= stamp:
+                results[key] = stamp, _copy(value)
+
+    def _current_epoch(self) -> int:
+        if self.clock() < self._next_check:
+            return self._epoch
+        # one caller asks the store, the others keep the epoch they have
+        if not self._check_lock.acquire(blocking=False):
+            return self._epoch
+        try:
+            writes = self.service.changes.writes
+            generation = self.service.store.generation()
+            # a write racing the two reads costs one spurious invalidation, not a stale result
+            if self._seen is not None and generation - self._seen[0] != writes - self._seen[1]:
+                self._epoch += 1
+            self._seen = generation, writes
+            self._next_check = self.clock() + self.generation_ttl
+        finally:
+            self._check_lock.release()
+        return self._epoch
+
+    def _results(self, thread_id: str) -> dict[tuple, tuple[Stamp, Any]]:
+        # the caller holds the lock
+        results = self._threads.get(thread_id)
+        if results is None:
+            results = self._threads[thread_id] = {}
+            while len(self._threads) > self.max_threads:
+                self._threads.popitem(last=False)
+        self._threads.move_to_end(thread_id)
+        return results
+
+    def _record(self, operation: str, result: str) -> None:
+        if graph_metrics.enabled:
+            graph_metrics.tool_cache_lookups.inc(operation, result)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._threads.clear()
+
+    def __len__(self) -> int:
+        return len(self._threads)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "threads": len(self._threads),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": self.hit_ratio,
+        }
+
+def create_tool_cache() -> ToolResultCache:
+    """
+    TOOL_CACHE_MAX_THREADS: conversations whose tool results are kept (0 disables the cache).
+    TOOL_CACHE_GENERATION_TTL_SECONDS: how often the store is asked for writes made by other processes.
+    """
+    return ToolResultCache(
+        appointment_service,
+        max_threads=int(os.getenv("TOOL_CACHE_MAX_THREADS", "10000")),
+        generation_ttl=float(os.getenv("TOOL_CACHE_GENERATION_TTL_SECONDS", "1")),
+    )
+
+tool_cache = create_tool_cache()
@@ -1,52 +1,109 @@
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator
 from api.models.chat import ChatRequest, ChatResponse
 from agents.graph import graph
+from agents.checkpointer import ahas_pending_interrupt
 from langchain_core.messages import HumanMessage
 from langgraph.types import Command
+import json
 import uuid
-from langchain_core.messages import AIMessage
+from langchain_core.messages import AIMessage, AIMessageChunk
+from logging_config import logger
 
 chat_router = APIRouter()
 
 @chat_router.post("/chat")
 async def chat(request: ChatRequest):
-    tid = request.thread_id or str(uuid.uuid4())
+    return await run_chat_turn(graph, request.message, request.thread_id or str(uuid.uuid4()))
+
+@chat_router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Same turn as /chat, streamed as server-sent events:
+    - node: {"node"} when a node finishes
+    - token: {"node", "text"} text deltas of the LLM running in a node
+    - interrupt: {"message", "thread_id"} the graph paused on interrupt(), reply through /chat or /chat/stream
+    - done: {"message", "thread_id"} final answer (same message /chat would return)
+    - error: {"message", "thread_id"}
+    """
+    return StreamingResponse(
+        stream_chat_turn(graph, request.message, request.thread_id or str(uuid.uuid4())),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}, # proxies must not buffer the stream
+    )
+
+async def run_chat_turn(graph, message: str, tid: str) -> ChatResponse:
+    """
+    Runs one user turn on the thread. The conversation state is loaded once, by the graph run itself:
+    the pending interrupt check only looks at the latest checkpoint's writes and
+    a new interrupt is reported in the invoke result.
+    """
     config = {"configurable": {"thread_id": tid}}
-    user_message = HumanMessage(content=request.message)
+    result = await graph.ainvoke(await turn_input(graph, message, config), config=config)
 
-    snapshot = await graph.aget_state(config)
-    
-    # Check if there are active interrupts pending
-    if snapshot.interrupts:
-        result = await graph.ainvoke(
-            Command(resume=request.message), 
-            config=config
-        )
-    else:
-         # normal mode
-        result = await graph.ainvoke(
-            {"messages": [user_message]},
-            config=config,
-        )
-
-    snapshot = await graph.aget_state(config)
-    if snapshot.interrupts:
+    if result.get("__interrupt__"):
         # OUTCOME X: INTERRUPT HIT
         # The graph ran for a bit, then hit a NEW interrupt() line.
         # We extract the value (the question) and return it.
-        interrupt_value = snapshot.interrupts[0].value
+        interrupt_value = result["__interrupt__"][0].value
         return ChatResponse(message=interrupt_value, thread_id=tid)
     else:
-        # Prefer last AI message, not just "last message"
-        messages = result["messages"]
-        ai_messages = [m for m in messages if isinstance(m, AIMessage)]
-        last_msg = ai_messages[-1] if ai_messages else messages[-1]
-
-        content = last_msg.content
-        if isinstance(content, list):
-            text_chunks = [c.get("text", "") for c in content if isinstance(c, dict)]
-            last_text = text_chunks[-1] if text_chunks else ""
-        else:
-            last_text = content
-
-        return ChatResponse(message=last_text, thread_id=tid)
\ No newline at end of file
+        return ChatResponse(message=last_ai_text(result["messages"]), thread_id=tid)
+
+async def stream_chat_turn(graph, message: str, tid: str) -> AsyncIterator[str]:
+    config = {"configurable": {"thread_id": tid}}
+    values, interrupts = None, None
+    try:
+        stream = graph.astream(await turn_input(graph, message, config), config=config, stream_mode=["messages", "updates", "values"])
+        async for mode, chunk in stream:
+            if mode == "messages":
+                message_chunk, metadata = chunk
+                # only streamed LLM output, complete messages (tool results, node outputs) come with the node event.
+                # Structured output calls are tagged "nostream" and never show up here.
+                if isinstance(message_chunk, AIMessageChunk) and (text := content_text(message_chunk.content)):
+                    yield sse_event("token", {"node": metadata.get("langgraph_node"), "text": text})
+            elif mode == "updates":
+                if "__interrupt__" in chunk:
+                    interrupts = chunk["__interrupt__"]
+                    continue
+                for node in chunk:
+                    yield sse_event("node", {"node": node})
+            else:
+                values = chunk
+    except Exception as e:
+        logger.exception(f"chat stream failed for thread {tid}")
+        yield sse_event("error", {"message": str(e), "thread_id": tid})
+        return
+
+    if interrupts:
+        yield sse_event("interrupt", {"message": interrupts[0].value, "thread_id": tid})
+    else:
+        final_text = last_ai_text(values["messages"]) if values and values.get("messages") else ""
+        yield sse_event("done", {"message": final_text, "thread_id": tid})
+
+async def turn_input(graph, message: str, config: dict):
+    # Check if there are active interrupts pending
+    if await ahas_pending_interrupt(graph.checkpointer, config):
+        return Command(resume=message)
+    # normal mode
+    return {"messages": [HumanMessage(content=message)]}
+
+def last_ai_text(messages: list) -> str:
+    # Prefer last AI message, not just "last message"
+    ai_messages = [m for m in messages if isinstance(m, AIMessage)]
+    last_msg = ai_messages[-1] if ai_messages else messages[-1]
+
+    content = last_msg.content
+    if isinstance(content, list):
+        text_chunks = [c.get("text", "") for c in content if isinstance(c, dict)]
+        return text_chunks[-1] if text_chunks else ""
+    return content
+
+def content_text(content) -> str:
+    if isinstance(content, list):
+        return "".join(c.get("text", "") if isinstance(c, dict) else str(c) for c in content)
+    return content
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from agents.hooks.metrics import graph_metrics
+
+metrics_router = APIRouter()
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Graph node, LLM and tool metrics in the Prometheus text format.
+    Counted per process: with several workers each scrape gets the worker that answers it.
+    """
+    return PlainTextResponse(graph_metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,95 @@
+"""
+Benchmark: indexed AppointmentStore vs. the previous linear list scans.
+
+Run from the repository root:
+    python -m benchmarks.bench_appointment_store
+"""
+import random
+import time
+from datetime import date, timedelta
+from agents.models.appointment import Appointment
+from services.appointment_store import InMemoryAppointmentStore
+from services.appointment_service import AppointmentService
+
+SIZES = [10, 1_000, 100_000, 1_000_000]
+LOOKUPS = 200
+PROVIDERS = 500
+USERS_PER_APPOINTMENT = 4 # ~4 appointments per user on average
+HOURS = [f"{h:02d}:00" for h in range(9, 17)]
+
+def generate(n: int) -> list[Appointment]:
+    start = date.today()
+    appointments = []
+    for i in range(n):
+        provider = i % PROVIDERS
+        slot = i // PROVIDERS
+        day = start + timedelta(days=slot // len(HOURS))
+        appointments.append(Appointment(
+            id=str(i + 1),
+            user_id=str(i // USERS_PER_APPOINTMENT),
+            date=day.strftime("%Y-%m-%d"),
+            time=HOURS[slot % len(HOURS)],
+            location=f"{provider} Main St",
+            provider=f"Dr. Provider {provider}",
+            reason="Check up",
+            status="Confirmed",
+        ))
+    return appointments
+
+def scan_conflict(appointments: list[Appointment], probe: Appointment) -> bool:
+    for a in appointments:
+        if a.provider == probe.provider and a.date == probe.date and a.time == probe.time:
+            return True
+    return False
+
+def scan_user(appointments: list[Appointment], user_id: str) -> list[Appointment]:
+    return [a for a in appointments if a.user_id == user_id]
+
+def scan_id(appointments: list[Appointment], appointment_id: str) -> Appointment | None:
+    for a in appointments:
+        if a.id == appointment_id:
+            return a
+    return None
+
+def per_call_us(fn, probes) -> float:
+    start = time.perf_counter()
+    for p in probes:
+        fn(p)
+    return (time.perf_counter() - start) / len(probes) * 1e6
+
+def main():
+    rng = random.Random(42)
+    print(f"{'size':>10} | {'op':<18} | {'scan µs':>12} | {'indexed µs':>10}")
+    print("-" * 60)
+    for n in SIZES:
+        appointments = generate(n)
+        service = AppointmentService(InMemoryAppointmentStore(appointments))
+        probes = [rng.choice(appointments) for _ in range(LOOKUPS)]
+        # fewer scan probes at large sizes, a single pass over 1M rows already takes tens of ms
+        scan_probes = probes[: max(5, LOOKUPS * 1000 // max(n, 1000))]
+
+        rows = [
+            ("check_conflict",
+                per_call_us(lambda p: scan_conflict(appointments, p), scan_probes),
+                per_call_us(lambda p: service.store.get_by_slot(p.provider, p.date, p.time) is not None, probes)),
+            ("by user",
+                per_call_us(lambda p: scan_user(appointments, p.user_id), scan_probes),
+                per_call_us(lambda p: service.get_appointments(p.user_id), probes)),
+            ("by id",
+                per_call_us(lambda p: scan_id(appointments, p.id), scan_probes),
+                per_call_us(lambda p: service.get_appointment(p.id), probes)),
+        ]
+        for op, scan_us, indexed_us in rows:
+            print(f"{n:>10} | {op:<18} | {scan_us:>12.2f} | {indexed_us:>10.2f}")
+
+        # mutation round trip through the service keeps indexes consistent
+        start = time.perf_counter()
+        for p in probes[:50]:
+            moved = service.reschedule_appointment(p.id, "2999-01-01", f"{rng.randint(0, 10**9)}")
+            service.cancel_appointment_by_id(moved.id)
+            service.add_appointment(moved)
+        mutate_us = (time.perf_counter() - start) / 50 * 1e6
+        print(f"{n:>10} | {'resched+cancel+add':<18} | {'':>12} | {mutate_us:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: requests per second of simultaneous identity-correction conversations with a delayed LLM.
+
+Every conversation takes two /chat turns (run_chat_turn, the /chat handler, on an in-memory checkpointer):
+1. the identity with a wrong date of birth -> the user is not found, the graph asks whether they are a new patient
+2. "No, I'm an existing patient, my date of birth is ..." -> new_patient_confirmation_request_node classifies
+   the answer, identity_fullfillment_helper_node extracts the correction, the user is verified
+   and the primary appointment assistant greets them
+The scripted LLM waits LLM_LATENCY seconds before every answer (asyncio.sleep for async calls,
+time.sleep for the sync ones), like a provider would. CONVERSATIONS conversations run at once,
+for each LLM_MINI_MAX_CONCURRENCY setting (the cap of the mini model tier).
+
+Run from the repository root:
+    python -m benchmarks.bench_async_nodes
+"""
+import os
+
+os.environ["LLM_PROVIDER"] = "fake"
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+import asyncio
+import time
+import uuid
+from langgraph.checkpoint.memory import InMemorySaver
+from agents.graph import workflow
+from agents.identity.identity_collector_node import UpdateInfo
+from agents.identity.identity_verification_node import NewPatientIntent
+from agents.llm_client import llm_tiers
+from agents.llms import get_llm_mini_model
+from api.chat_api import run_chat_turn
+from logging_config import logger
+
+logger.disable("agents") # the nodes log every LLM response
+
+CONVERSATIONS = 200
+LLM_LATENCY = 0.2
+LIMITS = (0, 64, 16)
+ANSWER = "Hello John, how can I help you today?"
+WRONG_IDENTITY = "Hi, my name is John Doe, born 1960-01-02, SSN 1111. I'd like to book an appointment"
+CORRECTION = "No, I'm an existing patient, my date of birth is 1960-01-01"
+
+llm = get_llm_mini_model()
+llm.repeat = True
+llm.latency = LLM_LATENCY
+llm.load([
+    NewPatientIntent(is_new_patient=False, reasoning="The user says they are an existing patient."),
+    UpdateInfo(date_of_birth="1960-01-01"),
+    ANSWER,
+])
+
+async def conversation(graph) -> tuple[int, bool]:
+    thread_id = str(uuid.uuid4())
+    await run_chat_turn(graph, WRONG_IDENTITY, thread_id)
+    response = await run_chat_turn(graph, CORRECTION, thread_id)
+    return 2, response.message == ANSWER
+
+async def measure(limit: int) -> tuple[float, float, int, int]:
+    graph = workflow.compile(checkpointer=InMemorySaver())
+    limiter = llm_tiers["mini"].limiter
+    limiter.limit, limiter.peak = limit, 0
+    start = time.perf_counter()
+    results = await asyncio.gather(*(conversation(graph) for _ in range(CONVERSATIONS)))
+    elapsed = time.perf_counter() - start
+    failed = sum(not verified for _, verified in results)
+    return sum(turns for turns, _ in results) / elapsed, elapsed, limiter.peak, failed
+
+async def main():
+    print(f"{CONVERSATIONS} simultaneous conversations (2 turns, 3 LLM calls each), LLM latency {LLM_LATENCY * 1e3:.0f} ms")
+    print(f"{'LLM_MINI_MAX_CONCURRENCY':>24} | requests/s | wall     | LLM calls in flight (peak) | not verified")
+    for limit in LIMITS:
+        throughput, elapsed, peak, failed = await measure(limit)
+        print(f"{limit or 'no cap':>24} | {throughput:10.1f} | {elapsed:6.2f} s | {peak if limit else '-':>26} | {failed}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
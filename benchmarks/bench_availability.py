@@ -0,0 +1,73 @@
+"""
+Benchmark: bitmap availability index vs. rebuilding the slot list on every call.
+
+Run from the repository root:
+    python -m benchmarks.bench_availability
+"""
+import random
+import time
+from datetime import datetime, timedelta, time as dtime
+from agents.models.appointment import Appointment
+from benchmarks.bench_appointment_store import generate
+from services.appointment_service import AppointmentService
+from services.appointment_store import InMemoryAppointmentStore
+
+ROWS = 100_000
+CALLS = 2_000
+
+def legacy_available_times(appointments: list[Appointment], provider: str, day_str: str) -> list[str]:
+    """
+    The previous implementation: scan for booked times, then build the slot list with strptime/strftime.
+    """
+    booked = {a.time for a in appointments if a.provider == provider and a.date == day_str}
+    day = datetime.strptime(day_str, "%Y-%m-%d")
+    t = datetime.combine(day, dtime(hour=9, minute=0))
+    end_time = datetime.combine(day, dtime(hour=17, minute=0))
+    all_slots = []
+    while t < end_time:
+        all_slots.append(t.strftime("%H:%M"))
+        t += timedelta(minutes=60)
+    return [s for s in all_slots if s not in booked]
+
+def per_call_us(fn, probes) -> float:
+    start = time.perf_counter()
+    for p in probes:
+        fn(p)
+    return (time.perf_counter() - start) / len(probes) * 1e6
+
+def main():
+    rng = random.Random(7)
+    appointments = generate(ROWS)
+    service = AppointmentService(InMemoryAppointmentStore(appointments))
+    probes = [rng.choice(appointments) for _ in range(CALLS)]
+
+    legacy_us = per_call_us(lambda p: legacy_available_times(appointments, p.provider, p.date), probes[:20])
+    # index-backed day scan without the bitmap cache (first call for a day)
+    cold_us = per_call_us(lambda p: service.availability.invalidate() or service.get_doctor_available_times_for_day(p.provider, p.date), probes)
+    for p in probes: # load every probed day once
+        service.get_doctor_available_times_for_day(p.provider, p.date)
+    warm_us = per_call_us(lambda p: service.get_doctor_available_times_for_day(p.provider, p.date), probes)
+    next_us = per_call_us(lambda p: service.get_doctor_next_available_times(p.provider, p.date, days=30, limit=5), probes)
+
+    # incremental maintenance: book + cancel keeps the bitmap warm
+    def churn(p: Appointment):
+        added = service.add_appointment(Appointment(user_id="x", provider=p.provider, date="2999-01-01", time=f"{rng.randint(9, 16):02d}:00"))
+        service.get_doctor_available_times_for_day(p.provider, "2999-01-01")
+        service.cancel_appointment_by_id(added.id)
+    churn_us = per_call_us(lambda p: _ignore_conflicts(churn, p), probes)
+
+    print(f"appointments: {ROWS:,}, calls: {CALLS:,}")
+    print(f"{'legacy scan + strptime/strftime':<40} | {legacy_us:>10.2f} µs")
+    print(f"{'index, cold day (store read)':<40} | {cold_us:>10.2f} µs")
+    print(f"{'bitmap, warm day':<40} | {warm_us:>10.2f} µs")
+    print(f"{'next 5 free slots within 30 days':<40} | {next_us:>10.2f} µs")
+    print(f"{'add + free slots + cancel':<40} | {churn_us:>10.2f} µs")
+
+def _ignore_conflicts(fn, p):
+    try:
+        fn(p)
+    except Exception:
+        pass
+
+if __name__ == "__main__":
+    main()
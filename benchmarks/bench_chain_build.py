@@ -0,0 +1,109 @@
+"""
+Benchmark: CPU spent per turn building the node chains (prompt | llm.bind_tools / with_structured_output)
+on every call, against the chains the nodes now build once at import.
+
+Building a chain converts every bound tool / structured output schema to its JSON schema.
+The first table is the build cost alone, per node, with the real ChatOpenAI client (no request is sent).
+The second runs many concurrent chain invocations (ScriptedChatModel answering instantly, so the LLM
+costs nothing) and reports the process CPU time per invocation, rebuilding the chain each time or not.
+
+Run from the repository root:
+    python -m benchmarks.bench_chain_build
+"""
+import asyncio
+import os
+import statistics
+import time
+from typing import Callable
+
+# the graph modules build their (unused here) OpenAI client at import
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+from langchain_core.messages import HumanMessage
+from langgraph.constants import TAG_NOSTREAM
+from agents.appointment.add_appointment_node import ToAddAppointment, add_appointment_node_tools
+from agents.appointment.cancel_appointment_node import ToCancelAppointment, cancel_appointment_node_tools
+from agents.appointment.complete_or_escalate import CompleteOrEscalate
+from agents.appointment.primary_appointment_node import primary_appointment_node_tools
+from agents.appointment.prompts.appointment_prompts import add_appointment_prompt, cancel_appointment_prompt, primary_appointment_prompt, reschedule_appointment_prompt
+from agents.appointment.reschedule_appointment_node import ToRescheduleAppointment, reschedule_appointment_node_tools
+from agents.identity.identity_collector_node import UpdateInfo, UpdateInfoWithResponse
+from agents.identity.prompts.identity_assistant import identity_collector_prompt, identity_fullfillment_helper_prompt
+from agents.identity.prompts.intent_prompt import IntentResult, intent_prompt
+from agents.llms import get_llm_mini_model
+from agents.scripted_llm import ScriptedChatModel
+
+BUILD_ROUNDS = 300
+CONCURRENT_TURNS = 200
+TURN_ROUNDS = 5
+
+# how each node built its chain on every call before
+CHAINS: dict[str, Callable] = {
+    "primary_appointment": lambda llm: primary_appointment_prompt | llm.bind_tools(primary_appointment_node_tools + [ToCancelAppointment, ToAddAppointment, ToRescheduleAppointment]),
+    "add_appointment": lambda llm: add_appointment_prompt | llm.bind_tools(add_appointment_node_tools + [CompleteOrEscalate]),
+    "cancel_appointment": lambda llm: cancel_appointment_prompt | llm.bind_tools(cancel_appointment_node_tools + [CompleteOrEscalate]),
+    "reschedule_appointment": lambda llm: reschedule_appointment_prompt | llm.bind_tools(reschedule_appointment_node_tools + [CompleteOrEscalate]),
+    "identity_collector": lambda llm: identity_collector_prompt | llm.with_structured_output(UpdateInfoWithResponse).with_config(tags=[TAG_NOSTREAM]),
+    "identity_collector (intent)": lambda llm: intent_prompt | llm.with_structured_output(IntentResult).with_config(tags=[TAG_NOSTREAM]),
+    "identity_fullfillment_helper": lambda llm: identity_fullfillment_helper_prompt | llm.with_structured_output(UpdateInfo).with_config(tags=[TAG_NOSTREAM]),
+}
+
+IDENTITY_VARS = {"name": "", "phone_number": "", "date_of_birth": "", "ssn_last_4": "", "urgency_level": 1, "urgency_reason": "No urgency", "missing_information": []}
+APPOINTMENT_VARS = {"user_info": "John Doe", "current_date": "2030-01-01", "doctors": "Dr. Lang Smith"}
+
+def build_us(build: Callable, llm) -> float:
+    samples = []
+    for _ in range(BUILD_ROUNDS):
+        start = time.perf_counter()
+        build(llm)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+def answer_for(name: str):
+    if name == "identity_collector":
+        return UpdateInfoWithResponse(name="John Doe", response="Thanks")
+    if name == "identity_collector (intent)":
+        return IntentResult(intent="add_appointment", confidence=0.9, original_message="book")
+    if name == "identity_fullfillment_helper":
+        return UpdateInfo(name="John Doe")
+    return "Sure, which day works for you?"
+
+def input_for(chain) -> dict:
+    params = {"messages": [HumanMessage(content="I'd like to book an appointment")], "text": "book", **IDENTITY_VARS, **APPOINTMENT_VARS}
+    return {name: params.get(name, "") for name in chain.first.input_variables}
+
+async def turn_cpu_us(name: str, rebuild: bool) -> float:
+    """
+    Process CPU time per invocation while CONCURRENT_TURNS invocations run at once.
+    """
+    llm = ScriptedChatModel()
+    prebuilt = CHAINS[name](llm)
+    inputs = input_for(prebuilt)
+
+    async def one():
+        chain = CHAINS[name](llm) if rebuild else prebuilt
+        await chain.ainvoke(inputs)
+
+    samples = []
+    for _ in range(TURN_ROUNDS):
+        llm.load([answer_for(name)] * CONCURRENT_TURNS)
+        start = time.process_time()
+        await asyncio.gather(*(one() for _ in range(CONCURRENT_TURNS)))
+        samples.append((time.process_time() - start) / CONCURRENT_TURNS)
+    return statistics.median(samples) * 1e6
+
+async def main():
+    openai_llm = get_llm_mini_model(temperature=0.0)
+    print(f"chain build cost ({openai_llm.model_name}, median of {BUILD_ROUNDS})")
+    print(f"{'node':<30} | {'build':>9}")
+    for name, build in CHAINS.items():
+        print(f"{name:<30} | {build_us(build, openai_llm):>6.0f} us")
+
+    print(f"\nCPU per invocation, {CONCURRENT_TURNS} concurrent (scripted LLM)")
+    print(f"{'node':<30} | {'rebuilt':>10} | {'prebuilt':>10} | saved")
+    for name in CHAINS:
+        before = await turn_cpu_us(name, rebuild=True)
+        after = await turn_cpu_us(name, rebuild=False)
+        print(f"{name:<30} | {before:>7.0f} us | {after:>7.0f} us | {(before - after) / before:>5.0%}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""
+Benchmark: /chat turn latency with the LLM stubbed out, before and after dropping the two aget_state calls.
+
+The stub graph has the shape the chat endpoint cares about: a message history that grows every turn
+and a node that pauses on interrupt() every third turn. "before" is the previous endpoint logic
+(aget_state, ainvoke, aget_state), "after" is api.chat_api.run_chat_turn.
+
+Run from the repository root:
+    python -m benchmarks.bench_chat_turn
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Annotated, TypedDict
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langgraph.types import Command, interrupt
+
+# the graph modules build their (unused here) OpenAI client at import
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+from agents.checkpointer import SQLiteCheckpointSaver
+from api.chat_api import run_chat_turn
+from api.models.chat import ChatResponse
+
+HISTORY_SIZES = [10, 100, 400]
+THREADS = 20
+TURNS = 9
+
+class State(TypedDict):
+    messages: Annotated[list[AnyMessage], add_messages]
+
+def build_graph(checkpointer):
+    def assistant(state: State):
+        if len(state["messages"]) % 3 == 0:
+            confirmed = interrupt("Would you like me to confirm this? (yes/no)")
+            return {"messages": [AIMessage(content=f"Done ({confirmed}).")]}
+        return {"messages": [AIMessage(content="Sure, which date works for you? " + "x" * 200)]}
+
+    builder = StateGraph(State)
+    builder.add_node("assistant", assistant)
+    builder.add_edge(START, "assistant")
+    builder.add_edge("assistant", END)
+    return builder.compile(checkpointer=checkpointer)
+
+async def legacy_chat_turn(graph, message: str, tid: str) -> ChatResponse:
+    """
+    The previous endpoint: the full state is loaded before and after the run.
+    """
+    config = {"configurable": {"thread_id": tid}}
+    snapshot = await graph.aget_state(config)
+    if snapshot.interrupts:
+        result = await graph.ainvoke(Command(resume=message), config=config)
+    else:
+        result = await graph.ainvoke({"messages": [HumanMessage(content=message)]}, config=config)
+    snapshot = await graph.aget_state(config)
+    if snapshot.interrupts:
+        return ChatResponse(message=snapshot.interrupts[0].value, thread_id=tid)
+    ai_messages = [m for m in result["messages"] if isinstance(m, AIMessage)]
+    return ChatResponse(message=ai_messages[-1].content, thread_id=tid)
+
+async def seed_history(graph, history: int) -> None:
+    for t in range(THREADS):
+        messages = [
+            HumanMessage(content=f"user message {i} " + "y" * 200) if i % 2 == 0 else AIMessage(content=f"reply {i} " + "x" * 200)
+            for i in range(history)
+        ]
+        await graph.aupdate_state({"configurable": {"thread_id": f"thread-{t}"}}, {"messages": messages}, as_node="assistant")
+
+async def run_turns(graph, turn) -> list[float]:
+    latencies = []
+    for i in range(TURNS):
+        for t in range(THREADS):
+            start = time.perf_counter()
+            await turn(graph, f"message {i}", f"thread-{t}")
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+async def measure(make_saver, history: int, turn) -> float:
+    saver = make_saver()
+    graph = build_graph(saver)
+    await seed_history(graph, history)
+    latencies = await run_turns(graph, turn)
+    if hasattr(saver, "close"):
+        saver.close()
+    return statistics.median(latencies) * 1e3
+
+async def main():
+    print(f"{'checkpointer':<13} | {'history':>7} | {'before':>9} | {'after':>9} | speedup")
+    with tempfile.TemporaryDirectory() as tmp:
+        savers = {
+            "memory": InMemorySaver,
+            "sqlite": lambda: SQLiteCheckpointSaver(os.path.join(tmp, f"{time.perf_counter_ns()}.db")),
+        }
+        for name, make_saver in savers.items():
+            for history in HISTORY_SIZES:
+                before = await measure(make_saver, history, legacy_chat_turn)
+                after = await measure(make_saver, history, run_chat_turn)
+                print(f"{name:<13} | {history:>7} | {before:>6.2f} ms | {after:>6.2f} ms | {before / after:>6.2f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Benchmark: checkpoint read/write latency and memory per thread, InMemorySaver vs. SQLiteCheckpointSaver.
+
+Thousands of conversations run concurrently through a small graph shaped like the chat graph
+(a growing message list plus a few scalar channels), a few turns each, without any LLM call.
+Then OS threads read the latest checkpoint of random conversations and write a new one on top,
+timing get_tuple and put directly (timing the async calls would mostly measure event loop waits).
+
+Run from the repository root:
+    python -m benchmarks.bench_checkpointer
+"""
+import asyncio
+import gc
+import operator
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, TypedDict
+from langgraph.checkpoint.base.id import uuid6
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import StateGraph, START, END
+from agents.checkpointer import SQLiteCheckpointSaver
+
+THREADS = 5_000
+TURNS = 3
+CONCURRENCY = 50
+WORKERS = 8
+OPS_PER_WORKER = 1_000
+MEMORY_THREADS = 1_000 # tracemalloc slows everything down, memory is measured on a smaller run
+
+class State(TypedDict):
+    messages: Annotated[list[str], operator.add]
+    turn: int
+    user_id: str
+
+def build_graph(checkpointer):
+    def reply(state: State):
+        return {"messages": [f"assistant reply {state.get('turn', 0)} " + "x" * 200], "turn": state.get("turn", 0) + 1}
+
+    builder = StateGraph(State)
+    builder.add_node("reply", reply)
+    builder.add_edge(START, "reply")
+    builder.add_edge("reply", END)
+    return builder.compile(checkpointer=checkpointer)
+
+async def run_load(saver, threads: int) -> float:
+    graph = build_graph(saver)
+    limit = asyncio.Semaphore(CONCURRENCY)
+
+    async def conversation(i: int):
+        config = {"configurable": {"thread_id": f"thread-{i}"}}
+        for turn in range(TURNS):
+            async with limit:
+                await graph.ainvoke({"messages": [f"user message {turn} " + "y" * 200], "user_id": str(i)}, config)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(conversation(i) for i in range(threads)))
+    return time.perf_counter() - start
+
+def checkpoint_ops(saver, seed: int) -> tuple[list[float], list[float]]:
+    rng = random.Random(seed)
+    reads, writes = [], []
+    for _ in range(OPS_PER_WORKER):
+        config = {"configurable": {"thread_id": f"thread-{rng.randrange(THREADS)}", "checkpoint_ns": ""}}
+        start = time.perf_counter()
+        saved = saver.get_tuple(config)
+        reads.append(time.perf_counter() - start)
+
+        checkpoint = {**saved.checkpoint, "id": str(uuid6())}
+        checkpoint["channel_values"] = {**checkpoint["channel_values"], "messages": checkpoint["channel_values"]["messages"] + ["more"]}
+        new_versions = {"messages": saver.get_next_version(checkpoint["channel_versions"]["messages"], None)}
+        checkpoint["channel_versions"] = {**checkpoint["channel_versions"], **new_versions}
+        start = time.perf_counter()
+        saver.put(saved.config, checkpoint, {"source": "update", "step": -2}, new_versions)
+        writes.append(time.perf_counter() - start)
+    return reads, writes
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1e6
+
+def measure_latency(label: str, make_saver) -> None:
+    saver = make_saver()
+    elapsed = asyncio.run(run_load(saver, THREADS))
+    with ThreadPoolExecutor(WORKERS) as pool:
+        results = list(pool.map(lambda seed: checkpoint_ops(saver, seed), range(WORKERS)))
+    reads = [r for rs, _ in results for r in rs]
+    writes = [w for _, ws in results for w in ws]
+    print(
+        f"{label:<8} | {THREADS * TURNS / elapsed:>5.0f} turns/s"
+        f" | get_tuple p50 {statistics.median(reads) * 1e6:>7.1f} µs p99 {percentile(reads, 0.99):>8.1f} µs"
+        f" | put p50 {statistics.median(writes) * 1e6:>7.1f} µs p99 {percentile(writes, 0.99):>8.1f} µs"
+    )
+    if hasattr(saver, "close"):
+        saver.close()
+
+def measure_memory(label: str, make_saver, disk_usage=lambda: 0) -> None:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    saver = make_saver()
+    asyncio.run(run_load(saver, MEMORY_THREADS))
+    gc.collect()
+    heap = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"{label:<8} | heap/thread {heap / MEMORY_THREADS / 1024:>6.1f} KiB | disk/thread {disk_usage() / MEMORY_THREADS / 1024:>5.1f} KiB")
+    if hasattr(saver, "close"):
+        saver.close()
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"latency: {THREADS} threads x {TURNS} turns ({CONCURRENCY} concurrent), then {WORKERS} workers x {OPS_PER_WORKER} read+write")
+        measure_latency("memory", InMemorySaver)
+        measure_latency("sqlite", lambda: SQLiteCheckpointSaver(os.path.join(tmp, "latency.db")))
+
+        print(f"memory: {MEMORY_THREADS} threads x {TURNS} turns")
+        path = os.path.join(tmp, "memory.db")
+        disk = lambda: sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+        measure_memory("memory", InMemorySaver)
+        measure_memory("sqlite", lambda: SQLiteCheckpointSaver(path), disk)
+
+if __name__ == "__main__":
+    main()
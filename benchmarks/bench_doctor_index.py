@@ -0,0 +1,77 @@
+"""
+Benchmark: matching a requested doctor name against a provider directory.
+
+Compares the regex-and-substring loop check_appointment used to run over every name on every call
+with DoctorNameIndex, for directories of a few thousand providers: latency per query and how many
+queries found the doctor at all (titles and typos).
+
+Run from the repository root:
+    python -m benchmarks.bench_doctor_index
+"""
+import re
+import statistics
+import time
+from services.doctor_index import DoctorNameIndex
+
+SIZES = [100, 1_000, 5_000]
+ROUNDS = 20
+FIRST = ["Anna", "Jim", "Jill", "Jack", "Lang", "Maria", "Omar", "Wei", "Priya", "Lars", "Ines", "Kofi"]
+LAST = ["Smith", "Beam", "Johnson", "Daniels", "Garcia", "Nguyen", "Kowalski", "Okafor", "Tanaka", "Haddad", "Sours", "Free"]
+QUERIES = ["Dr. Lang Smith", "dr smith", "lang", "Smyth", "okafor", "dr kowalsky", "priya tanaka", "Jonson"]
+
+def normalize(s: str) -> str:
+    s = s.lower()
+    s = re.sub(r"[^\w\s]", "", s)
+    return re.sub(r"\s+", " ", s).strip()
+
+def loop_match(provider: str, doctors: list[str]) -> list[str]:
+    # the matching check_appointment did before the index
+    query = normalize(provider)
+    matches = []
+    for d in doctors:
+        nd = normalize(d)
+        if nd == query:
+            matches.append(d)
+            break
+        if query in nd.split():
+            matches.append(d)
+        if query in nd:
+            matches.append(d)
+    return matches
+
+SYLLABLES = ["ka", "lo", "mi", "ren", "to", "vas", "bel", "dor", "qui", "zan", "fe", "gu", "hol", "pra", "sti", "wen"]
+
+def directory(size: int) -> list[str]:
+    names = [f"Dr. {f} {l}" for f in FIRST for l in LAST]
+    # the rest get made up three syllable surnames (4096 of them)
+    n = len(SYLLABLES)
+    for i in range(size - len(names)):
+        surname = SYLLABLES[i % n] + SYLLABLES[i // n % n] + SYLLABLES[i // n ** 2 % n]
+        names.append(f"Dr. {FIRST[i % len(FIRST)]} {surname.capitalize()}")
+    return names[:size]
+
+def measure(match, doctors: list[str]) -> tuple[float, float, int]:
+    latencies = []
+    for _ in range(ROUNDS):
+        for query in QUERIES:
+            start = time.perf_counter()
+            match(query, doctors)
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    matched = sum(bool(match(query, doctors)) for query in QUERIES)
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99)], matched
+
+def main():
+    print(f"{len(QUERIES)} queries: {', '.join(QUERIES)}")
+    print(f"{'providers':>9} | {'matcher':>7} | {'p50':>9} | {'p99':>9} | matched | build")
+    for size in SIZES:
+        doctors = directory(size)
+        start = time.perf_counter()
+        index = DoctorNameIndex(doctors)
+        build = time.perf_counter() - start
+        for label, match, built in (("loop", loop_match, ""), ("index", lambda q, d: index.match(q), f"{build * 1e3:.1f} ms")):
+            p50, p99, matched = measure(match, doctors)
+            print(f"{size:>9} | {label:>7} | {p50 * 1e6:>6.1f} us | {p99 * 1e6:>6.1f} us | {matched:>5}/{len(QUERIES)} | {built}")
+
+if __name__ == "__main__":
+    main()
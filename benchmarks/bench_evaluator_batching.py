@@ -0,0 +1,106 @@
+"""
+Benchmark: cost and throughput of the QA evaluator's scoring modes against a fake LLM.
+
+The fake evaluator is a ScriptedChatModel that takes REQUEST_LATENCY per request plus
+OUTPUT_LATENCY per evaluation it writes, and counts the prompt characters it is sent.
+For each mode, PAIRS pairs go through EvaluatorCallbackHandler and are scored to a JSONL sink:
+- abatch: one request per pair, max_concurrency requests at a time
+- request: one request per batch of `batch_size` pairs
+Reports evaluator requests and prompt characters per scored pair, and pairs scored per second.
+The last rows show what the default sampling policy leaves to score.
+
+Run from the repository root:
+    python -m benchmarks.bench_evaluator_batching
+"""
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from pydantic import PrivateAttr
+
+# the evaluator builds its (unused here) OpenAI client
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+from agents.hooks.evaluation_sink import JsonlEvaluationSink
+from agents.hooks.evaluator_callback import AnswerQuality, BatchAnswerQuality, EvaluatorCallbackHandler, IndexedAnswerQuality
+from agents.hooks.sampling import SamplingPolicy
+from agents.scripted_llm import ScriptedChatModel
+from logging_config import logger
+
+logger.disable("agents.hooks") # one QA_EVAL line per scored pair
+
+PAIRS = 200
+THREADS = 40
+NODES = ["identity_collector", "primary_appointment", "add_appointment", "cancel_appointment", "reschedule_appointment"]
+REQUEST_LATENCY = 0.2
+OUTPUT_LATENCY = 0.02
+SCORES = dict(answer_relevance_accuracy=8, user_need_relevance=9, groundedness=7, overall_score=8.1, explanation="On topic and actionable.")
+
+class SlowEvaluatorModel(ScriptedChatModel):
+    _prompt_chars: int = PrivateAttr(default=0)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self._prompt_chars += sum(len(str(m.content)) for m in messages)
+        result = self._generate(messages, stop, **kwargs)
+        args = result.generations[0].message.tool_calls[0]["args"]
+        await asyncio.sleep(REQUEST_LATENCY + OUTPUT_LATENCY * len(args.get("evaluations", [args])))
+        return result
+
+def evaluator(mode: str, batch_size: int) -> SlowEvaluatorModel:
+    if mode == "abatch":
+        return SlowEvaluatorModel().load(AnswerQuality(**SCORES) for _ in range(PAIRS))
+    batches = [range(start, min(start + batch_size, PAIRS)) for start in range(0, PAIRS, batch_size)]
+    return SlowEvaluatorModel().load(
+        BatchAnswerQuality(evaluations=[IndexedAnswerQuality(index=i, **SCORES) for i in range(len(b))]) for b in batches
+    )
+
+async def feed(handler: EvaluatorCallbackHandler, pairs: int) -> None:
+    for i in range(pairs):
+        run_id = uuid.uuid4()
+        metadata = {"langgraph_node": NODES[i % len(NODES)], "thread_id": f"thread {i % THREADS}"}
+        question = f"Can I move my appointment with Dr. Smith on the {i % 28 + 1}th to the afternoon? (request {i})"
+        answer = f"Sure, I moved your appointment with Dr. Smith to the {i % 28 + 1}th at 3:00 PM. Anything else? (reply {i})"
+        await handler.on_chat_model_start({}, [[HumanMessage(content=question)]], run_id=run_id, metadata=metadata)
+        await handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=AIMessage(content=answer))]]), run_id=run_id)
+
+async def measure(mode: str, batch_size: int, max_concurrency: int, workers: int) -> tuple[float, float, float]:
+    llm = evaluator(mode, batch_size)
+    with tempfile.TemporaryDirectory() as tmp:
+        handler = EvaluatorCallbackHandler(
+            max_queue=PAIRS, workers=workers, batch_size=batch_size, batch_wait=0.01,
+            sampling=SamplingPolicy(rate=1.0, per_thread_cap=None),
+            sink=JsonlEvaluationSink(os.path.join(tmp, "scores.jsonl")),
+            batch_mode=mode, max_concurrency=max_concurrency, eval_llm=llm,
+        )
+        start = time.perf_counter()
+        await feed(handler, PAIRS)
+        await handler.join()
+        elapsed = time.perf_counter() - start
+        await handler.aclose()
+        assert handler.scored == PAIRS, handler.stats()
+    return handler.evaluator_requests / PAIRS, llm._prompt_chars / PAIRS, PAIRS / elapsed
+
+async def main():
+    print(f"{PAIRS} pairs, evaluator {REQUEST_LATENCY * 1e3:.0f} ms per request + {OUTPUT_LATENCY * 1e3:.0f} ms per evaluation")
+    print(f"{'mode':<40} | requests/pair | prompt chars/pair | pairs/s")
+    for mode, batch_size, max_concurrency, workers in [
+        ("abatch", 8, 1, 1),
+        ("abatch", 8, 4, 2),
+        ("abatch", 16, 8, 2),
+        ("request", 8, 1, 2),
+        ("request", 16, 1, 2),
+        ("request", 32, 1, 2),
+    ]:
+        requests, chars, throughput = await measure(mode, batch_size, max_concurrency, workers)
+        name = f"{mode} batch={batch_size} concurrency={max_concurrency} workers={workers}"
+        print(f"{name:<40} | {requests:>13.3f} | {chars:>17.0f} | {throughput:>7.1f}")
+
+    for label, policy in [("default sampling", SamplingPolicy()), ("sampling, cancel/reschedule x10", SamplingPolicy(node_rates={"cancel_appointment": 0.5, "reschedule_appointment": 0.5}))]:
+        for i in range(10_000):
+            policy.sample(f"pair {i}", node=NODES[i % len(NODES)], thread_id=f"thread {i // 10}")
+        print(f"{label}: {policy.sampled} of 10000 pairs scored (10 turns per thread)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+Benchmark: QA evaluator callback under a burst of LLM calls with a slow evaluator.
+
+"before" spawns one task per pair and remembers every pair (the previous EvaluatorCallbackHandler),
+"after" is the bounded queue with batching and load shedding. Both evaluators take EVAL_LATENCY per request
+(a batch counts as one request). Reports the memory held once the burst is in, the callback cost,
+and how late a 1 ms timer fires at worst while the evaluator backlog runs (event loop lag seen by request handling).
+
+Run from the repository root:
+    python -m benchmarks.bench_evaluator_queue
+"""
+import asyncio
+import os
+import time
+import tracemalloc
+import uuid
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+# the evaluator builds its (unused here) OpenAI client
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+from agents.hooks.evaluator_callback import EvaluatorCallbackHandler
+from agents.hooks.sampling import SamplingPolicy
+from logging_config import logger
+
+logger.disable("agents.hooks") # the queue full warnings
+
+PAIRS = 20_000
+EVAL_LATENCY = 0.2
+
+class LegacyEvaluatorCallbackHandler(EvaluatorCallbackHandler):
+    """
+    The previous behaviour: a task per pair and an ever growing set of evaluated pairs.
+    """
+    def __init__(self):
+        super().__init__(sampling=SamplingPolicy(rate=1.0, per_thread_cap=None))
+        self._all_pairs: set[tuple[str, str]] = set()
+
+    async def on_llm_end(self, response, *, run_id, **kwargs):
+        pair = self._runs.pop(run_id, None)
+        pair.ai = self._get_ai_from_result(response)
+        pair_key = self._pair_key(pair.human, pair.ai)
+        if pair_key in self._all_pairs:
+            return
+        self._all_pairs.add(pair_key)
+        asyncio.create_task(self._run_evaluator_batch([pair]))
+
+async def slow_evaluator(pairs):
+    await asyncio.sleep(EVAL_LATENCY)
+
+async def loop_lag_ms(duration: float) -> float:
+    lags = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+    return max(lags) * 1e3
+
+async def measure(handler: EvaluatorCallbackHandler) -> tuple[float, float, float]:
+    handler._run_evaluator_batch = slow_evaluator
+    results = [LLMResult(generations=[[ChatGeneration(message=AIMessage(content=f"answer {i}"))]]) for i in range(PAIRS)]
+    histories = [[HumanMessage(content=f"question {i}")] for i in range(PAIRS)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    callback_time = 0.0
+    for i in range(PAIRS):
+        run_id = uuid.uuid4()
+        start = time.perf_counter()
+        await handler.on_chat_model_start({}, [histories[i]], run_id=run_id)
+        await handler.on_llm_end(results[i], run_id=run_id)
+        callback_time += time.perf_counter() - start
+    held = (tracemalloc.get_traced_memory()[0] - before) / 1024 / 1024
+    tracemalloc.stop()
+
+    lag = await loop_lag_ms(1.0)
+    if hasattr(handler, "aclose"):
+        await handler.aclose()
+    for task in asyncio.all_tasks() - {asyncio.current_task()}:
+        task.cancel()
+    return held, callback_time / PAIRS * 1e6, lag
+
+async def main():
+    print(f"{PAIRS} pairs, evaluator {EVAL_LATENCY * 1e3:.0f} ms per request")
+    print(f"{'handler':<8} | {'memory held':>11} | {'callback':>9} | worst loop lag")
+    for name, handler in [("before", LegacyEvaluatorCallbackHandler()), ("after", EvaluatorCallbackHandler(sampling=SamplingPolicy(rate=1.0, per_thread_cap=None)))]:
+        held, callback_us, lag = await measure(handler)
+        print(f"{name:<8} | {held:>7.1f} MiB | {callback_us:>6.1f} us | {lag:.2f} ms")
+        if name == "after":
+            print(f"after: {handler.stats()}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
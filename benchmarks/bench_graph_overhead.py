@@ -0,0 +1,185 @@
+"""
+Benchmark suite (pytest-benchmark): graph overhead per chat turn with the LLM replaced by ScriptedChatModel.
+
+The scripted model answers instantly, so the timings are the framework cost of a turn:
+routing, state reducers, checkpointing, prompt formatting, tool execution and the services.
+Besides the turn time, every benchmark reports the median time spent in each node and the memory
+allocated by one turn (traced in a separate, untimed run).
+
+Run from the repository root, on its own (the fake LLM must be installed before the graph is imported):
+    python -m pytest benchmarks/bench_graph_overhead.py
+"""
+import os
+
+os.environ["LLM_PROVIDER"] = "fake"
+
+import asyncio
+import itertools
+import statistics
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any
+import pytest
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.types import Command
+from agents.appointment.add_appointment_node import ToAddAppointment
+from agents.checkpointer import ahas_pending_interrupt
+from agents.graph import workflow
+from agents.identity.identity_collector_node import UpdateInfoWithResponse
+from agents.llms import get_llm_mini_model
+from agents.scripted_llm import ScriptedChatModel
+from services.appointment_service import appointment_service
+
+PROFILE_RUNS = 20
+DOCTOR = "Dr. Lang Smith"
+
+llm: ScriptedChatModel = get_llm_mini_model()
+graph = workflow.compile(checkpointer=InMemorySaver())
+days = itertools.count(1)
+
+class NodeTimer(BaseCallbackHandler):
+    """
+    Wall time per graph node (a node run is the chain run named after its langgraph_node).
+    """
+    run_inline = True
+
+    def __init__(self):
+        self.durations: dict[str, list[float]] = defaultdict(list)
+        self._started: dict[Any, tuple[str, float]] = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if node is not None and kwargs.get("name") == node:
+            self._started[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        if started := self._started.pop(run_id, None):
+            self.durations[started[0]].append(time.perf_counter() - started[1])
+
+    on_chain_error = on_chain_end # interrupt() ends a node with GraphInterrupt
+
+
+async def turn(message: str, thread_id: str, callbacks: list | None = None):
+    config = {"configurable": {"thread_id": thread_id}, "callbacks": callbacks or []}
+    if await ahas_pending_interrupt(graph.checkpointer, config):
+        return await graph.ainvoke(Command(resume=message), config)
+    return await graph.ainvoke({"messages": [HumanMessage(content=message)]}, config)
+
+def identity_script() -> list:
+    return [
+        "Hello John, how can I help you today?",
+    ]
+
+def identity_llm_script() -> list:
+    return [
+        UpdateInfoWithResponse(name="John Doe", date_of_birth="1960-01-01", ssn_last_4="1111", response="Thank you, John."),
+        "Hello John, how can I help you today?",
+    ]
+
+def booking_script(day: str) -> list:
+    appointment = {"date": day, "time": "10:00", "provider": DOCTOR}
+    return [
+        ToAddAppointment(request=f"Book {DOCTOR} on {day} at 10:00"),
+        ScriptedChatModel.tool_call("check_appointment", appointment=appointment),
+        f"I can schedule the appointment on {day} at 10:00 with {DOCTOR}. Would you like me to confirm this? (yes/no)",
+    ]
+
+def confirm_script(day: str) -> list:
+    return [
+        ScriptedChatModel.tool_call("commit_appointment", appointment={"date": day, "time": "10:00", "provider": DOCTOR}),
+        f"Your appointment on {day} at 10:00 with {DOCTOR} is booked.",
+    ]
+
+def new_day() -> str:
+    # a fresh slot every round, so every booking goes through the conflict free path
+    return (date.today() + timedelta(days=365 + next(days))).isoformat()
+
+# each flow: prepare(thread_id) -> (message, script) of the measured turn, with the thread brought to the state before it
+async def prepare_identity(thread_id: str):
+    return "Hi, my name is John Doe, born 1960-01-01, SSN 1111. I'd like to book an appointment", identity_script()
+
+async def prepare_identity_llm(thread_id: str):
+    # the question needs the collector LLM, the identity fields alone would be handled by the extractor
+    return "Hi, my name is John Doe, born 1960-01-01, SSN 1111. Can I book an appointment?", identity_llm_script()
+
+async def prepare_booking(thread_id: str):
+    message, script = await prepare_identity(thread_id)
+    llm.load(script)
+    await turn(message, thread_id)
+    day = new_day()
+    return f"Book {DOCTOR} on {day} at 10:00", booking_script(day)
+
+async def prepare_confirm(thread_id: str):
+    message, script = await prepare_booking(thread_id)
+    llm.load(script)
+    await turn(message, thread_id)
+    return "yes", confirm_script(script[2].split(" on ")[1].split(" at ")[0])
+
+FLOWS = {
+    "identity_verification": prepare_identity,
+    "identity_verification_llm": prepare_identity_llm,
+    "appointment_booking_request": prepare_booking,
+    "appointment_booking_confirm": prepare_confirm,
+}
+
+def profile(loop: asyncio.AbstractEventLoop, prepare) -> tuple[dict[str, float], float, float]:
+    """
+    Untimed runs: median ms per node, and KiB allocated (peak and still held after the turn) by one turn.
+    """
+    timer = NodeTimer()
+    for _ in range(PROFILE_RUNS):
+        thread_id = str(uuid.uuid4())
+        message, script = loop.run_until_complete(prepare(thread_id))
+        llm.load(script)
+        loop.run_until_complete(turn(message, thread_id, [timer]))
+
+    thread_id = str(uuid.uuid4())
+    message, script = loop.run_until_complete(prepare(thread_id))
+    llm.load(script)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    loop.run_until_complete(turn(message, thread_id))
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nodes = {node: round(statistics.median(d) * 1e3, 3) for node, d in timer.durations.items()}
+    return nodes, (peak - before) / 1024, (current - before) / 1024
+
+
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.mark.parametrize("flow", FLOWS)
+def test_turn_overhead(benchmark, loop, flow):
+    prepare = FLOWS[flow]
+
+    def setup():
+        thread_id = str(uuid.uuid4())
+        message, script = loop.run_until_complete(prepare(thread_id))
+        llm.load(script)
+        return (message, thread_id), {}
+
+    result = benchmark.pedantic(lambda message, thread_id: loop.run_until_complete(turn(message, thread_id)), setup=setup, rounds=50, warmup_rounds=3)
+
+    # the scripted conversation went where it should and used up its script
+    assert llm.remaining == []
+    if flow.startswith("identity_verification"):
+        assert result["user_verified"] and result["user"].id == "1"
+    elif flow == "appointment_booking_request":
+        assert "__interrupt__" not in result and result["appointment_state"] == ["add_appointment"]
+    else:
+        booked = [a for a in appointment_service.get_appointments("1") if a.provider == DOCTOR and a.time == "10:00"]
+        assert booked and booked[-1].status == "Confirmed"
+
+    nodes, peak_kib, retained_kib = profile(loop, prepare)
+    benchmark.extra_info.update({"node_median_ms": nodes, "alloc_peak_kib": round(peak_kib, 1), "alloc_retained_kib": round(retained_kib, 1)})
+    print(f"\n{flow}: allocated peak {peak_kib:.1f} KiB, retained {retained_kib:.1f} KiB")
+    for node, ms in sorted(nodes.items(), key=lambda item: -item[1]):
+        print(f"  {node:<45} {ms:>8.3f} ms")
@@ -0,0 +1,79 @@
+"""
+Benchmark: prompt tokens per turn of the add appointment assistant over 50-turn conversations,
+with the whole history (before) and with compact_history (after).
+
+A conversation mixes what the appointment phase produces: hand-offs from the primary assistant
+(tool call + the entry node's instructions), availability checks with their results, bookings and chit-chat.
+Tokens are counted with count_tokens_approximately on the formatted add_appointment_prompt.
+Also reports the time compact_history takes per call.
+
+Run from the repository root:
+    python -m benchmarks.bench_history_compaction
+"""
+import os
+import random
+import statistics
+import time
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+# the graph modules build their (unused here) OpenAI client at import
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+from agents.appointment.prompts.appointment_prompts import add_appointment_prompt
+from agents.appointment.util.helpers import create_entry_node
+from agents.appointment.util.history import HISTORY_KEEP_TURNS, HISTORY_MAX_TOKENS, compact_history
+
+TURNS = 50
+CONVERSATIONS = 20
+REPORT_AT = (1, 5, 10, 20, 30, 40, 50)
+DOCTOR = "Dr. Lang Smith"
+
+entry_node = create_entry_node("Appointment Booking Assistant", "add_appointment")
+
+def turn_messages(rng: random.Random, i: int) -> list:
+    day = f"2026-02-{rng.randint(1, 28):02d}"
+    kind = rng.choice(["handoff", "check", "check", "book", "chat"])
+    human = HumanMessage(content=f"Could you book {DOCTOR} on {day} at 10:00?" if kind != "chat" else "Thanks, and do I need to bring anything?")
+    if kind == "chat":
+        return [human, AIMessage(content="Please bring your insurance card and arrive 10 minutes early.")]
+    if kind == "handoff":
+        call = AIMessage(content="", tool_calls=[{"name": "ToAddAppointment", "args": {"request": human.content}, "id": f"handoff_{i}"}])
+        entry = entry_node({"messages": [call]})["messages"][0]
+        return [human, call, entry, AIMessage(content=f"Sure, let me check {day} at 10:00 for you.")]
+    tool = "check_appointment" if kind == "check" else "commit_appointment"
+    appointment = {"date": day, "time": "10:00", "provider": DOCTOR}
+    call = AIMessage(content="", tool_calls=[{"name": tool, "args": {"appointment": appointment}, "id": f"{tool}_{i}"}])
+    slots = ", ".join(f"{h:02d}:{m:02d}" for h in range(8, 17) for m in (0, 30))
+    result = f"{DOCTOR} is available on {day} at 10:00. Free slots that day: {slots}." if kind == "check" else f"Booked: {appointment}"
+    return [human, call, ToolMessage(content=result, tool_call_id=f"{tool}_{i}"), AIMessage(content=f"{day} at 10:00 with {DOCTOR} is {'free' if kind == 'check' else 'booked'}.")]
+
+def prompt_tokens(messages: list) -> int:
+    return count_tokens_approximately(add_appointment_prompt.format_messages(name="John", messages=messages))
+
+def main():
+    rng = random.Random(7)
+    before = {t: [] for t in REPORT_AT}
+    after = {t: [] for t in REPORT_AT}
+    compaction_us = []
+    for _ in range(CONVERSATIONS):
+        history = []
+        for t in range(1, TURNS + 1):
+            # the prompt of the turn's first LLM call: the history so far plus the new user message
+            turn = turn_messages(rng, t)
+            history_at_call = history + turn[:1]
+            start = time.perf_counter()
+            compacted = compact_history(history_at_call)
+            compaction_us.append((time.perf_counter() - start) * 1e6)
+            if t in REPORT_AT:
+                before[t].append(prompt_tokens(history_at_call))
+                after[t].append(prompt_tokens(compacted))
+            history += turn
+
+    print(f"{CONVERSATIONS} conversations of {TURNS} turns, keep {HISTORY_KEEP_TURNS} turns, budget {HISTORY_MAX_TOKENS} tokens")
+    print(f"{'turn':>4} | prompt tokens before | after")
+    for t in REPORT_AT:
+        print(f"{t:>4} | {statistics.mean(before[t]):>20.0f} | {statistics.mean(after[t]):>5.0f}")
+    print(f"compact_history: median {statistics.median(compaction_us):.0f} us, max {max(compaction_us):.0f} us per call")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: intent cache hit ratio on replayed /chat traffic.
+
+Replays a JSON lines file of /chat requests ({"message": ..., "thread_id": ...}) through
+identity_collector_node.classify_intent with the intent LLM call replaced by a counting stub,
+for a few cache sizes, and reports hit ratio, LLM calls avoided and the cost of a lookup.
+Without a file, synthetic traffic is generated: popular opening phrasings with surface variations
+(case, punctuation, spacing), then unique identity details and short follow-ups.
+
+Run from the repository root:
+    python -m benchmarks.bench_intent_cache [traffic.jsonl]
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+# the graph modules build their (unused here) OpenAI client at import
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+from langchain_core.runnables import RunnableLambda
+import agents.identity.identity_collector_node as identity_collector_node
+from agents.identity.intent_cache import IntentCache
+from agents.identity.prompts.intent_prompt import IntentResult
+
+CONVERSATIONS = 5000
+CACHE_SIZES = [64, 256, 1024]
+
+OPENINGS = [
+    ("add_appointment", ["book an appointment", "I'd like to book an appointment", "I want to make an appointment", "I need to see a doctor", "schedule an appointment please"]),
+    ("cancel_appointment", ["cancel my appointment", "I want to cancel my appointment", "please cancel my appointment"]),
+    ("reschedule_appointment", ["reschedule my appointment", "I need to move my appointment", "can I change my appointment time"]),
+    ("list_appointments", ["show my appointments", "what appointments do I have", "list my upcoming appointments"]),
+]
+FOLLOW_UPS = ["yes", "no", "Yes please", "that works", "ok", "10am works", "tomorrow morning"]
+FIRST_NAMES = ["John", "Jane", "Jim", "Jill", "Jack", "Maria", "Ahmed", "Wei", "Olga", "Sam"]
+LAST_NAMES = ["Doe", "Smith", "Beam", "Johnson", "Daniels", "Garcia", "Khan", "Chen", "Ivanova", "Lee"]
+
+def vary(text: str, rng: random.Random) -> str:
+    if rng.random() < 0.3:
+        text = text.capitalize()
+    if rng.random() < 0.3:
+        text += rng.choice([".", "!", "?", " ."])
+    if rng.random() < 0.1:
+        text = text.replace(" ", "  ", 1)
+    if rng.random() < 0.1:
+        text = "Hi, " + text
+    return text
+
+def synthetic_traffic(rng: random.Random) -> list[dict]:
+    phrasings = [p for _, ps in OPENINGS for p in ps]
+    weights = [1 / (rank + 1) for rank in range(len(phrasings))] # a few phrasings are much more common
+    requests = []
+    for n in range(CONVERSATIONS):
+        thread_id = f"thread-{n}"
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        dob = f"{rng.randint(1940, 2005)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        requests.append({"message": vary(rng.choices(phrasings, weights)[0], rng), "thread_id": thread_id})
+        requests.append({"message": f"I'm {name}, born {dob}, SSN {rng.randint(0, 9999):04d}", "thread_id": thread_id})
+        requests.append({"message": rng.choice(FOLLOW_UPS), "thread_id": thread_id})
+    return requests
+
+def load_traffic(path: str) -> list[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def classify(text: str) -> IntentResult:
+    lowered = text.lower()
+    for intent, _ in OPENINGS:
+        if intent.split("_")[0] in lowered:
+            return IntentResult(intent=intent, confidence=0.9, original_message=text)
+    return IntentResult(intent="other", confidence=0.5, original_message=text)
+
+async def replay(requests: list[dict], cache: IntentCache) -> int:
+    calls = 0
+
+    def stub(inputs: dict) -> IntentResult:
+        nonlocal calls
+        calls += 1
+        return classify(inputs["text"])
+
+    identity_collector_node.intent_cache = cache
+    identity_collector_node.intent_chain = RunnableLambda(stub)
+    for request in requests:
+        await identity_collector_node.classify_intent(request["message"])
+    return calls
+
+def lookup_us(requests: list[dict], cache: IntentCache) -> float:
+    start = time.perf_counter()
+    for request in requests:
+        cache.get(request["message"])
+    return (time.perf_counter() - start) / len(requests) * 1e6
+
+async def main():
+    requests = load_traffic(sys.argv[1]) if len(sys.argv) > 1 else synthetic_traffic(random.Random(7))
+    print(f"{len(requests)} requests, {len({r['message'] for r in requests})} distinct messages")
+    print(f"{'cache size':>10} | {'hit ratio':>9} | {'LLM calls':>9} | {'avoided':>7} | {'evictions':>9} | lookup")
+    for size in CACHE_SIZES:
+        cache = IntentCache(max_size=size)
+        calls = await replay(requests, cache)
+        stats = cache.stats()
+        print(f"{size:>10} | {stats['hit_ratio']:>9.1%} | {calls:>9} | {len(requests) - calls:>7} | {stats['evictions']:>9} | {lookup_us(requests, cache):.2f} us")
+
+if __name__ == "__main__":
+    asyncio.run(main())
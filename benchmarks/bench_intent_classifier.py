@@ -0,0 +1,41 @@
+"""
+Benchmark: local intent classifier on the labelled fixture (tests/fixtures/intents.jsonl).
+
+For a few confidence thresholds: the share of messages answered locally (no intent LLM call),
+the accuracy of those answers, and the classification latency. Messages below the threshold go to the LLM.
+
+Run from the repository root:
+    python -m benchmarks.bench_intent_classifier
+"""
+import json
+import pathlib
+import statistics
+import time
+from agents.intent_classifier import local_intent_classifier
+
+FIXTURE = pathlib.Path(__file__).resolve().parents[1] / "tests" / "fixtures" / "intents.jsonl"
+THRESHOLDS = [0.5, 0.7, 0.8, 0.9, 0.95]
+ROUNDS = 200
+
+def main():
+    with open(FIXTURE) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+
+    latencies = []
+    for _ in range(ROUNDS):
+        for row in rows:
+            start = time.perf_counter()
+            local_intent_classifier.classify(row["text"])
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(f"{len(rows)} labelled messages, classify p50 {statistics.median(latencies) * 1e6:.1f} us, p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.1f} us")
+
+    results = [(row["intent"], local_intent_classifier.classify(row["text"])) for row in rows]
+    print(f"{'threshold':>9} | {'local':>6} | {'accuracy':>8} | LLM calls")
+    for threshold in THRESHOLDS:
+        answered = [(label, r) for label, r in results if r.confidence >= threshold]
+        accuracy = sum(label == r.intent for label, r in answered) / len(answered) if answered else 0.0
+        print(f"{threshold:>9.2f} | {len(answered) / len(rows):>6.1%} | {accuracy:>8.1%} | {len(rows) - len(answered)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: logging overhead per chat turn, as seen by the request path.
+
+A turn logs what the identity collector turn logs: the collector and intent responses (llm),
+the response message (llm), a QA evaluator line and an app line.
+"before" is the previous setup: messages built eagerly with f-strings, written synchronously.
+The other rows use the lazy calls of the nodes with the handler settings shown.
+Records go to a file whose writes take WRITE_LATENCY, like stderr on a terminal or a pipe read by
+the container runtime (loguru flushes after every record).
+Reports the time the turn spends in logging calls, and the time until every record is written.
+
+Run from the repository root:
+    python -m benchmarks.bench_logging
+"""
+import os
+import statistics
+import tempfile
+import time
+from langchain_core.messages import AIMessage
+
+# the graph modules build their (unused here) OpenAI client at import
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+from agents.identity.identity_collector_node import UpdateInfoWithResponse
+from agents.identity.prompts.intent_prompt import IntentResult
+from logging_config import configure_logging, flush_logs, llm_logger, logger, payload, qa_evaluator_logger
+
+TURNS = 2000
+WRITE_LATENCY = 50e-6
+
+class SlowStream:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, text: str) -> None:
+        time.sleep(WRITE_LATENCY)
+        self.f.write(text)
+
+    def flush(self) -> None:
+        self.f.flush()
+
+identity_res = UpdateInfoWithResponse(name="John Doe", date_of_birth="1960-01-01", ssn_last_4="1111", response="Thank you, John. What can I help you with today?")
+intent_res = IntentResult(intent="add_appointment")
+response = AIMessage(content="You are booked with Dr. Lang Smith on Monday, January 5 at 10:30 AM.", response_metadata={"model_name": "gpt-4.1-mini", "finish_reason": "stop"}, id="run-1")
+
+def eager_turn(i: int) -> None:
+    llm_logger.info(f"identity_collector_node response: {identity_res}")
+    llm_logger.info(f"identity_collector_node intent response: {intent_res}")
+    llm_logger.info(f"add_appointment_node: response: {response}")
+    qa_evaluator_logger.info(f"QA_EVAL: node=add_appointment, overall={8.1:.2f}, human={'book me in'!r}, ai={response.content!r}")
+    logger.info(f"turn {i} done")
+
+def lazy_turn(i: int) -> None:
+    llm_logger.info("identity_collector_node response: {}", lambda: payload(identity_res))
+    llm_logger.info("identity_collector_node intent response: {}", lambda: payload(intent_res))
+    llm_logger.info("add_appointment_node: response: {}", lambda: payload(response))
+    qa_evaluator_logger.info("QA_EVAL: node={}, overall={:.2f}, human={!r}, ai={!r}", "add_appointment", 8.1, "book me in", response.content)
+    logger.info("turn {} done", i)
+
+def measure(turn, **settings) -> tuple[float, float, float]:
+    with tempfile.TemporaryDirectory() as tmp, open(os.path.join(tmp, "log"), "w") as f:
+        configure_logging(SlowStream(f), **settings)
+        durations = []
+        start = time.perf_counter()
+        for i in range(TURNS):
+            turn_start = time.perf_counter()
+            turn(i)
+            durations.append(time.perf_counter() - turn_start)
+        flush_logs()
+        drained = time.perf_counter() - start
+        configure_logging()
+    durations.sort()
+    return statistics.mean(durations) * 1e6, durations[int(len(durations) * 0.99)] * 1e6, drained / TURNS * 1e6
+
+def main():
+    print(f"{TURNS} turns, 5 records per turn, {WRITE_LATENCY * 1e6:.0f} us per write")
+    print(f"{'setup':<42} | mean/turn | p99/turn | until written/turn")
+    for name, turn, settings in [
+        ("before (eager, synchronous)", eager_turn, dict(log_format="pretty", enqueue=False)),
+        ("lazy, pretty, synchronous", lazy_turn, dict(log_format="pretty", enqueue=False)),
+        ("lazy, pretty, enqueued", lazy_turn, dict(log_format="pretty", enqueue=True)),
+        ("lazy, json, enqueued", lazy_turn, dict(log_format="json", enqueue=True)),
+        ("lazy, json, enqueued, LOG_LEVEL_LLM=WARNING", lazy_turn, dict(log_format="json", enqueue=True, levels={"llm": "WARNING"})),
+    ]:
+        mean, p99, drained = measure(turn, **settings)
+        print(f"{name:<42} | {mean:>6.1f} us | {p99:>5.1f} us | {drained:>8.1f} us")
+
+if __name__ == "__main__":
+    main()
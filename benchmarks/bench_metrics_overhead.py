@@ -0,0 +1,73 @@
+"""
+Benchmark: overhead of the /metrics instrumentation on a chat turn.
+
+Runs the scripted flows of bench_graph_overhead with graph_metrics enabled and disabled, alternating turns,
+and compares the median turn times. The scripted model gets the metrics callback like the real models
+(agents/llms.py) and the nodes are timed by TimedStateGraph. The tool nodes carry the callback
+in every setting (it is bound when the graph is built), it records nothing while disabled.
+"graph callback" is the first attempt for comparison: one MetricsCallbackHandler passed with the turn's
+config, so every runnable of the turn reports to it. The scripted LLM answers instantly, so the overhead is measured
+against the framework cost of a turn only (a real turn adds the LLM latency on top).
+Also reports the cost of one handler event. Fails when the overhead exceeds MAX_OVERHEAD.
+
+Run from the repository root:
+    python -m benchmarks.bench_metrics_overhead
+"""
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from benchmarks.bench_graph_overhead import FLOWS, llm, turn
+from agents.hooks.metrics import GraphMetrics, MetricsCallbackHandler, graph_metrics, metrics_callback
+from logging_config import logger
+
+logger.disable("agents") # the nodes log every LLM response
+
+ROUNDS = 150
+EVENTS = 100_000
+MAX_OVERHEAD = 0.05 # of a scripted turn
+
+async def measure_flow(prepare) -> tuple[float, float, float]:
+    graph_callback = MetricsCallbackHandler(GraphMetrics())
+    timings: dict[str, list[float]] = {"off": [], "on": [], "graph callback": []}
+    for i in range(ROUNDS * 3):
+        setting = list(timings)[i % 3]
+        thread_id = str(uuid.uuid4())
+        message, script = await prepare(thread_id)
+        llm.load(script)
+        graph_metrics.enabled = setting == "on"
+        llm.callbacks = [metrics_callback] if setting == "on" else None
+        start = time.perf_counter()
+        await turn(message, thread_id, [graph_callback] if setting == "graph callback" else None)
+        timings[setting].append(time.perf_counter() - start)
+    graph_metrics.enabled = True
+    return tuple(statistics.median(t) for t in timings.values())
+
+def event_cost_us() -> float:
+    handler = MetricsCallbackHandler(GraphMetrics())
+    metadata = {"langgraph_node": "primary_appointment"}
+    response = LLMResult(generations=[[ChatGeneration(message=AIMessage(content="ok", usage_metadata={"input_tokens": 900, "output_tokens": 40, "total_tokens": 940}))]])
+    run_ids = [uuid.uuid4() for _ in range(EVENTS)]
+    start = time.perf_counter()
+    for run_id in run_ids:
+        handler.on_chat_model_start({}, [], run_id=run_id, metadata=metadata)
+        handler.on_llm_end(response, run_id=run_id)
+    return (time.perf_counter() - start) / (EVENTS * 2) * 1e6
+
+async def main() -> bool:
+    print(f"{ROUNDS} turns per flow and setting, threshold {MAX_OVERHEAD:.0%}")
+    print(f"{'flow':<28} | off      | on       | overhead | graph callback")
+    ok = True
+    for name, prepare in FLOWS.items():
+        off, on, graph_callback = await measure_flow(prepare)
+        overhead = on / off - 1
+        ok &= overhead <= MAX_OVERHEAD
+        print(f"{name:<28} | {off * 1e3:5.2f} ms | {on * 1e3:5.2f} ms | {overhead:+7.1%} | {graph_callback * 1e3:5.2f} ms ({graph_callback / off - 1:+.1%})")
+    print(f"handler event: {event_cost_us():.2f} us")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
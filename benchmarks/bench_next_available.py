@@ -0,0 +1,59 @@
+"""
+Benchmark: one multi-day "next available" query vs. asking day by day.
+
+Today, when a day is full the model picks another date and calls check_appointment again,
+one LLM round trip per day. The per-day loop below is what that costs on the service side;
+the round-trip count is what it costs in model turns.
+
+Run from the repository root:
+    python -m benchmarks.bench_next_available
+"""
+import time
+from datetime import date, timedelta
+from agents.models.appointment import Appointment
+from services.appointment_service import AppointmentService
+from services.appointment_store import InMemoryAppointmentStore
+
+PROVIDER = "Dr. Busy"
+HOURS = [f"{h:02d}:00" for h in range(9, 17)]
+WANTED = 5
+RUNS = 2_000
+
+def fully_booked_service(full_days: int) -> AppointmentService:
+    start = date(2030, 1, 1)
+    appointments = [
+        Appointment(user_id="1", date=(start + timedelta(days=d)).isoformat(), time=t, provider=PROVIDER)
+        for d in range(full_days) for t in HOURS
+    ]
+    return AppointmentService(InMemoryAppointmentStore(appointments))
+
+def day_by_day(service: AppointmentService) -> tuple[list[tuple[str, str]], int]:
+    found, calls, day = [], 0, date(2030, 1, 1)
+    while len(found) < WANTED:
+        calls += 1
+        found += [(day.isoformat(), t) for t in service.get_doctor_available_times_for_day(PROVIDER, day.isoformat())]
+        day += timedelta(days=1)
+    return found[:WANTED], calls
+
+def main():
+    print(f"{'full days':>9} | {'per-day calls (LLM turns)':>25} | {'per-day µs':>10} | {'one query µs':>12}")
+    print("-" * 68)
+    for full_days in [0, 3, 10, 30]:
+        service = fully_booked_service(full_days)
+        expected, calls = day_by_day(service)
+        assert [(s["date"], s["time"]) for s in service.find_next_available_slots("2030-01-01", days=60, limit=WANTED, provider=PROVIDER)] == expected
+
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            day_by_day(service)
+        per_day_us = (time.perf_counter() - start) / RUNS * 1e6
+
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            service.find_next_available_slots("2030-01-01", days=60, limit=WANTED, provider=PROVIDER)
+        one_query_us = (time.perf_counter() - start) / RUNS * 1e6
+
+        print(f"{full_days:>9} | {calls:>25} | {per_day_us:>10.2f} | {one_query_us:>12.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: SQLite appointment store read latency with and without a concurrent writer.
+
+WAL mode should keep read latency flat while another connection is writing.
+
+Run from the repository root:
+    python -m benchmarks.bench_sqlite_store
+"""
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from benchmarks.bench_appointment_store import generate
+from services.appointment_service import AppointmentService
+from services.sqlite_appointment_store import SQLiteAppointmentStore
+
+ROWS = 50_000
+READERS = 4
+READS_PER_READER = 2_000
+
+def read_latencies(service: AppointmentService, user_ids: list[str]) -> list[float]:
+    rng = random.Random()
+    latencies = []
+    for _ in range(READS_PER_READER):
+        user_id = rng.choice(user_ids)
+        start = time.perf_counter()
+        service.get_appointments(user_id)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def run_readers(service: AppointmentService, user_ids: list[str]) -> list[float]:
+    results: list[list[float]] = []
+    threads = [threading.Thread(target=lambda: results.append(read_latencies(service, user_ids))) for _ in range(READERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return [l for r in results for l in r]
+
+def report(label: str, latencies: list[float]) -> None:
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f"{label:<32} | p50 {p50:>8.1f} µs | p99 {p99:>8.1f} µs")
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "appointments.db")
+        appointments = generate(ROWS)
+        service = AppointmentService(SQLiteAppointmentStore(path, seed=appointments, pool_size=READERS + 2))
+        user_ids = list({a.user_id for a in appointments})
+
+        report("readers only", run_readers(service, user_ids))
+
+        stop = threading.Event()
+        writes = 0
+        def writer():
+            nonlocal writes
+            rng = random.Random(1)
+            while not stop.is_set():
+                a = rng.choice(appointments)
+                try:
+                    service.reschedule_appointment(a.id, "2999-01-01", f"{rng.randint(0, 10**9)}")
+                    writes += 1
+                except Exception:
+                    pass
+        w = threading.Thread(target=writer)
+        w.start()
+        latencies = run_readers(service, user_ids)
+        stop.set()
+        w.join()
+        report(f"readers + writer ({writes} writes)", latencies)
+
+if __name__ == "__main__":
+    main()
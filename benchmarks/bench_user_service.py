@@ -0,0 +1,76 @@
+"""
+Benchmark: hashed identity indexes in UserService.get_user vs. the previous normalize-and-scan loop.
+
+Run from the repository root:
+    python -m benchmarks.bench_user_service
+"""
+import random
+import re
+import time
+from agents.models.user import User
+from services.user_service import UserService
+
+SIZES = [1_000, 100_000, 1_000_000]
+LOOKUPS = 1_000
+
+def generate(n: int) -> list[User]:
+    return [
+        User(
+            id=str(i),
+            name=f"Patient {i}",
+            phone=f"{i % 1000:03d}-{i // 1000 % 1000:03d}-{i % 10000:04d}",
+            date_of_birth=f"{1940 + i % 60}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            ssn_last_4=f"{i % 10000:04d}",
+        )
+        for i in range(n)
+    ]
+
+def legacy_get_user(users: list[User], name: str, date_of_birth: str, phone: str | None, ssn_last_4: str | None) -> User | None:
+    """
+    The previous implementation: every stored user is normalized again on every call.
+    """
+    name = name.lower().strip()
+    date_of_birth = date_of_birth.strip()
+    phone_number = re.sub(r'\D', '', phone).strip() if phone is not None else ""
+    ssn_last_4 = re.sub(r'\D', '', ssn_last_4).strip() if ssn_last_4 is not None else ""
+    for user in users:
+        db_user_name = user.name.lower().strip()
+        db_user_date_of_birth = user.date_of_birth.strip()
+        db_user_phone = user.phone.replace("-", "").strip()
+        db_user_ssn_last_4 = user.ssn_last_4.replace("-", "").strip()
+        if db_user_name == name and db_user_date_of_birth == date_of_birth and db_user_phone == phone_number and db_user_ssn_last_4 == ssn_last_4:
+            return user
+        if db_user_name == name and db_user_date_of_birth == date_of_birth and db_user_ssn_last_4 == ssn_last_4:
+            return user
+        if db_user_name == name and db_user_date_of_birth == date_of_birth and db_user_phone == phone_number:
+            return user
+    return None
+
+def main():
+    rng = random.Random(3)
+    print(f"{'users':>10} | {'scan µs':>12} | {'indexed µs':>10} | {'index build s':>13}")
+    print("-" * 56)
+    for n in SIZES:
+        patients = generate(n)
+        start = time.perf_counter()
+        service = UserService(patients)
+        build_s = time.perf_counter() - start
+
+        probes = [rng.choice(patients) for _ in range(LOOKUPS)]
+        queries = [(p.name.upper(), p.date_of_birth, None, p.ssn_last_4) if i % 2 else (p.name, p.date_of_birth, p.phone, None) for i, p in enumerate(probes)]
+        scan_queries = queries[: max(3, LOOKUPS * 1000 // n)]
+
+        start = time.perf_counter()
+        for q in scan_queries:
+            legacy_get_user(patients, *q)
+        scan_us = (time.perf_counter() - start) / len(scan_queries) * 1e6
+
+        start = time.perf_counter()
+        for q in queries:
+            assert service.get_user(*q) is not None
+        indexed_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+        print(f"{n:>10} | {scan_us:>12.2f} | {indexed_us:>10.2f} | {build_s:>13.2f}")
+
+if __name__ == "__main__":
+    main()
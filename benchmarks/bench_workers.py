@@ -0,0 +1,114 @@
+"""
+Load test: chat throughput of the production server (SERVER_MODE=production) by number of workers.
+
+For every worker count a server is started with `python main.py`, conversations and appointments in
+fresh SQLite files and the scripted LLM (LLM_PROVIDER=fake) answering endlessly after LLM_LATENCY seconds.
+CONCURRENCY clients then run two-turn conversations for DURATION seconds: the identity turn, then a
+follow-up on the same thread, which may land on another worker. The follow-up only gets the assistant's
+answer when the worker finds the verified identity the first turn saved in the shared checkpoints,
+so every lost thread shows up as an error. Reports turns/s, latency percentiles and errors.
+Scaling needs as many free cores as workers: the turns are CPU bound once the LLM wait overlaps.
+
+Run from the repository root:
+    python -m benchmarks.bench_workers [worker counts, default 1 2 4]
+"""
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+import httpx
+
+PORT = 8765
+CONCURRENCY = 32
+DURATION = 20.0 # seconds of load per worker count
+LLM_LATENCY = 0.05 # seconds per scripted LLM answer, a stand-in for the provider
+ANSWER = "Hello John, how can I help you today?"
+IDENTITY = "Hi, my name is John Doe, born 1960-01-01, SSN 1111. I'd like to book an appointment"
+FOLLOW_UP = "Which appointments do I have?"
+
+def start_server(workers: int, directory: str) -> subprocess.Popen:
+    script = os.path.join(directory, "script.jsonl")
+    with open(script, "w") as f:
+        f.write(json.dumps({"content": ANSWER}) + "\n")
+    env = {
+        **os.environ,
+        "SERVER_MODE": "production",
+        "WORKERS": str(workers),
+        "PORT": str(PORT),
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "unused"),
+        "LLM_PROVIDER": "fake",
+        "LLM_SCRIPT_PATH": script,
+        "LLM_SCRIPT_REPEAT": "1",
+        "LLM_SCRIPT_LATENCY": str(LLM_LATENCY),
+        "CHECKPOINTER": "sqlite",
+        "CHECKPOINT_DB_PATH": os.path.join(directory, "checkpoints.db"),
+        "APPOINTMENT_STORE": "sqlite",
+        "APPOINTMENT_DB_PATH": os.path.join(directory, "appointments.db"),
+        "LOG_LEVEL": "WARNING",
+    }
+    return subprocess.Popen([sys.executable, "main.py"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+async def wait_ready(client: httpx.AsyncClient, server: subprocess.Popen) -> None:
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with {server.returncode}")
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+async def conversations(client: httpx.AsyncClient, until: float, latencies: list[float], errors: list[str]) -> None:
+    while time.monotonic() < until:
+        thread_id = str(uuid.uuid4())
+        for message in (IDENTITY, FOLLOW_UP):
+            start = time.perf_counter()
+            try:
+                response = await client.post("/chat", json={"message": message, "thread_id": thread_id})
+            except httpx.HTTPError as exc:
+                errors.append(type(exc).__name__)
+                break
+            if response.status_code != 200 or response.json()["message"] != ANSWER:
+                errors.append(f"{response.status_code}: {response.text[:80]}")
+                break
+            latencies.append(time.perf_counter() - start)
+
+async def measure(workers: int) -> tuple[float, float, float, int]:
+    with tempfile.TemporaryDirectory() as directory:
+        server = start_server(workers, directory)
+        try:
+            limits = httpx.Limits(max_connections=CONCURRENCY)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=60) as client:
+                await wait_ready(client, server)
+                # warm up every worker (imports, connections) before measuring
+                await conversations(client, time.monotonic() + 2, [], [])
+                latencies: list[float] = []
+                errors: list[str] = []
+                start = time.monotonic()
+                await asyncio.gather(*(conversations(client, start + DURATION, latencies, errors) for _ in range(CONCURRENCY)))
+                elapsed = time.monotonic() - start
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    if errors:
+        print(f"  first error: {errors[0]}")
+    p50, p95 = (statistics.quantiles(latencies, n=20)[i] for i in (9, 18)) if len(latencies) > 1 else (0.0, 0.0)
+    return len(latencies) / elapsed, p50, p95, len(errors)
+
+async def main(worker_counts: list[int]) -> None:
+    print(f"{CONCURRENCY} clients, {DURATION:.0f} s per run, LLM latency {LLM_LATENCY * 1e3:.0f} ms, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} | turns/s | p50      | p95      | errors")
+    for workers in worker_counts:
+        throughput, p50, p95, errors = await measure(workers)
+        print(f"{workers:>7} | {throughput:7.1f} | {p50 * 1e3:5.0f} ms | {p95 * 1e3:5.0f} ms | {errors}")
+
+if __name__ == "__main__":
+    asyncio.run(main([int(n) for n in sys.argv[1:]] or [1, 2, 4]))
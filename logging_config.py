@@ -1,39 +1,24 @@
 import sys
 import json
+import os
+import queue
+import threading
+import traceback
+from functools import partialmethod
 from loguru import logger
 
-# 1. Define the formatter
+# Configured by env:
+# LOG_FORMAT: pretty (default, colored multi-line blocks) or json (one compact JSON object per line)
+# LOG_LEVEL: level of the app logs, LOG_LEVEL_LLM / LOG_LEVEL_QA_EVALUATOR: levels of those categories (default LOG_LEVEL)
+# LOG_ENQUEUE: 1 (default) writes from a background thread, the request path only formats and queues
+CATEGORIES = ("app", "llm", "qa_evaluator")
+category_levels: dict[str, int] = {}
+output_format = "pretty"
+background_sink: "BackgroundSink | None" = None
+
+# 1. Define the formatters
 def custom_formatter(record):
-    # Pretty handling only for LLM logs
     if record["extra"].get("type") == "llm":
-        msg = record["message"]
-
-        # --- NEW LOGIC START ---
-        
-        # 1. Try to convert Pydantic/LangChain objects to a dict
-        # Pydantic V2 uses model_dump(), V1 uses dict()
-        if hasattr(msg, "model_dump"):
-            msg = msg.model_dump()
-        elif hasattr(msg, "dict"):
-            msg = msg.dict()
-
-        # 2. If it is (or has become) a dict/list, JSON dump it
-        if isinstance(msg, (dict, list)):
-            try:
-                # default=str handles non-serializable objects (like UUIDs or custom classes)
-                msg = json.dumps(msg, indent=2, ensure_ascii=False, default=str)
-            except TypeError:
-                msg = str(msg) # Fallback if JSON fails
-        
-        # 3. If it wasn't a dict/model but has content (e.g. simple string wrapper)
-        elif hasattr(msg, "content"):
-            msg = msg.content
-            
-        # 4. Fallback
-        else:
-            msg = str(msg)
-
-        record["message"] = msg
         return (
             "<green>{time:HH:mm:ss}</green> | "
             "<level>{level: <8}</level> | "
@@ -49,7 +34,7 @@ def custom_formatter(record):
             "<dim><light-black>{message}</light-black></dim>\n"
             "<dim><light-black>--------------------------------------------------</light-black></dim>\n"
         )
-    
+
     # Default logging format
     return (
         "<green>{time:HH:mm:ss}</green> | "
@@ -57,12 +42,147 @@ def custom_formatter(record):
         "<level>{message}</level>\n"
     )
 
-# 2. Remove default handler and add custom one
-logger.remove()
-logger.add(sys.stderr, format=custom_formatter, colorize=True)
+def json_formatter(record):
+    line = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "category": record["extra"].get("type", "app"),
+        "message": record["message"],
+        "module": record["name"],
+    }
+    if record["exception"] is not None:
+        line["exception"] = "".join(traceback.format_exception(*record["exception"]))
+    record["extra"]["json"] = json.dumps(line, ensure_ascii=False, default=str)
+    return "{extra[json]}\n"
+
+def category_filter(record) -> bool:
+    return record["level"].no >= category_levels[record["extra"].get("type", "app")]
+
+def payload(obj) -> str:
+    """
+    Renders an LLM response (pydantic model, message, dict...) for the log, indented in pretty mode
+    and on one line in json mode. Pass it lazily (`lambda: payload(x)`) so it only runs for emitted records.
+    """
+    if hasattr(obj, "model_dump"):
+        obj = obj.model_dump()
+    if isinstance(obj, (dict, list)):
+        try:
+            # default=str handles non-serializable objects (like UUIDs or custom classes)
+            return json.dumps(obj, indent=2 if output_format == "pretty" else None, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            return str(obj)
+    return str(obj)
+
+class BackgroundSink:
+    """
+    Sink that queues the formatted lines, a daemon thread writes them and flushes once per batch.
+
+    loguru's own enqueue=True pickles every record through a multiprocessing queue, which costs the
+    request path more than the write it saves. The queue is bounded: a stuck stream slows logging down
+    instead of growing memory.
+    """
+    def __init__(self, stream, max_pending: int = 10_000):
+        self._write = stream.write if hasattr(stream, "write") else stream
+        self._flush = getattr(stream, "flush", None)
+        self._queue: queue.Queue[str | None] = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message) -> None:
+        self._queue.put(str(message))
+
+    def _run(self) -> None:
+        while True:
+            lines = [self._queue.get()]
+            while True:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            text = "".join(line for line in lines if line is not None)
+            if text:
+                self._write(text)
+                if self._flush is not None:
+                    self._flush()
+            for _ in lines:
+                self._queue.task_done()
+            if None in lines:
+                return
+
+    def join(self) -> None:
+        """
+        Waits until every queued line is written.
+        """
+        self._queue.join()
+
+    def stop(self) -> None:
+        # called by loguru when the handler is removed (reconfiguration, exit)
+        self._queue.put(None)
+        self._thread.join()
+
+def flush_logs() -> None:
+    if background_sink is not None:
+        background_sink.join()
+
+# 2. Replace the default handler
+def configure_logging(sink=None, log_format: str | None = None, levels: dict[str, str] | None = None, enqueue: bool | None = None) -> None:
+    """
+    (Re)configures the single log handler, arguments default to stderr and the env settings above.
+    """
+    global output_format, background_sink
+    output_format = log_format or os.getenv("LOG_FORMAT", "pretty")
+    if output_format not in ("pretty", "json"):
+        raise ValueError(f"Unknown LOG_FORMAT: {output_format}")
+    default_level = os.getenv("LOG_LEVEL", "INFO")
+    levels = {
+        category: os.getenv(f"LOG_LEVEL_{category.upper()}", default_level) if category != "app" else default_level
+        for category in CATEGORIES
+    } | (levels or {})
+    category_levels.update({category: logger.level(level).no for category, level in levels.items()})
+    if enqueue is None:
+        enqueue = os.getenv("LOG_ENQUEUE", "1") == "1"
+
+    logger.remove()
+    sink = sink or sys.stderr
+    background_sink = BackgroundSink(sink) if enqueue else None
+    logger.add(
+        background_sink or sink,
+        format=custom_formatter if output_format == "pretty" else json_formatter,
+        colorize=output_format == "pretty",
+        filter=category_filter,
+        level=min(category_levels.values()),
+    )
+
+class CategoryLogger:
+    """
+    The loguru logger bound to a category, which drops records below the category level
+    before the message (and its lazy arguments) is formatted.
+    """
+    def __init__(self, category: str):
+        self.category = category
+        self._logger = logger.bind(type=category)
+
+    def enabled(self, level: str) -> bool:
+        return logger.level(level).no >= category_levels[self.category]
+
+    def _log(self, level: str, message: str, *args, **kwargs) -> None:
+        if self.enabled(level):
+            # callable arguments are rendered lazily, here
+            args = [arg() if callable(arg) else arg for arg in args]
+            self._logger.opt(depth=1).log(level, message, *args, **kwargs)
+
+    debug = partialmethod(_log, "DEBUG")
+    info = partialmethod(_log, "INFO")
+    warning = partialmethod(_log, "WARNING")
+    error = partialmethod(_log, "ERROR")
+
+    def __getattr__(self, name):
+        return getattr(self._logger, name)
+
+configure_logging()
 
-# 3. Create and export the bound logger
-llm_logger = logger.bind(type="llm")
-qa_evaluator_logger = logger.bind(type="qa_evaluator")
+# 3. Create and export the category loggers
+llm_logger = CategoryLogger("llm")
+qa_evaluator_logger = CategoryLogger("qa_evaluator")
 
-__all__ = ["logger", "llm_logger", "qa_evaluator_logger"]
\ No newline at end of file
+__all__ = ["logger", "llm_logger", "qa_evaluator_logger", "payload", "configure_logging", "flush_logs"]
@@ -1,15 +1,49 @@
+import os
+
+# before the graph is imported: it only gets a checkpointer in api mode
+# (a production server with one worker serves from this very process)
+os.environ["RUN_MODE"] = "api"
+
+# state every worker of a production server must share: checkpointer and appointment store (with the doctor preferences)
+SHARED_STATE_BACKENDS = {"CHECKPOINTER": "sqlite", "APPOINTMENT_STORE": "sqlite"}
+
+def server_options() -> dict:
+    """
+    uvicorn settings for SERVER_MODE:
+    - dev (default): one process reloading on code changes
+    - production: WORKERS processes (default: one per CPU) without reload. Any worker may get any
+      request of a thread, so conversations and appointments live in the SQLite backends they share
+      (CHECKPOINTER and APPOINTMENT_STORE default to sqlite, memory backends are refused).
+      Everything else stays in each worker: /metrics counts the requests of the worker that answers
+      the scrape, and the tool result cache, the prefetches and the slot holds are per worker too.
+    Sets the backend defaults in the environment, so it runs before the app modules are imported
+    (they pick their backends at import) and the workers inherit them.
+    """
+    mode = os.getenv("SERVER_MODE", "dev")
+    if mode == "dev":
+        return {"reload": True}
+    if mode == "production":
+        workers = int(os.getenv("WORKERS", str(os.cpu_count() or 1)))
+        if workers > 1:
+            for variable, shared in SHARED_STATE_BACKENDS.items():
+                backend = os.environ.setdefault(variable, shared)
+                if backend != shared:
+                    raise ValueError(f"{variable}={backend} keeps state in one process, {workers} workers need {variable}={shared}")
+        return {"reload": False, "workers": workers}
+    raise ValueError(f"Unknown server mode: {mode}")
+
+if __name__ == "__main__":
+    SERVER_OPTIONS = server_options()
+
 from fastapi import FastAPI, HTTPException, Request
 import uvicorn
 from fastapi.responses import JSONResponse
 import logging
-import sys
 from api.router import root_router
 from api.chat_api import chat_router
-import os
+from api.metrics_api import metrics_router
 from logging_config import logger
 
-os.environ["RUN_MODE"] = "api"
-
 EXCEPTION_LOG_LEVELS = {
     "HTTPException": "error",
     "RequestValidationError": "warning",
@@ -26,6 +60,7 @@ app = FastAPI(
 
 app.include_router(root_router)
 app.include_router(chat_router)
+app.include_router(metrics_router)
 
 @app.exception_handler(HTTPException)
 async def unified_exception_handler(request: Request, exc: HTTPException):
@@ -41,9 +76,7 @@ async def unified_exception_handler(request: Request, exc: HTTPException):
     elif log_level == "warning":
         logger.warning(log_message)
     elif log_level == "error":
-        logger.error(log_message, exc_info=True)  # Logs full traceback
-
-    sys.stdout.flush()  # Ensure logs appear immediately
+        logger.opt(exception=exc).error(log_message)  # Logs full traceback
 
     return JSONResponse(
         status_code=exc.status_code,
@@ -51,4 +84,4 @@ async def unified_exception_handler(request: Request, exc: HTTPException):
     )
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("main:app", host=os.getenv("HOST", "0.0.0.0"), port=int(os.getenv("PORT", "8000")), **SERVER_OPTIONS)
@@ -1,17 +1,13 @@
-from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import date, timedelta
-from datetime import datetime, time
-
-class Appointment(BaseModel):
-    id: Optional[str] = Field(default=None, description="The appointment's unique identifier")
-    user_id: Optional[str] = Field(default=None, description="The user's unique identifier")
-    date: Optional[str] = Field(default=None, description="The appointment's date")
-    time: Optional[str] = Field(default=None, description="The appointment's time")
-    location: Optional[str] = Field(default=None, description="The appointment's location")
-    provider: Optional[str] = Field(default=None, description="The appointment's provider")
-    reason: Optional[str] = Field(default=None, description="The appointment's reason")
-    status: Optional[str] = Field(default=None, description="The appointment's status")
+from datetime import date, datetime, timedelta
+import heapq
+import itertools
+import threading
+from agents.models.appointment import Appointment
+from services.appointment_store import AppointmentStore, InMemoryAppointmentStore
+from services.slot_reservations import SlotReservation, SlotReservations
+from services.availability import AvailabilityIndex, ProviderSchedule
+from services.doctor_index import DoctorNameIndex
+import os
 
 class AppointmentConflictError(Exception):
     def __init__(self, message="New appointment already falls in exsting doctors term. Please choose a different time or provider."):
@@ -25,66 +21,129 @@ class MultipleAppointmentsFoundError(Exception):
     def __init__(self, message="Multiple appointments found for the same date. Please choose one from the following list."):
         super().__init__(message)
 
-class AppointmentService:
+SLOT_HELD_MESSAGE = "This time slot is currently being booked by another patient. Please choose a different time or provider."
+
+class ScheduleChanges:
+    """
+    The schedule writes made through this service (this process): a version per user, bumped after each
+    booking, cancellation, reschedule or update of one of their appointments, and the total count.
+    Every such write moves the store generation by one, so a reader comparing the two can tell this
+    process's writes from those of other processes sharing the store.
+    """
     def __init__(self):
-        self.appointments: list[Appointment] = []
+        self.writes = 0
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def bump(self, user_id: str) -> None:
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self.writes += 1
+
+    def version(self, user_id: str) -> int:
+        return self._versions.get(user_id, 0)
+
+class AppointmentService:
+    def __init__(self,
+        store: AppointmentStore | None = None,
+        reservations: SlotReservations | None = None,
+        schedules: dict[str, ProviderSchedule] | None = None):
         self.open_doctors: list[str] = []
-        today = date.today()
-        tomorrow = today + timedelta(days=1)
-        next_week = today + timedelta(days=7)
-        in_two_weeks = today + timedelta(days=14)
-        self.appointments = [
-            Appointment(id="1", user_id="1", date=today.strftime("%Y-%m-%d"), time="10:00", location="123 Main St, Anytown, USA", provider="Dr. Lang Smith", reason="Annual physical", status="Confirmed"),
-            Appointment(id="2", user_id="1", date=tomorrow.strftime("%Y-%m-%d"), time="11:00", location="456 Main St, Anytown, USA", provider="Dr. Lang Smith", reason="Follow-up", status="Confirmed"),
-            Appointment(id="3", user_id="1", date=in_two_weeks.strftime("%Y-%m-%d"), time="12:00", location="456 Main St, Anytown, USA", provider="Dr. Lang Smith", reason="Check up", status="Confirmed"),
-            Appointment(id="4", user_id="2", date=today.strftime("%Y-%m-%d"), time="12:00", location="789 Main St, Anytown, USA", provider="Dr. Jim Beam", reason="Annual physical", status="Confirmed"),
-            Appointment(id="5", user_id="2", date=tomorrow.strftime("%Y-%m-%d"), time="13:00", location="101 Main St, Anytown, USA", provider="Dr. Jill Johnson", reason="Follow-up", status="Confirmed"),
-            Appointment(id="6", user_id="3", date=next_week.strftime("%Y-%m-%d"), time="14:00", location="123 Main St, Anytown, USA", provider="Dr. Jack Daniels", reason="Annual physical", status="Confirmed"),
-            Appointment(id="7", user_id="3", date=in_two_weeks.strftime("%Y-%m-%d"), time="15:00", location="456 Main St, Anytown, USA", provider="Dr. Jim Beam", reason="Follow-up", status="Confirmed"),
-        ]
+        if store is None:
+            store = create_appointment_store()
+        self.store = store
+        self.reservations = reservations or SlotReservations(
+            ttl_seconds=float(os.getenv("SLOT_RESERVATION_TTL_SECONDS", "300")),
+        )
+        self.availability = AvailabilityIndex(self.store, schedules=dict(schedules or {}))
+        self.changes = ScheduleChanges()
         self.open_doctors = [
             "Dr. Usually Free",
             "Dr. Negroni Sours",
         ]
+        # every provider name seen, for matching what patients type
+        self.doctor_index = DoctorNameIndex(self.store.providers() + self.open_doctors)
 
     def get_appointments(self, user_id: str) -> list[Appointment]:
-        return [appointment for appointment in self.appointments if appointment.user_id == user_id]
+        return self.store.for_user(user_id)
+
+    def get_appointment(self, appointment_id: str) -> Appointment | None:
+        return self.store.get(appointment_id)
+
+    def get_doctor_preference(self, user_id: str) -> dict | None:
+        return self.store.doctor_preference(user_id)
+
+    def set_doctor_preference(self, user_id: str, doctor_name: str, reason: str = "") -> None:
+        self.store.set_doctor_preference(user_id, doctor_name, reason)
 
     def list_all_appointments(self) -> list[Appointment]:
-        return self.appointments
+        return self.store.all()
 
-    def add_appointment(self, appointment: Appointment) -> Appointment:
-        if appointment.id is None:
-            appointment.id = str(len(self.appointments) + 1)
-        
+    def add_appointment(self, appointment: Appointment, holder: str | None = None) -> Appointment:
+        """
+        Books the appointment. If the holder reserved the slot (reserve_slot) the reservation is converted.
+        Raises:
+        - AppointmentConflictError: slot is booked or held by someone else
+        """
         if not appointment.provider:
             raise AppointmentConflictError("Provider does not exist")
 
-        # check if new appointment already falls in exsting doctors term
-        for a in self.appointments:
-            if a.provider == appointment.provider and a.date == appointment.date and a.time == appointment.time:
+        slot = (appointment.provider, appointment.date, appointment.time)
+        with self.reservations.lock(slot):
+            if self.reservations.is_held_by_other(slot, holder):
+                raise AppointmentConflictError(SLOT_HELD_MESSAGE)
+            # check if new appointment already falls in exsting doctors term
+            if not self.store.add(appointment):
                 raise AppointmentConflictError("New appointment falls in exsting doctors term. Please choose a different time or provider.")
-        
-        self.appointments.append(appointment)
+            self.availability.apply(booked=[slot])
+            self.reservations.release(slot, holder)
+        self.changes.bump(appointment.user_id)
+        self.doctor_index.add(appointment.provider)
         return appointment
 
-    def check_conflict(self, appointment: Appointment) -> None:
-        for a in self.appointments:
-            if a.provider == appointment.provider and a.date == appointment.date and a.time == appointment.time:
+    def check_conflict(self, appointment: Appointment, holder: str | None = None) -> None:
+        slot = (appointment.provider, appointment.date, appointment.time)
+        if self.store.get_by_slot(*slot) is not None:
+            raise AppointmentConflictError("New appointment falls in exsting doctors term. Please choose a different time or provider.")
+        with self.reservations.lock(slot):
+            if self.reservations.is_held_by_other(slot, holder):
+                raise AppointmentConflictError(SLOT_HELD_MESSAGE)
+
+    def reserve_slot(self, appointment: Appointment, holder: str) -> SlotReservation:
+        """
+        Checks the slot and holds it for the holder (user id) until the booking is committed or the hold expires.
+        Replaces the check_conflict -> add_appointment sequence, so two patients can't both pass the check.
+        Raises:
+        - AppointmentConflictError: slot is booked or held by someone else
+        """
+        slot = (appointment.provider, appointment.date, appointment.time)
+        with self.reservations.lock(slot):
+            if self.store.get_by_slot(*slot) is not None:
                 raise AppointmentConflictError("New appointment falls in exsting doctors term. Please choose a different time or provider.")
+            if self.reservations.is_held_by_other(slot, holder):
+                raise AppointmentConflictError(SLOT_HELD_MESSAGE)
+            return self.reservations.hold(slot, holder)
 
     def update_appointment(self, appointment: Appointment) -> Appointment:
-        for i, a in enumerate(self.appointments):
-            if a.id == appointment.id and a.user_id == appointment.user_id:
-                self.appointments[i] = appointment
-                return appointment
-        return None
+        current = self.store.get(appointment.id)
+        if current is None or current.user_id != appointment.user_id:
+            return None
+        if not self.store.replace(appointment):
+            raise AppointmentConflictError("New appointment falls in exsting doctors term. Please choose a different time or provider.")
+        self.availability.apply(
+            booked=[(appointment.provider, appointment.date, appointment.time)],
+            released=[(current.provider, current.date, current.time)],
+        )
+        self.changes.bump(appointment.user_id)
+        return appointment
 
     def delete_appointment(self, appointment: Appointment) -> bool:
-        self.appointments = [
-           a for a in self.appointments
-           if not (a.id == appointment.id and a.user_id == appointment.user_id)
-        ]
+        current = self.store.get(appointment.id)
+        if current is not None and current.user_id == appointment.user_id:
+            removed = self.store.remove(appointment.id)
+            if removed is not None:
+                self.availability.apply(released=[(removed.provider, removed.date, removed.time)])
+                self.changes.bump(removed.user_id)
         return True
 
     def list_all_doctors(self) -> list[str]:
@@ -93,9 +152,7 @@ class AppointmentService:
         Returns:
         - A list of all unique doctors
         """
-        all_doctors = list(set([a.provider for a in self.appointments]))
-        unique = set(all_doctors)
-        return list(unique)
+        return self.store.providers()
 
     def list_open_doctors(self) -> list[str]:
         """
@@ -105,49 +162,86 @@ class AppointmentService:
         """
         return self.open_doctors
 
+    def match_doctors(self, query: str, doctors: list[str]) -> list[str]:
+        """
+        The doctors of the list best matching the requested name (typos, prefixes and titles allowed).
+        Returns:
+        - One doctor for a clear match, several equally good ones when ambiguous, none when nothing matches
+        """
+        return self.doctor_index.match(query, among=doctors)
+
     def list_all_doctors_for_user(self, user_id: str) -> list[str]:
         """
         List all unique doctors for a user.
         Returns:
         - A list of all unique doctors for the user
         """
-        all_doctors = list(set([a.provider for a in self.appointments if a.user_id == user_id]))
-        unique = set(all_doctors)
+        unique = {a.provider for a in self.store.for_user(user_id)}
         return list(unique)
 
     def get_doctor_available_times_for_day(self, 
         provider: str,
         date: str,
-        start_hour: int = 9,
-        end_hour: int = 17,
-        slot_minutes: int = 60) -> list[str]:
+        start_hour: int | None = None,
+        end_hour: int | None = None,
+        slot_minutes: int | None = None) -> list[str]:
         """
         Suggest available appointment times for a doctor on a specific date.
         
         - provider: full provider name (e.g. "Dr. Lang Smith")
         - date: "YYYY-MM-DD"
-        - start_hour: doctor's workday start (default 9)
-        - end_hour: doctor's workday end (default 17)
-        - slot_minutes: appointment length (default 60)
+        - start_hour: doctor's workday start (default: provider schedule, 9)
+        - end_hour: doctor's workday end (default: provider schedule, 17)
+        - slot_minutes: appointment length (default: provider schedule, 60)
         """
-        booked = {
-            a.time
-            for a in self.appointments
-            if a.provider == provider and a.date == date
-        }
-        day = datetime.strptime(date, "%Y-%m-%d")
-        t = datetime.combine(day, time(hour=start_hour, minute=0)) # start of workday
-        end_time = datetime.combine(day, time(hour=end_hour, minute=0)) # end of workday
+        schedule = self.availability.schedule_for(provider)
+        if start_hour is None and end_hour is None and slot_minutes is None:
+            return self.availability.free_slots(provider, date)
 
-        all_slots = []
-        while t < end_time:
-            all_slots.append(t.strftime("%H:%M"))
-            t += timedelta(minutes=slot_minutes)
+        # one-off working hours, not cached
+        schedule = ProviderSchedule(
+            start_hour=schedule.start_hour if start_hour is None else start_hour,
+            end_hour=schedule.end_hour if end_hour is None else end_hour,
+            slot_minutes=schedule.slot_minutes if slot_minutes is None else slot_minutes,
+        )
+        booked = schedule.booked_mask(a.time for a in self.store.for_provider_on_date(provider, date))
+        return schedule.free_labels(booked)
 
-        # Remove booked slots → available slots
-        available = [s for s in all_slots if s not in booked]
+    def get_doctor_next_available_times(self, provider: str, from_date: str, days: int = 14, limit: int = 5) -> list[tuple[str, str]]:
+        """
+        Earliest available (date, time) slots for a doctor.
+        Args:
+        - provider: full provider name
+        - from_date: first day to look at ("YYYY-MM-DD")
+        - days: how many days to look ahead
+        - limit: max number of slots to return
+        """
+        after_time = None
+        if from_date == date.today().isoformat():
+            after_time = datetime.now().strftime("%H:%M") # don't offer slots that already started today
+        return self.availability.next_free_slots(provider, from_date, days=days, limit=limit, after_time=after_time)
 
-        return available
+    def find_next_available_slots(self, from_date: str, days: int = 14, limit: int = 5, provider: str | None = None) -> list[dict]:
+        """
+        Earliest free slots for a provider, or for any open doctor when no provider is given.
+        Args:
+        - from_date: first day to look at ("YYYY-MM-DD")
+        - days: how many days to look ahead
+        - limit: max number of slots to return
+        - provider: full provider name (optional)
+        Returns:
+        - A list of {"provider", "date", "time"} ordered by date and time
+        """
+        providers = [provider] if provider else self.list_open_doctors()
+        per_provider = [
+            [(d, t, p) for d, t in self.get_doctor_next_available_times(p, from_date, days=days, limit=limit)]
+            for p in providers
+        ]
+        earliest = heapq.merge(*per_provider) # each list is already sorted by (date, time)
+        return [
+            {"provider": p, "date": d, "time": t}
+            for d, t, p in itertools.islice(earliest, limit)
+        ]
 
     def find_appointments_for_user(self, appointment: Appointment) -> list[Appointment]:
         """
@@ -164,10 +258,7 @@ class AppointmentService:
         if not appointment.date:
             raise AppointmentNotFoundError("No appointment date provided")
         
-        found_appointments = []
-        for i, a in enumerate(self.appointments):
-            if a.user_id == appointment.user_id and a.date == appointment.date:
-                found_appointments.append(a)
+        found_appointments = [a for a in self.store.for_user(appointment.user_id) if a.date == appointment.date]
         if len(found_appointments) == 0:
             raise AppointmentNotFoundError("Appointment not found")
         if len(found_appointments) > 1:
@@ -188,12 +279,12 @@ class AppointmentService:
         if not appointment_id:
             raise AppointmentNotFoundError("Appointment id not found")
         
-        for i, a in enumerate(self.appointments):
-            if a.id == appointment_id:
-                removed = self.appointments.pop(i)
-                return removed
-
-        raise AppointmentNotFoundError("Appointment not found")
+        removed = self.store.remove(appointment_id)
+        if removed is None:
+            raise AppointmentNotFoundError("Appointment not found")
+        self.availability.apply(released=[(removed.provider, removed.date, removed.time)])
+        self.changes.bump(removed.user_id)
+        return removed
 
     def get_doctor_location(self, provider: str) -> str:
         """
@@ -203,45 +294,75 @@ class AppointmentService:
         Returns:
         - The location of the doctor
         """
-        for a in self.appointments:
-            if a.provider == provider:
-                return a.location
+        a = self.store.first_for_provider(provider)
+        if a is not None:
+            return a.location
         return None
 
-    def reschedule_appointment(self, appointment_id: str, new_date: str, new_time: str) -> Appointment:
+    def reschedule_appointment(self, appointment_id: str, new_date: str, new_time: str, holder: str | None = None) -> Appointment:
         """
         Reschedule an appointment by id.
         Args:
         - appointment_id: The id of the appointment to reschedule
         - new_date: The new date to reschedule the appointment to
         - new_time: The new time to reschedule the appointment to
+        - holder: The user holding a reservation on the new slot (if any)
         Returns:
         - The appointment that was rescheduled
         - raises AppointmentNotFoundError if appointment not found
         - raises AppointmentConflictError if there is conflicts in new_date and new_time with existing appointments
         """
         # get appointment by id: 
-        for a in self.appointments:
-            if a.id == appointment_id:
-                appointment = a
-                break
-            
+        appointment = self.store.get(appointment_id)
         if not appointment:
             raise AppointmentNotFoundError("Appointment not found")
         
         # check if there is conflicts in new_date and new_time with existing appointments
-        for a in self.appointments:
-            if a.provider == appointment.provider and a.date == new_date and a.time == new_time:
+        old_slot = (appointment.provider, appointment.date, appointment.time)
+        slot = (appointment.provider, new_date, new_time)
+        with self.reservations.lock(slot):
+            if self.reservations.is_held_by_other(slot, holder):
+                raise AppointmentConflictError(SLOT_HELD_MESSAGE)
+            moved = self.store.move(appointment_id, new_date, new_time)
+            if moved is None:
                 raise AppointmentConflictError("New appointment falls in exsting doctors term. Please choose a different time or provider.")
-        
-        # update the appointment
-        for i, a in enumerate(self.appointments):
-            if a.id == appointment.id:
-                self.appointments[i].date = new_date
-                self.appointments[i].time = new_time
-                return a
-
-        raise AppointmentNotFoundError("Appointment not found")
+            self.availability.apply(booked=[slot], released=[old_slot])
+            self.reservations.release(slot, holder)
+        self.changes.bump(moved.user_id)
+        return moved
+
+
+def seed_appointments() -> list[Appointment]:
+    """
+    Demo appointments relative to today.
+    """
+    today = date.today()
+    tomorrow = today + timedelta(days=1)
+    next_week = today + timedelta(days=7)
+    in_two_weeks = today + timedelta(days=14)
+    return [
+        Appointment(id="1", user_id="1", date=today.strftime("%Y-%m-%d"), time="10:00", location="123 Main St, Anytown, USA", provider="Dr. Lang Smith", reason="Annual physical", status="Confirmed"),
+        Appointment(id="2", user_id="1", date=tomorrow.strftime("%Y-%m-%d"), time="11:00", location="456 Main St, Anytown, USA", provider="Dr. Lang Smith", reason="Follow-up", status="Confirmed"),
+        Appointment(id="3", user_id="1", date=in_two_weeks.strftime("%Y-%m-%d"), time="12:00", location="456 Main St, Anytown, USA", provider="Dr. Lang Smith", reason="Check up", status="Confirmed"),
+        Appointment(id="4", user_id="2", date=today.strftime("%Y-%m-%d"), time="12:00", location="789 Main St, Anytown, USA", provider="Dr. Jim Beam", reason="Annual physical", status="Confirmed"),
+        Appointment(id="5", user_id="2", date=tomorrow.strftime("%Y-%m-%d"), time="13:00", location="101 Main St, Anytown, USA", provider="Dr. Jill Johnson", reason="Follow-up", status="Confirmed"),
+        Appointment(id="6", user_id="3", date=next_week.strftime("%Y-%m-%d"), time="14:00", location="123 Main St, Anytown, USA", provider="Dr. Jack Daniels", reason="Annual physical", status="Confirmed"),
+        Appointment(id="7", user_id="3", date=in_two_weeks.strftime("%Y-%m-%d"), time="15:00", location="456 Main St, Anytown, USA", provider="Dr. Jim Beam", reason="Follow-up", status="Confirmed"),
+    ]
+
+def create_appointment_store() -> AppointmentStore:
+    """
+    Creates the storage backend selected by the APPOINTMENT_STORE env variable:
+    - memory (default): per-process store, seeded with the demo data on every start
+    - sqlite: shared database at APPOINTMENT_DB_PATH (default appointments.db), seeded once
+    """
+    backend = os.getenv("APPOINTMENT_STORE", "memory")
+    if backend == "memory":
+        return InMemoryAppointmentStore(seed_appointments())
+    if backend == "sqlite":
+        from services.sqlite_appointment_store import SQLiteAppointmentStore
+        return SQLiteAppointmentStore(os.getenv("APPOINTMENT_DB_PATH", "appointments.db"), seed=seed_appointments())
+    raise ValueError(f"Unknown APPOINTMENT_STORE backend: {backend}")
 
 
 appointment_service = AppointmentService()
\ No newline at end of file
@@ -0,0 +1,239 @@
+from abc import ABC, abstractmethod
+import threading
+from agents.models.appointment import Appointment
+from typing import Iterable, Optional
+
+Slot = tuple[str, str, str] # (provider, date, time)
+
+class AppointmentStore(ABC):
+    """
+    Storage backend interface used by the AppointmentService.
+
+    Implementations:
+    - InMemoryAppointmentStore: per-process dict indexes (default, demo data is rebuilt on start)
+    - SQLiteAppointmentStore: shared file database, used when several workers must see one schedule
+
+    Stores report failures through return values (False / None) and never raise domain errors.
+    """
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @abstractmethod
+    def generation(self) -> int:
+        """
+        Change counter, bumped on every successful write (by any process sharing the store).
+        Lets callers cache derived data and detect when it went stale.
+        """
+
+    @abstractmethod
+    def get(self, appointment_id: str) -> Optional[Appointment]: ...
+
+    @abstractmethod
+    def get_by_slot(self, provider: str, date: str, time: str) -> Optional[Appointment]: ...
+
+    @abstractmethod
+    def all(self) -> list[Appointment]: ...
+
+    @abstractmethod
+    def for_user(self, user_id: str) -> list[Appointment]: ...
+
+    @abstractmethod
+    def for_provider_on_date(self, provider: str, date: str) -> list[Appointment]: ...
+
+    @abstractmethod
+    def providers(self) -> list[str]: ...
+
+    @abstractmethod
+    def first_for_provider(self, provider: str) -> Optional[Appointment]:
+        """
+        Oldest appointment still on the books for the provider (or None).
+        """
+
+    @abstractmethod
+    def add(self, appointment: Appointment) -> bool:
+        """
+        Stores the appointment, assigning a new id if it has none.
+        Returns False (and stores nothing) if the slot or the id is already taken.
+        """
+
+    @abstractmethod
+    def remove(self, appointment_id: str) -> Optional[Appointment]:
+        """
+        Returns the removed appointment or None if it doesn't exist.
+        """
+
+    @abstractmethod
+    def replace(self, appointment: Appointment) -> bool:
+        """
+        Replaces the stored appointment with the same id.
+        Returns False if the appointment doesn't exist or the new slot is taken by another appointment.
+        """
+
+    @abstractmethod
+    def move(self, appointment_id: str, new_date: str, new_time: str) -> Optional[Appointment]:
+        """
+        Moves the appointment to a new date and time (same provider).
+        Returns the moved appointment or None if it doesn't exist or the new slot is taken.
+        """
+
+    @abstractmethod
+    def doctor_preference(self, user_id: str) -> Optional[dict]:
+        """
+        The doctor the user chose over their usual ones ({"doctor_name", "reason"}) or None.
+        Not an appointment: does not move the generation.
+        """
+
+    @abstractmethod
+    def set_doctor_preference(self, user_id: str, doctor_name: str, reason: str = "") -> None: ...
+
+
+class InMemoryAppointmentStore(AppointmentStore):
+    """
+    In-process appointment storage with secondary indexes.
+
+    Every lookup the AppointmentService needs is served from a dict instead of a scan:
+    - by id
+    - by user
+    - by provider (insertion ordered, used for doctor listing and location lookup)
+    - by (provider, date)
+    - by (provider, date, time) (slot, at most one appointment per slot)
+
+    All indexes are updated together on add, remove and move, so they never drift apart.
+    The store does not raise domain errors, it reports failures through return values
+    and leaves it to the service to decide what to raise.
+    """
+    def __init__(self, appointments: Iterable[Appointment] | None = None):
+        self._by_id: dict[str, Appointment] = {}
+        self._by_user: dict[str, dict[str, Appointment]] = {}
+        self._by_provider: dict[str, dict[str, Appointment]] = {}
+        self._by_provider_date: dict[tuple[str, str], dict[str, Appointment]] = {}
+        self._by_slot: dict[Slot, Appointment] = {}
+        self._next_id = 1
+        self._generation = 0
+        self._preferences: dict[str, dict] = {}
+        # short latch around index updates, slot level coordination is done by the service (SlotReservations)
+        self._lock = threading.RLock()
+        for appointment in appointments or []:
+            self.add(appointment)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def generation(self) -> int:
+        return self._generation
+
+    def next_id(self) -> str:
+        """
+        Next free appointment id (ids are never reused, even after a cancellation).
+        """
+        while str(self._next_id) in self._by_id:
+            self._next_id += 1
+        return str(self._next_id)
+
+    def get(self, appointment_id: str) -> Optional[Appointment]:
+        return self._by_id.get(appointment_id)
+
+    def get_by_slot(self, provider: str, date: str, time: str) -> Optional[Appointment]:
+        return self._by_slot.get((provider, date, time))
+
+    def all(self) -> list[Appointment]:
+        return list(self._by_id.values())
+
+    def for_user(self, user_id: str) -> list[Appointment]:
+        return list(self._by_user.get(user_id, {}).values())
+
+    def for_provider_on_date(self, provider: str, date: str) -> list[Appointment]:
+        return list(self._by_provider_date.get((provider, date), {}).values())
+
+    def providers(self) -> list[str]:
+        return list(self._by_provider.keys())
+
+    def first_for_provider(self, provider: str) -> Optional[Appointment]:
+        return next(iter(self._by_provider.get(provider, {}).values()), None)
+
+    def add(self, appointment: Appointment) -> bool:
+        with self._lock:
+            if appointment.id is None:
+                appointment.id = self.next_id()
+            slot = (appointment.provider, appointment.date, appointment.time)
+            if appointment.id in self._by_id or slot in self._by_slot:
+                return False
+
+            self._by_id[appointment.id] = appointment
+            self._index(appointment)
+            if appointment.id.isdigit():
+                self._next_id = max(self._next_id, int(appointment.id) + 1)
+            self._generation += 1
+            return True
+
+    def remove(self, appointment_id: str) -> Optional[Appointment]:
+        with self._lock:
+            appointment = self._by_id.pop(appointment_id, None)
+            if appointment is None:
+                return None
+            self._unindex(appointment)
+            self._generation += 1
+            return appointment
+
+    def replace(self, appointment: Appointment) -> bool:
+        with self._lock:
+            current = self._by_id.get(appointment.id)
+            if current is None:
+                return False
+            taken = self._by_slot.get((appointment.provider, appointment.date, appointment.time))
+            if taken is not None and taken.id != appointment.id:
+                return False
+
+            self._unindex(current)
+            self._by_id[appointment.id] = appointment
+            self._index(appointment)
+            self._generation += 1
+            return True
+
+    def move(self, appointment_id: str, new_date: str, new_time: str) -> Optional[Appointment]:
+        with self._lock:
+            appointment = self._by_id.get(appointment_id)
+            if appointment is None or (appointment.provider, new_date, new_time) in self._by_slot:
+                return None
+
+            # user and provider don't change, only the date based indexes are touched
+            _discard(self._by_provider_date, (appointment.provider, appointment.date), appointment.id)
+            del self._by_slot[(appointment.provider, appointment.date, appointment.time)]
+            appointment.date = new_date
+            appointment.time = new_time
+            self._by_provider_date.setdefault((appointment.provider, new_date), {})[appointment.id] = appointment
+            self._by_slot[(appointment.provider, new_date, new_time)] = appointment
+            self._generation += 1
+            return appointment
+
+    def doctor_preference(self, user_id: str) -> Optional[dict]:
+        preference = self._preferences.get(user_id)
+        return dict(preference) if preference is not None else None
+
+    def set_doctor_preference(self, user_id: str, doctor_name: str, reason: str = "") -> None:
+        self._preferences[user_id] = {"doctor_name": doctor_name, "reason": reason}
+
+    def _index(self, appointment: Appointment) -> None:
+        self._by_user.setdefault(appointment.user_id, {})[appointment.id] = appointment
+        self._by_provider.setdefault(appointment.provider, {})[appointment.id] = appointment
+        self._by_provider_date.setdefault((appointment.provider, appointment.date), {})[appointment.id] = appointment
+        self._by_slot[(appointment.provider, appointment.date, appointment.time)] = appointment
+
+    def _unindex(self, appointment: Appointment) -> None:
+        _discard(self._by_user, appointment.user_id, appointment.id)
+        _discard(self._by_provider, appointment.provider, appointment.id)
+        _discard(self._by_provider_date, (appointment.provider, appointment.date), appointment.id)
+        self._by_slot.pop((appointment.provider, appointment.date, appointment.time), None)
+
+
+def _discard(index: dict, key, appointment_id: str) -> None:
+    """
+    Removes the appointment from a bucket and drops the bucket once it is empty,
+    so indexes don't keep empty entries for users/providers/days forever.
+    """
+    bucket = index.get(key)
+    if bucket is None:
+        return
+    bucket.pop(appointment_id, None)
+    if not bucket:
+        del index[key]
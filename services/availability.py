@@ -0,0 +1,159 @@
+import threading
+from dataclasses import dataclass, field
+from datetime import date as Date, timedelta
+from functools import cached_property
+from typing import Iterable
+from services.appointment_store import AppointmentStore, Slot
+
+FREE_LABELS_CACHE_SIZE = 4096
+
+@dataclass(frozen=True)
+class ProviderSchedule:
+    """
+    Working hours and slot length of a provider.
+    """
+    start_hour: int = 9
+    end_hour: int = 17
+    slot_minutes: int = 60
+
+    @cached_property
+    def labels(self) -> tuple[str, ...]:
+        """
+        Slot start times ("HH:MM"), bit i of a day bitmap is labels[i].
+        """
+        minutes = range(self.start_hour * 60, self.end_hour * 60, self.slot_minutes)
+        return tuple(f"{m // 60:02d}:{m % 60:02d}" for m in minutes)
+
+    @cached_property
+    def bit_of(self) -> dict[str, int]:
+        return {label: 1 << i for i, label in enumerate(self.labels)}
+
+    @cached_property
+    def full_mask(self) -> int:
+        return (1 << len(self.labels)) - 1
+
+    @cached_property
+    def _free_labels_cache(self) -> dict[int, list[str]]:
+        return {}
+
+    def booked_mask(self, times: Iterable[str]) -> int:
+        mask = 0
+        for t in times:
+            mask |= self.bit_of.get(t, 0) # appointments off the slot grid don't block a slot
+        return mask
+
+    def free_labels(self, booked: int) -> list[str]:
+        """
+        Free slot times for a day bitmap (memoized per bitmap, a day has few distinct states).
+        """
+        cached = self._free_labels_cache.get(booked)
+        if cached is None:
+            free = self.full_mask & ~booked
+            cached = [label for i, label in enumerate(self.labels) if free >> i & 1]
+            if len(self._free_labels_cache) < FREE_LABELS_CACHE_SIZE:
+                self._free_labels_cache[booked] = cached
+        return list(cached)
+
+
+@dataclass
+class AvailabilityIndex:
+    """
+    Per provider, per day bitmap of booked slots.
+
+    Bitmaps are loaded lazily from the store ((provider, date) index) and then kept up to date
+    incrementally by the AppointmentService on add, cancel and reschedule.
+    The store generation tells when someone else (another worker on a shared store) wrote in between,
+    in which case the bitmaps are dropped and reloaded on demand.
+    """
+    store: AppointmentStore
+    schedules: dict[str, ProviderSchedule] = field(default_factory=dict)
+    default_schedule: ProviderSchedule = field(default_factory=ProviderSchedule)
+
+    def __post_init__(self):
+        self._booked: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._seen_generation = self.store.generation()
+
+    def schedule_for(self, provider: str) -> ProviderSchedule:
+        return self.schedules.get(provider, self.default_schedule)
+
+    def set_schedule(self, provider: str, schedule: ProviderSchedule) -> None:
+        with self._lock:
+            self.schedules[provider] = schedule
+            for key in [k for k in self._booked if k[0] == provider]:
+                del self._booked[key]
+
+    def free_slots(self, provider: str, date: str) -> list[str]:
+        """
+        Free slot times for the provider on the date ("YYYY-MM-DD").
+        """
+        self._sync()
+        return self.schedule_for(provider).free_labels(self._booked_mask(provider, date))
+
+    def next_free_slots(self, provider: str, from_date: str, days: int = 14, limit: int = 5, after_time: str | None = None) -> list[tuple[str, str]]:
+        """
+        Earliest free (date, time) slots for the provider, from from_date and within `days` days.
+        after_time ("HH:MM") skips slots on from_date that don't start later (e.g. already past today).
+        """
+        self._sync()
+        schedule = self.schedule_for(provider)
+        start = Date.fromisoformat(from_date)
+        found: list[tuple[str, str]] = []
+        for offset in range(days):
+            day = (start + timedelta(days=offset)).isoformat()
+            for t in schedule.free_labels(self._booked_mask(provider, day)):
+                if offset == 0 and after_time is not None and t <= after_time:
+                    continue
+                found.append((day, t))
+                if len(found) >= limit:
+                    return found
+        return found
+
+    def apply(self, booked: Iterable[Slot] = (), released: Iterable[Slot] = ()) -> None:
+        """
+        Applies a write the service just made to the store.
+        Only loaded days are touched, others will be read from the store when first needed.
+        """
+        with self._lock:
+            generation = self.store.generation()
+            if generation != self._seen_generation + 1:
+                # someone else wrote as well, we can't tell what changed
+                self._booked.clear()
+                self._seen_generation = generation
+                return
+            self._seen_generation = generation
+            # bit operations are idempotent, so a day loaded after the write is not double counted
+            for provider, date, time in released:
+                key = (provider, date)
+                if key in self._booked:
+                    self._booked[key] &= ~self.schedule_for(provider).bit_of.get(time, 0)
+            for provider, date, time in booked:
+                key = (provider, date)
+                if key in self._booked:
+                    self._booked[key] |= self.schedule_for(provider).bit_of.get(time, 0)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._booked.clear()
+            self._seen_generation = self.store.generation()
+
+    def _sync(self) -> None:
+        generation = self.store.generation()
+        if generation != self._seen_generation:
+            with self._lock:
+                if generation != self._seen_generation:
+                    self._booked.clear()
+                    self._seen_generation = generation
+
+    def _booked_mask(self, provider: str, date: str) -> int:
+        key = (provider, date)
+        mask = self._booked.get(key)
+        if mask is None:
+            generation = self._seen_generation
+            times = [a.time for a in self.store.for_provider_on_date(provider, date)]
+            mask = self.schedule_for(provider).booked_mask(times)
+            with self._lock:
+                # a write applied while loading may be missing from what we read, don't cache it then
+                if self._seen_generation == generation:
+                    mask = self._booked.setdefault(key, mask)
+        return mask
@@ -0,0 +1,178 @@
+import bisect
+import re
+import threading
+from dataclasses import dataclass
+from typing import Iterable
+
+# not part of what tells doctors apart ("Dr. Smith", "doctor smith", "smith")
+TITLES = frozenset({"dr", "doctor", "md"})
+
+# how a query token matched a name token, best first
+EXACT, PREFIX, FUZZY = 0, 1, 2
+
+def normalize_name(name: str) -> str:
+    name = re.sub(r"[^\w\s]", " ", name.lower())
+    return re.sub(r"\s+", " ", name).strip()
+
+def name_tokens(name: str) -> tuple[str, ...]:
+    return tuple(t for t in normalize_name(name).split() if t not in TITLES)
+
+def trigrams(token: str) -> set[str]:
+    # padded so the first letters weigh more: a typo rarely sits there
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def max_typos(token: str) -> int:
+    return 0 if len(token) <= 3 else 1 if len(token) <= 8 else 2
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance with adjacent transpositions ("smtih"), or limit + 1 once it is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+@dataclass(frozen=True)
+class DoctorMatch:
+    name: str
+    kind: int # the worst of the query tokens: EXACT, PREFIX or FUZZY (-1: the whole name)
+    typos: int
+
+    @property
+    def rank(self) -> tuple[int, int]:
+        return self.kind, self.typos
+
+class DoctorNameIndex:
+    """
+    Doctor names by normalized token, for matching what patients type ("dr smith", "lang", "Smyth").
+
+    Every query token (titles like "Dr." ignored) must match a token of the name: exactly, as a prefix
+    (2+ letters) or within a few typos (1 for 4-8 letters, 2 from 9). Prefixes are found by bisecting the
+    sorted tokens, typo candidates through a trigram index (a token within k typos shares at least
+    len + 1 - 4k padded trigrams, a transposition breaks 4), so only a handful of tokens are compared by edit distance.
+    Names are ranked by how well their worst token matched, then by typos. Thread safe.
+    """
+    def __init__(self, names: Iterable[str] = ()):
+        self._names: dict[str, tuple[str, ...]] = {} # name -> tokens
+        self._by_token: dict[str, set[str]] = {} # token -> names
+        self._by_trigram: dict[str, set[str]] = {} # trigram -> tokens
+        self._sorted_tokens: list[str] = []
+        self._lock = threading.Lock()
+        self.update(names)
+
+    def add(self, name: str) -> None:
+        self.update((name,))
+
+    def update(self, names: Iterable[str]) -> None:
+        with self._lock:
+            for name in names:
+                if not name or name in self._names:
+                    continue
+                tokens = name_tokens(name)
+                self._names[name] = tokens
+                for token in tokens:
+                    if token not in self._by_token:
+                        self._by_token[token] = set()
+                        bisect.insort(self._sorted_tokens, token)
+                        for gram in trigrams(token):
+                            self._by_trigram.setdefault(gram, set()).add(token)
+                    self._by_token[token].add(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def search(self, query: str, limit: int | None = None) -> list[DoctorMatch]:
+        """
+        Names matching every token of the query, best first (unique, ties by name).
+        """
+        results = sorted(
+            (DoctorMatch(name, *rank) for name, rank in self._ranks(query).items()),
+            key=lambda m: (m.rank, m.name),
+        )
+        return results[:limit] if limit is not None else results
+
+    def match(self, query: str, among: Iterable[str] | None = None) -> list[str]:
+        """
+        The best ranked names for the query, restricted to `among` (indexed on the fly when new):
+        one name for a clear match, several when they are equally good (ambiguous), none when nothing matches.
+        """
+        ranks = self._ranks(query)
+        if among is not None:
+            among = set(among)
+            new = [name for name in among if name not in self._names]
+            if new:
+                self.update(new)
+                ranks = self._ranks(query)
+            ranks = {name: rank for name, rank in ranks.items() if name in among}
+        if not ranks:
+            return []
+        best = min(ranks.values())
+        return sorted(name for name, rank in ranks.items() if rank == best)
+
+    def _ranks(self, query: str) -> dict[str, tuple[int, int]]:
+        # name -> (kind, typos) of every name matching all the query tokens
+        query_tokens = name_tokens(query)
+        if not query_tokens:
+            return {}
+        with self._lock:
+            # the worst kind and the typos over the query tokens seen so far
+            found: dict[str, tuple[int, int]] | None = None
+            for token in query_tokens:
+                matches = self._token_matches(token)
+                if found is None:
+                    found = matches
+                else:
+                    found = {
+                        name: (max(kind, matches[name][0]), typos + matches[name][1])
+                        for name, (kind, typos) in found.items() if name in matches
+                    }
+                if not found:
+                    return {}
+            for name, (_, typos) in found.items():
+                if self._names[name] == query_tokens:
+                    found[name] = (-1, typos)
+        return found
+
+    def _token_matches(self, token: str) -> dict[str, tuple[int, int]]:
+        # name -> (kind, typos) of the best name token for this query token; the caller holds the lock
+        best: dict[str, tuple[int, int]] = {}
+        def offer(name_token: str, kind: int, typos: int) -> None:
+            for name in self._by_token[name_token]:
+                if best.get(name, (FUZZY + 1, 0)) > (kind, typos):
+                    best[name] = (kind, typos)
+
+        if token in self._by_token:
+            offer(token, EXACT, 0)
+        if len(token) >= 2:
+            i = bisect.bisect_right(self._sorted_tokens, token)
+            while i < len(self._sorted_tokens) and self._sorted_tokens[i].startswith(token):
+                offer(self._sorted_tokens[i], PREFIX, 0)
+                i += 1
+        limit = max_typos(token)
+        if limit:
+            shared: dict[str, int] = {}
+            for gram in trigrams(token):
+                for candidate in self._by_trigram.get(gram, ()):
+                    shared[candidate] = shared.get(candidate, 0) + 1
+            needed = max(1, len(token) + 1 - 4 * limit)
+            for candidate, count in shared.items():
+                if count >= needed and candidate != token:
+                    typos = edit_distance(token, candidate, limit)
+                    if typos <= limit:
+                        offer(candidate, FUZZY, typos)
+        return best
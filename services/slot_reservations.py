@@ -0,0 +1,108 @@
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Optional
+from services.appointment_store import Slot
+
+@dataclass(frozen=True)
+class SlotReservation:
+    """
+    A short-lived hold on a (provider, date, time) slot.
+    """
+    token: str
+    slot: Slot
+    holder: str # the user the slot is held for
+    expires_at: float
+
+class SlotReservations:
+    """
+    Short-lived slot holds with per-slot lock striping.
+
+    A slot is hashed onto one of `stripes` locks, so bookings for different slots
+    almost never wait for each other, while everything that touches the same slot
+    (reserve, commit, reschedule into it) is serialized.
+
+    Holds expire after `ttl_seconds`; expired holds are purged lazily.
+    """
+    def __init__(self, ttl_seconds: float = 300, stripes: int = 64, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        # holds are sharded the same way as the locks, a shard is only touched under its lock
+        self._holds: list[dict[Slot, SlotReservation]] = [{} for _ in range(stripes)]
+        # the current hold of every holder, shared by all stripes: written under its own lock,
+        # taken last (never held while waiting for a stripe lock)
+        self._by_holder: dict[str, SlotReservation] = {}
+        self._holder_lock = threading.Lock()
+
+    def _stripe(self, slot: Slot) -> int:
+        return hash(slot) % len(self._locks)
+
+    def lock(self, slot: Slot) -> threading.Lock:
+        """
+        The lock guarding the slot. Callers hold it while checking and writing the slot.
+        """
+        return self._locks[self._stripe(slot)]
+
+    def active_hold(self, slot: Slot) -> Optional[SlotReservation]:
+        """
+        The unexpired hold on the slot (or None). Must be called with the slot lock held.
+        """
+        holds = self._holds[self._stripe(slot)]
+        hold = holds.get(slot)
+        if hold is not None and not self._is_live(hold):
+            del holds[slot]
+            return None
+        return hold
+
+    def is_held_by_other(self, slot: Slot, holder: str | None) -> bool:
+        """
+        Whether someone other than the holder has an unexpired hold. Must be called with the slot lock held.
+        """
+        hold = self.active_hold(slot)
+        return hold is not None and hold.holder != holder
+
+    def hold(self, slot: Slot, holder: str) -> SlotReservation:
+        """
+        Places (or refreshes) the holder's hold on the slot. Must be called with the slot lock held.
+        A holder keeps at most one hold, the previous one stops counting (and is purged lazily).
+        """
+        stripe = self._stripe(slot)
+        self._purge_expired(stripe)
+        reservation = SlotReservation(
+            token=str(uuid.uuid4()),
+            slot=slot,
+            holder=holder,
+            expires_at=self.clock() + self.ttl_seconds,
+        )
+        self._holds[stripe][slot] = reservation
+        with self._holder_lock:
+            self._by_holder[holder] = reservation
+        return reservation
+
+    def release(self, slot: Slot, holder: str | None) -> None:
+        """
+        Drops the holder's hold on the slot (if any). Must be called with the slot lock held.
+        """
+        holds = self._holds[self._stripe(slot)]
+        hold = holds.get(slot)
+        if hold is not None and hold.holder == holder:
+            del holds[slot]
+            self._forget(hold)
+
+    def _is_live(self, hold: SlotReservation) -> bool:
+        # a hold is live until it expires or its holder reserves another slot;
+        # the holder check avoids taking a second stripe lock to drop the previous hold
+        return hold.expires_at > self.clock() and self._by_holder.get(hold.holder) is hold
+
+    def _purge_expired(self, stripe: int) -> None:
+        holds = self._holds[stripe]
+        for slot in [s for s, h in holds.items() if not self._is_live(h)]:
+            self._forget(holds.pop(slot))
+
+    def _forget(self, hold: SlotReservation) -> None:
+        # only if it is still the holder's current hold: a hold placed meanwhile on another stripe stays
+        with self._holder_lock:
+            if self._by_holder.get(hold.holder) is hold:
+                del self._by_holder[hold.holder]
@@ -0,0 +1,247 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+from agents.models.appointment import Appointment
+from services.appointment_store import AppointmentStore
+
+COLUMNS = ("id", "user_id", "date", "time", "location", "provider", "reason", "status")
+_SELECT = f"SELECT {', '.join(COLUMNS)} FROM appointments"
+
+# Statements are module constants so every pooled connection hits its own prepared statement cache
+SQL_COUNT = "SELECT COUNT(*) FROM appointments"
+SQL_GENERATION = "SELECT value FROM store_meta WHERE key = 'generation'"
+SQL_GET = f"{_SELECT} WHERE id = ?"
+SQL_GET_BY_SLOT = f"{_SELECT} WHERE provider = ? AND date = ? AND time = ?"
+SQL_ALL = f"{_SELECT} ORDER BY seq"
+SQL_FOR_USER = f"{_SELECT} WHERE user_id = ? ORDER BY seq"
+SQL_FOR_PROVIDER_ON_DATE = f"{_SELECT} WHERE provider = ? AND date = ? ORDER BY seq"
+SQL_PROVIDERS = "SELECT provider FROM appointments GROUP BY provider ORDER BY MIN(seq)"
+SQL_FIRST_FOR_PROVIDER = f"{_SELECT} WHERE provider = ? ORDER BY seq LIMIT 1"
+SQL_NEXT_ID = "UPDATE store_meta SET value = value + 1 WHERE key = 'next_id' RETURNING value - 1"
+SQL_BUMP_NEXT_ID = "UPDATE store_meta SET value = MAX(value, ? + 1) WHERE key = 'next_id'"
+SQL_INSERT = f"INSERT INTO appointments ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+SQL_DELETE = f"DELETE FROM appointments WHERE id = ? RETURNING {', '.join(COLUMNS)}"
+SQL_REPLACE = "UPDATE appointments SET user_id = ?, date = ?, time = ?, location = ?, provider = ?, reason = ?, status = ? WHERE id = ?"
+SQL_MOVE = f"UPDATE appointments SET date = ?, time = ? WHERE id = ? RETURNING {', '.join(COLUMNS)}"
+SQL_GET_PREFERENCE = "SELECT doctor_name, reason FROM doctor_preferences WHERE user_id = ?"
+SQL_SET_PREFERENCE = "INSERT OR REPLACE INTO doctor_preferences (user_id, doctor_name, reason) VALUES (?, ?, ?)"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS appointments (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT, -- insertion order
+    id TEXT NOT NULL UNIQUE,
+    user_id TEXT,
+    date TEXT,
+    time TEXT,
+    location TEXT,
+    provider TEXT,
+    reason TEXT,
+    status TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS appointments_slot ON appointments (provider, date, time);
+CREATE INDEX IF NOT EXISTS appointments_user ON appointments (user_id, seq);
+CREATE INDEX IF NOT EXISTS appointments_provider ON appointments (provider, seq);
+
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_meta (key, value) VALUES ('generation', 0), ('next_id', 1), ('seeded', 0);
+
+CREATE TRIGGER IF NOT EXISTS appointments_insert_generation AFTER INSERT ON appointments
+BEGIN UPDATE store_meta SET value = value + 1 WHERE key = 'generation'; END;
+CREATE TRIGGER IF NOT EXISTS appointments_update_generation AFTER UPDATE ON appointments
+BEGIN UPDATE store_meta SET value = value + 1 WHERE key = 'generation'; END;
+CREATE TRIGGER IF NOT EXISTS appointments_delete_generation AFTER DELETE ON appointments
+BEGIN UPDATE store_meta SET value = value + 1 WHERE key = 'generation'; END;
+
+-- long-term memory of the appointment assistant, shared by the workers like the schedule
+CREATE TABLE IF NOT EXISTS doctor_preferences (
+    user_id TEXT PRIMARY KEY,
+    doctor_name TEXT NOT NULL,
+    reason TEXT NOT NULL DEFAULT ''
+) WITHOUT ROWID;
+"""
+
+def _to_appointment(row: tuple | None) -> Optional[Appointment]:
+    if row is None:
+        return None
+    return Appointment(**dict(zip(COLUMNS, row)))
+
+def _first(cursor: sqlite3.Cursor) -> tuple | None:
+    # drain the cursor, a RETURNING statement that is still stepping would block the COMMIT
+    rows = cursor.fetchall()
+    return rows[0] if rows else None
+
+def _to_row(appointment: Appointment) -> tuple:
+    return tuple(getattr(appointment, c) for c in COLUMNS)
+
+
+class SQLiteConnectionPool:
+    """
+    Fixed size pool of SQLite connections shared between threads.
+    A connection is only ever used by one thread at a time.
+    """
+    def __init__(self, path: str, size: int = 8, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.size = size
+        self.busy_timeout_ms = busy_timeout_ms
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # autocommit mode (isolation_level=None), transactions are opened explicitly by the store
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, cached_statements=64)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode = WAL") # readers don't block writers and vice versa
+        conn.execute("PRAGMA synchronous = NORMAL") # durable on commit of the WAL, much cheaper than FULL
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            conn = self._connect() if can_create else self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class SQLiteAppointmentStore(AppointmentStore):
+    """
+    Appointment store backed by a SQLite database in WAL mode.
+
+    Several worker processes can open the same file and share one consistent schedule:
+    - the unique (provider, date, time) index makes double booking impossible across processes
+    - writes use BEGIN IMMEDIATE so conflicting writers queue on the database lock instead of failing late
+    - reads run on their own pooled connections and never wait for writers (WAL)
+    """
+    def __init__(self, path: str, seed: Iterable[Appointment] | None = None, pool_size: int = 8):
+        self.pool = SQLiteConnectionPool(path, size=pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+        if seed is not None:
+            self._seed(seed)
+
+    def _seed(self, appointments: Iterable[Appointment]) -> None:
+        """
+        Seeds the database once, the first worker to start wins.
+        """
+        with self._write() as conn:
+            seeded = conn.execute("SELECT value FROM store_meta WHERE key = 'seeded'").fetchone()[0]
+            if seeded:
+                return
+            for appointment in appointments:
+                self._insert(conn, appointment)
+            conn.execute("UPDATE store_meta SET value = 1 WHERE key = 'seeded'")
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _fetch_one(self, sql: str, params: tuple = ()) -> Optional[Appointment]:
+        with self.pool.connection() as conn:
+            return _to_appointment(conn.execute(sql, params).fetchone())
+
+    def _fetch_all(self, sql: str, params: tuple = ()) -> list[Appointment]:
+        with self.pool.connection() as conn:
+            return [_to_appointment(row) for row in conn.execute(sql, params).fetchall()]
+
+    def _insert(self, conn: sqlite3.Connection, appointment: Appointment) -> None:
+        if appointment.id is None:
+            appointment.id = str(_first(conn.execute(SQL_NEXT_ID))[0])
+        elif appointment.id.isdigit():
+            conn.execute(SQL_BUMP_NEXT_ID, (int(appointment.id),))
+        conn.execute(SQL_INSERT, _to_row(appointment))
+
+    def __len__(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute(SQL_COUNT).fetchone()[0]
+
+    def generation(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute(SQL_GENERATION).fetchone()[0]
+
+    def get(self, appointment_id: str) -> Optional[Appointment]:
+        return self._fetch_one(SQL_GET, (appointment_id,))
+
+    def get_by_slot(self, provider: str, date: str, time: str) -> Optional[Appointment]:
+        return self._fetch_one(SQL_GET_BY_SLOT, (provider, date, time))
+
+    def all(self) -> list[Appointment]:
+        return self._fetch_all(SQL_ALL)
+
+    def for_user(self, user_id: str) -> list[Appointment]:
+        return self._fetch_all(SQL_FOR_USER, (user_id,))
+
+    def for_provider_on_date(self, provider: str, date: str) -> list[Appointment]:
+        return self._fetch_all(SQL_FOR_PROVIDER_ON_DATE, (provider, date))
+
+    def providers(self) -> list[str]:
+        with self.pool.connection() as conn:
+            return [row[0] for row in conn.execute(SQL_PROVIDERS).fetchall()]
+
+    def first_for_provider(self, provider: str) -> Optional[Appointment]:
+        return self._fetch_one(SQL_FIRST_FOR_PROVIDER, (provider,))
+
+    def add(self, appointment: Appointment) -> bool:
+        assigned_id = appointment.id is None
+        try:
+            with self._write() as conn:
+                self._insert(conn, appointment)
+        except sqlite3.IntegrityError:
+            if assigned_id:
+                appointment.id = None # the id was rolled back together with the insert
+            return False
+        return True
+
+    def remove(self, appointment_id: str) -> Optional[Appointment]:
+        with self._write() as conn:
+            return _to_appointment(_first(conn.execute(SQL_DELETE, (appointment_id,))))
+
+    def replace(self, appointment: Appointment) -> bool:
+        row = _to_row(appointment)
+        try:
+            with self._write() as conn:
+                return conn.execute(SQL_REPLACE, row[1:] + row[:1]).rowcount == 1
+        except sqlite3.IntegrityError:
+            return False
+
+    def move(self, appointment_id: str, new_date: str, new_time: str) -> Optional[Appointment]:
+        try:
+            with self._write() as conn:
+                return _to_appointment(_first(conn.execute(SQL_MOVE, (new_date, new_time, appointment_id))))
+        except sqlite3.IntegrityError:
+            return None
+
+    def doctor_preference(self, user_id: str) -> Optional[dict]:
+        with self.pool.connection() as conn:
+            row = conn.execute(SQL_GET_PREFERENCE, (user_id,)).fetchone()
+        return {"doctor_name": row[0], "reason": row[1]} if row is not None else None
+
+    def set_doctor_preference(self, user_id: str, doctor_name: str, reason: str = "") -> None:
+        with self.pool.connection() as conn:
+            conn.execute(SQL_SET_PREFERENCE, (user_id, doctor_name, reason))
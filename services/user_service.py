@@ -1,5 +1,4 @@
 from agents.models.user import User
-from datetime import date
 import re
 
 users:list[User] = [
@@ -9,9 +8,43 @@ users:list[User] = [
     User(id="4", name="Jack Daniels", phone="444-444-4444", date_of_birth="1990-01-01", ssn_last_4="3456"),
 ]
 
+def normalize_name(name: str) -> str:
+    return name.lower().strip()
+
+def digits(value: str | None) -> str:
+    """
+    Keeps only the digits (phone numbers, SSN), None becomes an empty string.
+    """
+    if value is None:
+        return ""
+    return re.sub(r'\D', '', value)
+
 class UserService:
-    def __init__(self):
-        self.users = users
+    """
+    Patient lookup.
+    Stored users are normalized once, when they are indexed, into two hash indexes:
+    - (name, date of birth, phone)
+    - (name, date of birth, SSN last 4)
+    so verification is a dict lookup instead of a scan over all patients.
+    """
+    def __init__(self, patients: list[User] | None = None):
+        self.users: list[User] = []
+        self._by_phone: dict[tuple[str, str, str], tuple[int, User]] = {}
+        self._by_ssn: dict[tuple[str, str, str], tuple[int, User]] = {}
+        for user in (users if patients is None else patients):
+            self.add_user(user)
+
+    def add_user(self, user: User) -> User:
+        """
+        Adds a user and indexes it. The first user added wins when two share the same identity keys.
+        """
+        position = len(self.users)
+        self.users.append(user)
+        name = normalize_name(user.name or "")
+        date_of_birth = (user.date_of_birth or "").strip()
+        self._by_phone.setdefault((name, date_of_birth, digits(user.phone)), (position, user))
+        self._by_ssn.setdefault((name, date_of_birth, digits(user.ssn_last_4)), (position, user))
+        return user
     
     def get_user(self, name: str, date_of_birth: str | None = None, phone: str | None = None, ssn_last_4: str | None = None) -> User | None:
         """
@@ -22,30 +55,16 @@ class UserService:
             return None
 
         # normalize the data
-        name = name.lower().strip()
+        name = normalize_name(name)
         date_of_birth = date_of_birth.strip()
-        # remove all non numberic characters
-        if phone is not None:
-            phone_number = re.sub(r'\D', '', phone).strip()
-        else:
-            phone_number = ""
-        if ssn_last_4 is not None:
-            ssn_last_4 = re.sub(r'\D', '', ssn_last_4).strip()
-        else:
-            ssn_last_4 = ""
-
-        # find a user based on the normalized data
-        for user in self.users:
-            db_user_name = user.name.lower().strip()
-            db_user_date_of_birth = user.date_of_birth.strip()
-            db_user_phone = user.phone.replace("-", "").strip()
-            db_user_ssn_last_4 = user.ssn_last_4.replace("-", "").strip()
-            if db_user_name == name and db_user_date_of_birth == date_of_birth and db_user_phone == phone_number and db_user_ssn_last_4 == ssn_last_4:
-                return user
-            if db_user_name == name and db_user_date_of_birth == date_of_birth and db_user_ssn_last_4 == ssn_last_4:
-                return user
-            if db_user_name == name and db_user_date_of_birth == date_of_birth and db_user_phone == phone_number:
-                return user
-        return None
+
+        # find a user based on the normalized data (name + DOB and either SSN or phone must match)
+        by_ssn = self._by_ssn.get((name, date_of_birth, digits(ssn_last_4)))
+        by_phone = self._by_phone.get((name, date_of_birth, digits(phone)))
+        matches = [m for m in (by_ssn, by_phone) if m is not None]
+        if not matches:
+            return None
+        # same answer as a scan in insertion order would give
+        return min(matches, key=lambda m: m[0])[1]
 
 user_service = UserService()
\ No newline at end of file
@@ -0,0 +1,33 @@
+import pathlib
+import sys
+
+# make the project packages (agents, services, api) importable when running `pytest tests/`
+root = pathlib.Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.append(str(root))
+
+from typing import Callable
+import pytest
+from agents.models.appointment import Appointment
+from services.appointment_service import AppointmentService
+from services.appointment_store import InMemoryAppointmentStore
+from services.sqlite_appointment_store import SQLiteAppointmentStore
+
+@pytest.fixture
+def make_appointment() -> Callable[..., Appointment]:
+    def make(date: str, time: str = "10:00", provider: str = "Dr. Lang Smith", user_id: str = "1") -> Appointment:
+        return Appointment(user_id=user_id, date=date, time=time, provider=provider, location="Main", status="Confirmed")
+    return make
+
+@pytest.fixture
+def appointments() -> list[Appointment]:
+    """
+    What the `service` store starts with, override it in a module to seed it.
+    """
+    return []
+
+@pytest.fixture(params=["memory", "sqlite"])
+def service(request, tmp_path, appointments) -> AppointmentService:
+    if request.param == "sqlite":
+        return AppointmentService(SQLiteAppointmentStore(str(tmp_path / "appointments.db"), seed=appointments, pool_size=16))
+    return AppointmentService(InMemoryAppointmentStore(appointments))
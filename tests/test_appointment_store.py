@@ -0,0 +1,93 @@
+import pytest
+from agents.models.appointment import Appointment
+from services.sqlite_appointment_store import SQLiteAppointmentStore
+from services.appointment_service import AppointmentService, AppointmentConflictError, AppointmentNotFoundError
+
+def seed() -> list[Appointment]:
+    return [
+        Appointment(id="1", user_id="1", date="2030-01-01", time="10:00", location="123 Main St", provider="Dr. Lang Smith"),
+        Appointment(id="2", user_id="1", date="2030-01-02", time="11:00", location="456 Main St", provider="Dr. Lang Smith"),
+        Appointment(id="3", user_id="2", date="2030-01-01", time="12:00", location="789 Main St", provider="Dr. Jim Beam"),
+    ]
+
+@pytest.fixture
+def appointments() -> list[Appointment]:
+    return seed()
+
+def test_indexes_follow_reschedule(service):
+    service.reschedule_appointment("1", "2030-01-05", "09:00")
+
+    assert service.store.get_by_slot("Dr. Lang Smith", "2030-01-01", "10:00") is None
+    assert service.store.get_by_slot("Dr. Lang Smith", "2030-01-05", "09:00").id == "1"
+    assert service.get_doctor_available_times_for_day("Dr. Lang Smith", "2030-01-01")[1] == "10:00"
+    assert "09:00" not in service.get_doctor_available_times_for_day("Dr. Lang Smith", "2030-01-05")
+    assert [a.id for a in service.get_appointments("1")] == ["1", "2"]
+
+def test_indexes_follow_cancel_and_add(service):
+    service.cancel_appointment_by_id("3")
+
+    assert service.get_appointments("2") == []
+    assert service.get_doctor_location("Dr. Jim Beam") is None
+    assert "Dr. Jim Beam" not in service.list_all_doctors()
+    service.check_conflict(Appointment(provider="Dr. Jim Beam", date="2030-01-01", time="12:00"))
+
+    added = service.add_appointment(Appointment(user_id="2", date="2030-01-01", time="12:00", provider="Dr. Jim Beam"))
+    # ids are not reused after a cancellation
+    assert added.id == "4"
+    with pytest.raises(AppointmentConflictError):
+        service.check_conflict(added)
+
+def test_conflicts_and_missing_appointments(service):
+    with pytest.raises(AppointmentConflictError):
+        service.add_appointment(Appointment(user_id="2", date="2030-01-01", time="10:00", provider="Dr. Lang Smith"))
+    with pytest.raises(AppointmentConflictError):
+        service.reschedule_appointment("2", "2030-01-01", "10:00")
+    with pytest.raises(AppointmentNotFoundError):
+        service.reschedule_appointment("42", "2030-01-01", "10:00")
+    with pytest.raises(AppointmentNotFoundError):
+        service.cancel_appointment_by_id("42")
+
+    # the failed operations left every index untouched
+    assert len(service.list_all_appointments()) == 3
+    assert service.store.get_by_slot("Dr. Lang Smith", "2030-01-02", "11:00").id == "2"
+
+def test_find_appointments_for_user(service):
+    found = service.find_appointments_for_user(Appointment(user_id="1", date="2030-01-02"))
+    assert [a.id for a in found] == ["2"]
+    with pytest.raises(AppointmentNotFoundError):
+        service.find_appointments_for_user(Appointment(user_id="2", date="2030-01-02"))
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "appointments.db")
+    worker_1 = AppointmentService(SQLiteAppointmentStore(path, seed=seed()))
+    worker_2 = AppointmentService(SQLiteAppointmentStore(path, seed=seed()))
+    # the second worker doesn't seed again
+    assert len(worker_2.list_all_appointments()) == 3
+
+    generation = worker_2.store.generation()
+    added = worker_1.add_appointment(Appointment(user_id="2", date="2030-01-03", time="09:00", provider="Dr. Jim Beam"))
+    assert added.id == "4"
+    assert worker_2.store.generation() > generation
+    assert [a.id for a in worker_2.get_appointments("2")] == ["3", "4"]
+    with pytest.raises(AppointmentConflictError):
+        worker_2.add_appointment(Appointment(user_id="1", date="2030-01-03", time="09:00", provider="Dr. Jim Beam"))
+
+def test_doctor_preferences(service):
+    assert service.get_doctor_preference("1") is None
+    generation = service.store.generation()
+
+    service.set_doctor_preference("1", "Dr. Usually Free")
+    service.set_doctor_preference("1", "Dr. Negroni Sours", reason="closer to home")
+
+    assert service.get_doctor_preference("1") == {"doctor_name": "Dr. Negroni Sours", "reason": "closer to home"}
+    assert service.get_doctor_preference("2") is None
+    assert service.store.generation() == generation
+
+def test_doctor_preferences_are_shared_between_workers(tmp_path):
+    path = str(tmp_path / "appointments.db")
+    worker_1 = AppointmentService(SQLiteAppointmentStore(path, seed=seed()))
+    worker_2 = AppointmentService(SQLiteAppointmentStore(path, seed=seed()))
+
+    worker_1.set_doctor_preference("1", "Dr. Usually Free")
+
+    assert worker_2.get_doctor_preference("1") == {"doctor_name": "Dr. Usually Free", "reason": ""}
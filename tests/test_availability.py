@@ -0,0 +1,86 @@
+import os
+from agents.models.appointment import Appointment
+from agents.models.user import User
+from services.appointment_store import InMemoryAppointmentStore
+from services.sqlite_appointment_store import SQLiteAppointmentStore
+from services.appointment_service import AppointmentService
+from services.availability import ProviderSchedule
+
+# the graph modules build their (unused here) OpenAI client at import
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+import agents.appointment.tools.appointment_tools as appointment_tools
+
+ALL_DAY = ["09:00", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00"]
+
+def seed() -> list[Appointment]:
+    return [
+        Appointment(id="1", user_id="1", date="2030-01-01", time="10:00", provider="Dr. Lang Smith"),
+        Appointment(id="2", user_id="2", date="2030-01-01", time="12:00", provider="Dr. Lang Smith"),
+    ]
+
+def test_free_slots_follow_add_cancel_and_reschedule():
+    service = AppointmentService(InMemoryAppointmentStore(seed()))
+    day = "2030-01-01"
+    assert service.get_doctor_available_times_for_day("Dr. Lang Smith", day) == [t for t in ALL_DAY if t not in ("10:00", "12:00")]
+
+    service.add_appointment(Appointment(user_id="3", date=day, time="09:00", provider="Dr. Lang Smith"))
+    service.cancel_appointment_by_id("1")
+    service.reschedule_appointment("2", "2030-01-02", "16:00")
+
+    assert service.get_doctor_available_times_for_day("Dr. Lang Smith", day) == [t for t in ALL_DAY if t != "09:00"]
+    assert service.get_doctor_available_times_for_day("Dr. Lang Smith", "2030-01-02") == ALL_DAY[:-1]
+    # explicit working hours still work and don't touch the cached day
+    assert service.get_doctor_available_times_for_day("Dr. Lang Smith", day, start_hour=8, end_hour=10, slot_minutes=30) == ["08:00", "08:30", "09:30"]
+
+def test_provider_schedules_and_next_free_slots():
+    schedules = {"Dr. Lang Smith": ProviderSchedule(start_hour=10, end_hour=13, slot_minutes=30)}
+    service = AppointmentService(InMemoryAppointmentStore(seed()), schedules=schedules)
+
+    assert service.get_doctor_available_times_for_day("Dr. Lang Smith", "2030-01-01") == ["10:30", "11:00", "11:30", "12:30"]
+    assert service.get_doctor_next_available_times("Dr. Lang Smith", "2030-01-01", days=2, limit=6) == [
+        ("2030-01-01", "10:30"), ("2030-01-01", "11:00"), ("2030-01-01", "11:30"), ("2030-01-01", "12:30"),
+        ("2030-01-02", "10:00"), ("2030-01-02", "10:30"),
+    ]
+    assert service.get_doctor_next_available_times("Dr. Jim Beam", "2030-01-01", days=1, limit=20) == [("2030-01-01", t) for t in ALL_DAY]
+
+def test_writes_from_another_worker_invalidate_bitmaps(tmp_path):
+    path = str(tmp_path / "appointments.db")
+    worker_1 = AppointmentService(SQLiteAppointmentStore(path, seed=seed()))
+    worker_2 = AppointmentService(SQLiteAppointmentStore(path, seed=seed()))
+    assert "09:00" in worker_1.get_doctor_available_times_for_day("Dr. Lang Smith", "2030-01-01")
+
+    worker_2.add_appointment(Appointment(user_id="3", date="2030-01-01", time="09:00", provider="Dr. Lang Smith"))
+    assert "09:00" not in worker_1.get_doctor_available_times_for_day("Dr. Lang Smith", "2030-01-01")
+
+    # a local write right after a remote one must not be applied on top of the stale bitmap
+    worker_2.cancel_appointment_by_id("1")
+    worker_1.add_appointment(Appointment(user_id="3", date="2030-01-01", time="11:00", provider="Dr. Lang Smith"))
+    assert worker_1.get_doctor_available_times_for_day("Dr. Lang Smith", "2030-01-01") == ["10:00", "13:00", "14:00", "15:00", "16:00"]
+
+def test_find_next_available_slots_across_open_doctors():
+    service = AppointmentService(InMemoryAppointmentStore([
+        Appointment(user_id="1", date="2030-01-01", time=t, provider="Dr. Usually Free") for t in ALL_DAY
+    ] + [
+        Appointment(user_id="1", date="2030-01-01", time="09:00", provider="Dr. Negroni Sours"),
+    ]))
+
+    slots = service.find_next_available_slots("2030-01-01", days=3, limit=3)
+    assert slots == [
+        {"provider": "Dr. Negroni Sours", "date": "2030-01-01", "time": "10:00"},
+        {"provider": "Dr. Negroni Sours", "date": "2030-01-01", "time": "11:00"},
+        {"provider": "Dr. Negroni Sours", "date": "2030-01-01", "time": "12:00"},
+    ]
+    slots = service.find_next_available_slots("2030-01-01", days=3, limit=1, provider="Dr. Usually Free")
+    assert slots == [{"provider": "Dr. Usually Free", "date": "2030-01-02", "time": "09:00"}]
+
+def test_find_next_available_appointments_reports_the_days_it_searched(monkeypatch):
+    searched = []
+    def find_next_available_slots(from_date, days, limit, provider=None):
+        searched.append(days)
+        return []
+    monkeypatch.setattr(appointment_tools.appointment_service, "find_next_available_slots", find_next_available_slots)
+
+    result = appointment_tools.find_next_available_appointments.func(User(id="1"), appointment_tools.FindNextAvailableAppointmentsInput(days=365), config={})
+
+    assert searched == [90]
+    assert "in the next 90 days" in result["error"]
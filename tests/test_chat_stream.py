@@ -0,0 +1,92 @@
+import json
+import os
+from typing import Annotated, TypedDict
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AnyMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.constants import TAG_NOSTREAM
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langgraph.types import interrupt
+
+# the graph modules build their (unused here) OpenAI client at import
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+import api.chat_api as chat_api
+
+class State(TypedDict):
+    messages: Annotated[list[AnyMessage], add_messages]
+
+def build_graph():
+    # GenericFakeChatModel streams its answer word by word
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="Which day works for you?"), AIMessage(content="Booked for Monday.")]))
+    classifier = GenericFakeChatModel(messages=iter([AIMessage(content='{"intent": "book"}')] * 2)).with_config(tags=[TAG_NOSTREAM])
+
+    async def assistant(state: State):
+        await classifier.ainvoke(state["messages"])
+        return {"messages": [await llm.ainvoke(state["messages"])]}
+
+    def confirm(state: State):
+        if interrupt("Confirm Monday at 10:00? (yes/no)") == "yes":
+            return {"messages": [AIMessage(content="Confirmed.")]}
+        return {}
+
+    builder = StateGraph(State)
+    builder.add_node("assistant", assistant)
+    builder.add_node("confirm", confirm)
+    builder.add_edge(START, "assistant")
+    builder.add_edge("assistant", "confirm")
+    builder.add_edge("confirm", END)
+    return builder.compile(checkpointer=InMemorySaver())
+
+def parse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+@pytest.fixture
+def client(monkeypatch) -> TestClient:
+    monkeypatch.setattr(chat_api, "graph", build_graph())
+    app = FastAPI()
+    app.include_router(chat_api.chat_router)
+    return TestClient(app)
+
+def test_stream_sends_tokens_nodes_and_interrupt(client):
+    response = client.post("/chat/stream", json={"message": "book me in", "thread_id": "t1"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    tokens = [data for event, data in events if event == "token"]
+    assert len(tokens) > 1
+    assert {t["node"] for t in tokens} == {"assistant"}
+    # the nostream classifier output never reaches the client
+    assert "".join(t["text"] for t in tokens) == "Which day works for you?"
+    assert ("node", {"node": "assistant"}) in events
+    # the first token comes before the node finishes
+    assert events.index(("node", {"node": "assistant"})) > [e for e, _ in events].index("token")
+    assert events[-1] == ("interrupt", {"message": "Confirm Monday at 10:00? (yes/no)", "thread_id": "t1"})
+
+def test_stream_resumes_interrupt_and_matches_chat(client):
+    client.post("/chat/stream", json={"message": "book me in", "thread_id": "t1"})
+
+    events = parse_events(client.post("/chat/stream", json={"message": "yes", "thread_id": "t1"}).text)
+    assert ("node", {"node": "confirm"}) in events
+    assert events[-1] == ("done", {"message": "Confirmed.", "thread_id": "t1"})
+
+    # a later turn through /chat sees the same conversation
+    assert client.post("/chat", json={"message": "again", "thread_id": "t1"}).json() == {
+        "message": "Confirm Monday at 10:00? (yes/no)",
+        "thread_id": "t1",
+    }
+
+def test_stream_reports_errors(client, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("llm down")
+    monkeypatch.setattr(chat_api.graph, "astream", broken)
+
+    events = parse_events(client.post("/chat/stream", json={"message": "hi", "thread_id": "t2"}).text)
+    assert events == [("error", {"message": "llm down", "thread_id": "t2"})]
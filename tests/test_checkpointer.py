@@ -0,0 +1,113 @@
+import asyncio
+import operator
+from typing import Annotated, TypedDict
+import pytest
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Command, interrupt
+from langgraph.checkpoint.memory import InMemorySaver
+from agents.checkpointer import SQLiteCheckpointSaver, ahas_pending_interrupt
+
+class State(TypedDict):
+    log: Annotated[list[str], operator.add]
+
+def build_graph(checkpointer):
+    def ask(state: State):
+        answer = interrupt("name?")
+        return {"log": [f"name={answer}"]}
+
+    builder = StateGraph(State)
+    builder.add_node("echo", lambda state: {"log": ["echo"]})
+    builder.add_node("ask", ask)
+    builder.add_edge(START, "echo")
+    builder.add_edge("echo", "ask")
+    builder.add_edge("ask", END)
+    return builder.compile(checkpointer=checkpointer)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+def test_conversation_survives_restart_and_resumes_on_another_saver(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    with SQLiteCheckpointSaver(path) as saver:
+        result = build_graph(saver).invoke({"log": ["hi"]}, config("t1"))
+        assert result["__interrupt__"][0].value == "name?"
+
+    # a new saver on the same file, like a restarted process or another worker
+    with SQLiteCheckpointSaver(path) as saver:
+        graph = build_graph(saver)
+        assert graph.get_state(config("t1")).interrupts[0].value == "name?"
+        result = graph.invoke(Command(resume="Ann"), config("t1"))
+        assert result["log"] == ["hi", "echo", "name=Ann"]
+        assert graph.get_state(config("t1")).interrupts == ()
+        assert graph.get_state(config("other")).values == {}
+
+@pytest.mark.anyio
+async def test_async_graph_with_concurrent_threads(tmp_path):
+    with SQLiteCheckpointSaver(str(tmp_path / "checkpoints.db")) as saver:
+        graph = build_graph(saver)
+        await asyncio.gather(*(graph.ainvoke({"log": [str(i)]}, config(f"t{i}")) for i in range(50)))
+        results = await asyncio.gather(*(graph.ainvoke(Command(resume=str(i)), config(f"t{i}")) for i in range(50)))
+        assert [r["log"] for r in results] == [[str(i), "echo", f"name={i}"] for i in range(50)]
+
+def test_list_history(tmp_path):
+    with SQLiteCheckpointSaver(str(tmp_path / "checkpoints.db")) as saver:
+        graph = build_graph(saver)
+        graph.invoke({"log": ["hi"]}, config("t1"))
+        history = list(saver.list(config("t1")))
+        assert [h.metadata["step"] for h in history] == [1, 0, -1]
+        assert history[0].parent_config["configurable"]["checkpoint_id"] == history[1].config["configurable"]["checkpoint_id"]
+        assert len(list(saver.list(config("t1"), limit=2))) == 2
+        assert [h.metadata["step"] for h in saver.list(config("t1"), before=history[0].config)] == [0, -1]
+        assert [h.metadata["source"] for h in saver.list(config("t1"), filter={"source": "input"})] == ["input"]
+        # the full history is still readable checkpoint by checkpoint
+        assert saver.get_tuple(history[1].config).checkpoint["channel_values"]["log"] == ["hi"]
+
+def test_abandoned_threads_are_evicted(tmp_path):
+    clock = FakeClock()
+    with SQLiteCheckpointSaver(str(tmp_path / "checkpoints.db"), ttl_seconds=60, clock=clock) as saver:
+        graph = build_graph(saver)
+        graph.invoke({"log": ["old"]}, config("old"))
+        clock.now += 45
+        graph.invoke({"log": ["new"]}, config("new"))
+        clock.now += 30
+
+        assert saver.evict_expired() == 1
+        assert saver.get_tuple(config("old")) is None
+        assert graph.get_state(config("new")).values["log"] == ["new", "echo"]
+        with saver.pool.connection() as conn:
+            for table in ("checkpoints", "blobs", "writes", "threads"):
+                assert conn.execute(f"SELECT COUNT(*) FROM {table} WHERE thread_id = 'old'").fetchone()[0] == 0
+
+def test_delete_thread(tmp_path):
+    with SQLiteCheckpointSaver(str(tmp_path / "checkpoints.db")) as saver:
+        graph = build_graph(saver)
+        graph.invoke({"log": ["a"]}, config("a"))
+        graph.invoke({"log": ["b"]}, config("b"))
+        saver.delete_thread("a")
+        assert saver.get_tuple(config("a")) is None
+        assert saver.get_tuple(config("b")) is not None
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+async def test_pending_interrupt_matches_state_snapshot(backend, tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.db")) if backend == "sqlite" else InMemorySaver()
+    graph = build_graph(saver)
+
+    async def check(thread_id: str) -> bool:
+        pending = await ahas_pending_interrupt(saver, config(thread_id))
+        assert pending == bool((await graph.aget_state(config(thread_id))).interrupts)
+        return pending
+
+    assert not await check("t1")
+    await graph.ainvoke({"log": ["hi"]}, config("t1"))
+    assert await check("t1")
+    await graph.ainvoke(Command(resume="Ann"), config("t1"))
+    assert not await check("t1")
+    assert not await ahas_pending_interrupt(None, config("t1"))
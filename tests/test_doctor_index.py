@@ -0,0 +1,101 @@
+import time
+import pytest
+from agents.models.appointment import Appointment
+from services.appointment_service import AppointmentService
+from services.appointment_store import InMemoryAppointmentStore
+from services.doctor_index import DoctorNameIndex, edit_distance
+
+DOCTORS = [
+    "Dr. Lang Smith",
+    "Dr. Jim Beam",
+    "Dr. Jill Johnson",
+    "Dr. Jack Daniels",
+    "Dr. Usually Free",
+    "Dr. Negroni Sours",
+]
+
+@pytest.mark.parametrize("query, expected", [
+    # titles, case, punctuation and spacing
+    ("Dr. Lang Smith", ["Dr. Lang Smith"]),
+    ("dr smith", ["Dr. Lang Smith"]),
+    ("DOCTOR  smith!", ["Dr. Lang Smith"]),
+    ("smith", ["Dr. Lang Smith"]),
+    ("lang", ["Dr. Lang Smith"]),
+    ("Dr. Jim-Beam", ["Dr. Jim Beam"]),
+    # typos
+    ("Smyth", ["Dr. Lang Smith"]),
+    ("dr smtih", ["Dr. Lang Smith"]),
+    ("Jonson", ["Dr. Jill Johnson"]),
+    ("jack daneils", ["Dr. Jack Daniels"]),
+    ("negorni sour", ["Dr. Negroni Sours"]),
+    # prefixes
+    ("dr neg", ["Dr. Negroni Sours"]),
+    ("usual", ["Dr. Usually Free"]),
+    # equally good: ambiguous
+    ("dr j", []),
+    ("ji", ["Dr. Jill Johnson", "Dr. Jim Beam"]),
+    # nothing close
+    ("Dr.", []),
+    ("House", []),
+    ("beam smith", []),
+])
+def test_messy_names(query, expected):
+    assert DoctorNameIndex(DOCTORS).match(query) == expected
+
+def test_a_better_match_wins_over_a_typo():
+    index = DoctorNameIndex(["Dr. Lang Smith", "Dr. Anna Smyth"])
+    assert index.match("smyth") == ["Dr. Anna Smyth"]
+    assert index.match("smith") == ["Dr. Lang Smith"]
+    assert index.match("smiht") == ["Dr. Lang Smith"]
+
+def test_a_whole_name_wins_over_a_shared_token():
+    index = DoctorNameIndex(["Dr. Lang Smith", "Dr. Lang Smith Jr", "Dr. John Smith"])
+    assert index.match("Lang Smith") == ["Dr. Lang Smith"]
+    assert index.match("smith") == ["Dr. John Smith", "Dr. Lang Smith", "Dr. Lang Smith Jr"]
+
+def test_candidates_are_unique_and_restricted():
+    index = DoctorNameIndex(DOCTORS)
+    # the user's doctors and the open doctors may overlap
+    assert index.match("smith", among=["Dr. Lang Smith", "Dr. Lang Smith", "Dr. Usually Free"]) == ["Dr. Lang Smith"]
+    assert index.match("smith", among=["Dr. Usually Free"]) == []
+    # names not seen before are indexed on the way
+    assert index.match("house", among=["Dr. Gregory House"]) == ["Dr. Gregory House"]
+    assert "Dr. Gregory House" in index
+
+def test_search_ranks_candidates():
+    index = DoctorNameIndex(["Dr. Lang Smith", "Dr. Anna Smyth", "Dr. Smithers"])
+    assert [m.name for m in index.search("smith")] == ["Dr. Lang Smith", "Dr. Smithers", "Dr. Anna Smyth"]
+    assert [m.name for m in index.search("smith", limit=1)] == ["Dr. Lang Smith"]
+
+@pytest.mark.parametrize("a, b, limit, distance", [
+    ("smith", "smith", 1, 0),
+    ("smith", "smyth", 1, 1),
+    ("smith", "smtih", 1, 1),
+    ("smith", "smithers", 2, 2 + 1),
+    ("johnson", "jonson", 2, 1),
+])
+def test_edit_distance(a, b, limit, distance):
+    assert edit_distance(a, b, limit) == distance
+
+def test_service_indexes_new_providers():
+    service = AppointmentService(store=InMemoryAppointmentStore())
+    assert service.match_doctors("negroni", service.list_open_doctors()) == ["Dr. Negroni Sours"]
+
+    service.add_appointment(Appointment(user_id="1", date="2030-01-01", time="10:00", provider="Dr. Anna Smyth"))
+
+    assert "Dr. Anna Smyth" in service.doctor_index
+    assert service.match_doctors("dr smith", service.list_all_doctors_for_user("1")) == ["Dr. Anna Smyth"]
+
+def test_thousands_of_providers_in_under_a_millisecond():
+    first = ["Anna", "Jim", "Jill", "Jack", "Lang", "Maria", "Omar", "Wei", "Priya", "Lars"]
+    last = [f"{stem}{suffix}" for stem in ("smith", "beam", "johnson", "daniels", "garcia", "nguyen", "kowalski", "okafor", "tanaka", "haddad")
+            for suffix in ("", "son", "ler", "ova", "ini", "sky", "berg", "ford", "ley", "man")]
+    names = [f"Dr. {f} {l} {i}" for i, (f, l) in enumerate((f, l) for f in first for l in last for _ in range(3))]
+    index = DoctorNameIndex(names)
+    assert len(index) == 3000
+
+    queries = ["dr smith", "Smyth", "lang kowalsky", "okafor", "tanak", "maria garciaa"]
+    start = time.perf_counter()
+    for query in queries:
+        index.match(query)
+    assert (time.perf_counter() - start) / len(queries) < 1e-3
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import os
+import uuid
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.runnables.config import var_child_runnable_config
+
+# the evaluator builds its (unused here) OpenAI client
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+from agents.hooks.evaluation_sink import JsonlEvaluationSink, SQLiteEvaluationSink, create_evaluation_sink
+from agents.hooks.evaluator_callback import AnswerQuality, BatchAnswerQuality, EvaluatorCallbackHandler, IndexedAnswerQuality
+from agents.hooks.sampling import SamplingPolicy, create_sampling_policy
+from agents.scripted_llm import ScriptedChatModel
+
+def score_everything() -> SamplingPolicy:
+    return SamplingPolicy(rate=1.0, per_thread_cap=None)
+
+async def llm_call(handler: EvaluatorCallbackHandler, question: str, answer: str, metadata: dict | None = None) -> uuid.UUID:
+    run_id = uuid.uuid4()
+    await handler.on_chat_model_start({}, [[HumanMessage(content=question)]], run_id=run_id, metadata=metadata)
+    await handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=AIMessage(content=answer))]]), run_id=run_id)
+    return run_id
+
+def recording(handler: EvaluatorCallbackHandler, gate: asyncio.Event | None = None) -> list[list]:
+    batches = []
+    async def evaluate(pairs):
+        if gate is not None:
+            await gate.wait()
+        batches.append([(p.human.content, p.ai.content) for p in pairs])
+    handler._run_evaluator_batch = evaluate
+    return batches
+
+@pytest.mark.anyio
+async def test_pairs_are_evaluated_in_batches():
+    handler = EvaluatorCallbackHandler(workers=1, batch_size=8, sampling=score_everything())
+    batches = recording(handler)
+
+    for i in range(20):
+        await llm_call(handler, f"question {i}", f"answer {i}")
+    await handler.join()
+    await handler.aclose()
+
+    assert sorted(pair for batch in batches for pair in batch) == sorted((f"question {i}", f"answer {i}") for i in range(20))
+    assert max(len(b) for b in batches) <= 8
+    assert len(batches) < 20
+    assert handler.stats()["evaluated"] == 20
+
+@pytest.mark.anyio
+async def test_workers_do_not_inherit_the_first_runs_config():
+    handler = EvaluatorCallbackHandler(workers=1, batch_size=8, sampling=score_everything())
+    seen = []
+    async def evaluate(pairs):
+        seen.append(var_child_runnable_config.get())
+    handler._run_evaluator_batch = evaluate
+
+    # the LLM run that starts the workers runs inside a conversation's runnable config
+    token = var_child_runnable_config.set({"metadata": {"thread_id": "t1"}, "callbacks": []})
+    try:
+        await llm_call(handler, "question", "answer")
+    finally:
+        var_child_runnable_config.reset(token)
+    await handler.join()
+    await handler.aclose()
+
+    assert seen == [None]
+
+@pytest.mark.anyio
+async def test_full_queue_sheds_load():
+    handler = EvaluatorCallbackHandler(max_queue=5, workers=1, batch_size=1, sampling=score_everything())
+    gate = asyncio.Event()
+    batches = recording(handler, gate)
+
+    for i in range(20):
+        await llm_call(handler, f"question {i}", f"answer {i}")
+    # the handler never waits on the evaluator: five pairs queued, the rest dropped
+    assert handler.stats()["queued"] == 5
+    assert handler.dropped == 15
+
+    gate.set()
+    await handler.join()
+    await handler.aclose()
+    assert len(batches) == 5
+
+@pytest.mark.anyio
+async def test_evaluated_pairs_are_bounded_and_deduplicated():
+    handler = EvaluatorCallbackHandler(max_evaluated_pairs=3, sampling=score_everything())
+    recording(handler)
+
+    await llm_call(handler, "same question", "same answer")
+    await llm_call(handler, "same question", "same answer")
+    for i in range(5):
+        await llm_call(handler, f"question {i}", f"answer {i}")
+    await handler.join()
+    await handler.aclose()
+
+    assert handler.enqueued == 6
+    assert len(handler._evaluated_pairs) == 3
+
+@pytest.mark.anyio
+async def test_failed_runs_are_forgotten():
+    handler = EvaluatorCallbackHandler()
+    run_id = uuid.uuid4()
+    await handler.on_chat_model_start({}, [[HumanMessage(content="question")]], run_id=run_id)
+    assert handler.stats()["runs_in_flight"] == 1
+
+    await handler.on_llm_error(RuntimeError("timeout"), run_id=run_id)
+    assert handler.stats()["runs_in_flight"] == 0
+
+def quality(index: int | None = None, score: float = 8.0) -> AnswerQuality:
+    fields = dict(answer_relevance_accuracy=8, user_need_relevance=8, groundedness=8, overall_score=score, explanation="fine")
+    return AnswerQuality(**fields) if index is None else IndexedAnswerQuality(index=index, **fields)
+
+def test_sampling_rate_is_deterministic():
+    policy = SamplingPolicy(rate=0.2, per_thread_cap=None)
+    first = [policy.sample(f"pair {i}") for i in range(5000)]
+    again = SamplingPolicy(rate=0.2, per_thread_cap=None)
+
+    assert first == [again.sample(f"pair {i}") for i in range(5000)]
+    assert 0.18 < sum(first) / len(first) < 0.22
+
+def test_sampling_per_thread_cap_and_node_rates():
+    policy = SamplingPolicy(rate=0.0, per_thread_cap=2, node_rates={"cancel_appointment": 1.0})
+
+    assert not any(policy.sample(f"pair {i}", node="identity_collector", thread_id="t1") for i in range(50))
+    assert [policy.sample(f"pair {i}", node="cancel_appointment", thread_id="t1") for i in range(4)] == [True, True, False, False]
+    assert policy.sample("pair 0", node="cancel_appointment", thread_id="t2")
+
+def test_create_sampling_policy_reads_the_env(monkeypatch):
+    monkeypatch.setenv("EVAL_SAMPLE_RATE", "0.1")
+    monkeypatch.setenv("EVAL_PER_THREAD_CAP", "0")
+    monkeypatch.setenv("EVAL_NODE_RATES", "cancel_appointment=0.5, reschedule_appointment=1")
+
+    policy = create_sampling_policy()
+    assert (policy.rate, policy.per_thread_cap) == (0.1, None)
+    assert policy.node_rates == {"cancel_appointment": 0.5, "reschedule_appointment": 1.0}
+
+@pytest.mark.anyio
+async def test_abatch_mode_scores_each_pair_and_writes_the_sink(tmp_path):
+    llm = ScriptedChatModel().load([quality() for _ in range(5)])
+    sink = JsonlEvaluationSink(str(tmp_path / "scores.jsonl"))
+    handler = EvaluatorCallbackHandler(workers=1, batch_size=5, sampling=score_everything(), sink=sink, eval_llm=llm, max_concurrency=2)
+
+    for i in range(5):
+        await llm_call(handler, f"question {i}", f"answer {i}", metadata={"langgraph_node": "primary_appointment", "thread_id": "t1"})
+    await handler.join()
+    await handler.aclose()
+
+    records = [json.loads(line) for line in open(sink.path)]
+    assert sorted(r["question"] for r in records) == [f"question {i}" for i in range(5)]
+    assert {(r["node"], r["thread_id"], r["overall_score"]) for r in records} == {("primary_appointment", "t1", 8.0)}
+    assert handler.stats()["evaluator_requests"] == 5
+    assert llm.remaining == []
+
+@pytest.mark.anyio
+async def test_request_mode_scores_the_batch_in_one_request(tmp_path):
+    # pair 2 missing from the answer: counted as failed, the others are kept
+    llm = ScriptedChatModel().load([BatchAnswerQuality(evaluations=[quality(i, score=i) for i in (0, 1, 3)])])
+    sink = SQLiteEvaluationSink(str(tmp_path / "scores.db"))
+    handler = EvaluatorCallbackHandler(workers=1, batch_size=4, sampling=score_everything(), sink=sink, eval_llm=llm, batch_mode="request")
+
+    for i in range(4):
+        await llm_call(handler, f"question {i}", f"answer {i}")
+    await handler.join()
+    await handler.aclose()
+
+    rows = sink._conn.execute("SELECT question, overall_score FROM qa_evaluations ORDER BY question").fetchall()
+    sink.close()
+    assert rows == [("question 0", 0.0), ("question 1", 1.0), ("question 3", 3.0)]
+    assert handler.stats()["evaluator_requests"] == 1
+    assert handler.failed == 1
+
+def test_create_evaluation_sink(monkeypatch, tmp_path):
+    monkeypatch.delenv("EVAL_SINK", raising=False)
+    assert create_evaluation_sink() is None
+    monkeypatch.setenv("EVAL_SINK", "jsonl")
+    monkeypatch.setenv("EVAL_SINK_PATH", str(tmp_path / "scores.jsonl"))
+    assert isinstance(create_evaluation_sink(), JsonlEvaluationSink)
+    monkeypatch.setenv("EVAL_SINK", "kafka")
+    with pytest.raises(ValueError):
+        create_evaluation_sink()
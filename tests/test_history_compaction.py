@@ -0,0 +1,73 @@
+import os
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from agents.appointment.util.history import compact_history, split_turns
+
+# the graph modules build their (unused here) OpenAI client at import
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+from agents.appointment.util.helpers import appointment_template_params
+
+def booking_turn(i: int) -> list:
+    call = {"name": "check_appointment", "args": {"date": f"2026-01-{i + 1:02d}", "time": "10:00"}, "id": f"call_{i}"}
+    return [
+        HumanMessage(content=f"Can I book January {i + 1} at 10:00?"),
+        AIMessage(content="", tool_calls=[call]),
+        ToolMessage(content=f"Available: 2026-01-{i + 1:02d} 10:00 with Dr. Lang Smith. " + "Other free slots: 11:00, 14:00. " * 20, tool_call_id=f"call_{i}"),
+        AIMessage(content=f"January {i + 1} at 10:00 is free, shall I book it?"),
+    ]
+
+def conversation(turns: int) -> list:
+    return [m for i in range(turns) for m in booking_turn(i)]
+
+def assert_tool_calls_are_answered(messages: list) -> None:
+    # what the chat APIs require: every tool call answered right after it, no result without its call
+    pending: set[str] = set()
+    for m in messages:
+        if isinstance(m, ToolMessage):
+            assert m.tool_call_id in pending
+            pending.discard(m.tool_call_id)
+        else:
+            assert not pending
+            if isinstance(m, AIMessage):
+                pending = {c["id"] for c in m.tool_calls}
+
+def test_short_history_is_unchanged():
+    messages = conversation(3)
+    assert compact_history(messages, keep_turns=4, max_tokens=0) == messages
+
+def test_recent_turns_verbatim_old_tool_exchanges_collapsed():
+    messages = conversation(10)
+
+    compacted = compact_history(messages, keep_turns=4, max_tokens=0)
+
+    assert compacted[-16:] == messages[-16:]
+    old = compacted[:-16]
+    assert len(split_turns(old)) == 6
+    assert not any(isinstance(m, ToolMessage) or getattr(m, "tool_calls", None) for m in old)
+    assert old[1].content.startswith('[called check_appointment({"date": "2026-01-01", "time": "10:00"}) -> Available: 2026-01-01 10:00')
+    assert_tool_calls_are_answered(compacted)
+
+def test_token_budget_drops_whole_turns_from_the_oldest():
+    compacted = compact_history(conversation(50), keep_turns=4, max_tokens=1500)
+
+    assert isinstance(compacted[0], HumanMessage)
+    assert compacted[-4:] == booking_turn(49)
+    assert len(compacted) < 4 * 50
+    assert_tool_calls_are_answered(compacted)
+
+def test_current_turn_is_kept_over_budget():
+    messages = conversation(5)
+    assert compact_history(messages, keep_turns=2, max_tokens=10) == booking_turn(4)
+
+def test_unanswered_tool_call_is_kept():
+    call = {"name": "commit_appointment", "args": {}, "id": "pending"}
+    messages = [HumanMessage(content="hello"), AIMessage(content="", tool_calls=[call]), *conversation(6)]
+
+    compacted = compact_history(messages, keep_turns=2, max_tokens=0)
+
+    assert compacted[1].tool_calls[0]["id"] == "pending"
+
+def test_appointment_prompt_gets_the_compacted_history():
+    params = appointment_template_params({"messages": conversation(20)})
+
+    assert params["messages"] == compact_history(conversation(20))
+    assert len(params["messages"]) < 80
@@ -0,0 +1,140 @@
+import os
+from datetime import date
+import pytest
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
+from agents.identity.identity_extractor import extract_identity
+from agents.models.user import User
+
+# the graph modules build their (unused here) OpenAI client at import
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+import agents.identity.identity_collector_node as identity_collector_node
+from agents.identity.identity_collector_node import UpdateInfoWithResponse
+from agents.identity.prompts.intent_prompt import IntentResult
+
+TODAY = date(2025, 12, 1)
+
+@pytest.mark.parametrize("text, expected", [
+    ("John Doe, 01-01-1960, 1111", {"name": "John Doe", "date_of_birth": "1960-01-01", "ssn_last_4": "1111"}),
+    ("John Doe, 1960-01-01, 111-111-1111", {"name": "John Doe", "date_of_birth": "1960-01-01", "phone_number": "111-111-1111"}),
+    ("Hi, my name is John Doe, born 1960-01-01, SSN 1111. I'd like to book an appointment", {"name": "John Doe", "date_of_birth": "1960-01-01", "ssn_last_4": "1111"}),
+    ("My name is Jill Johnson, DOB 01/01/1980, phone (333) 333-3333", {"name": "Jill Johnson", "date_of_birth": "1980-01-01", "phone_number": "333-333-3333"}),
+    ("Jim Beam. Born January 1st 1970. Last 4 of my social are 5678", {"name": "Jim Beam", "date_of_birth": "1970-01-01", "ssn_last_4": "5678"}),
+    ("Name: Jack Daniels, 1 Jan 1990, +1 444.444.4444", {"name": "Jack Daniels", "date_of_birth": "1990-01-01", "phone_number": "444-444-4444"}),
+    ("Mary Ann Smith; 25.12.1985; ssn: 123-45-6789", {"name": "Mary Ann Smith", "date_of_birth": "1985-12-25", "ssn_last_4": "6789"}),
+    ("My name is John Doe, date of birth is Jan. 1, 1960 and the last four digits are 1111", {"name": "John Doe", "date_of_birth": "1960-01-01", "ssn_last_4": "1111"}),
+    ("Wei Chen, 1 Feb 1946, 1152. I'd like to book an appointment", {"name": "Wei Chen", "date_of_birth": "1946-02-01", "ssn_last_4": "1152"}),
+    ("my phone number is 1112223333", {"phone_number": "111-222-3333"}),
+    ("born 03/04/1975", {"date_of_birth": "1975-03-04"}),
+    ("ssn 0042", {"ssn_last_4": "0042"}),
+])
+def test_extracts_fields(text, expected):
+    assert extract_identity(text, today=TODAY).fields() == expected
+
+@pytest.mark.parametrize("text, expected", [
+    # a year is not an SSN, and a year alone is not a date of birth
+    ("My name is John Doe, born in 1960", {"name": "John Doe"}),
+    # "I'm ..." and "This is ..." are as often a feeling or a place as a name
+    ("I'm Really Scared, dob 01/02/1980, ssn 1234", {"date_of_birth": "1980-01-02", "ssn_last_4": "1234"}),
+    ("This is Urgent Care calling, dob 01/02/1980, ssn 1234", {"date_of_birth": "1980-01-02", "ssn_last_4": "1234"}),
+    ("Hi, I'm John Doe, born 1960-01-01, SSN 1111", {"date_of_birth": "1960-01-01", "ssn_last_4": "1111"}),
+    # the appointment date is not the date of birth
+    ("John Doe, born 1960-01-01, book me on 2026-01-05", {"name": "John Doe", "date_of_birth": "1960-01-01"}),
+    ("book me on 2026-01-05 at 1030", {}),
+    # two candidates: leave it to the LLM
+    ("Jim Beam, 01/01/1970 or maybe 02/01/1970", {"name": "Jim Beam"}),
+    ("my phone is 555 1234", {}),
+    ("I'd like to book an appointment", {}),
+    ("Hello, Dr. Smith please", {}),
+    ("January 5, 2026", {}),
+    ("13/13/1960", {}),
+])
+def test_leaves_ambiguous_fields_out(text, expected):
+    assert extract_identity(text, today=TODAY).fields() == expected
+
+@pytest.mark.parametrize("text, needs_review", [
+    ("My name is John Doe, 01-01-1960, 1111", False),
+    ("My name is John Doe, 01-01-1960, 1111. I'd like to book an appointment", False),
+    # a message starting with two or three capitalized words may not start with a name at all
+    ("John Doe, 01-01-1960, 1111", True),
+    ("Need Help Now, 01-01-1960, 1111", True),
+    ("Mary Ann Smith; 25.12.1985; ssn: 123-45-6789", True),
+    # May 4 or April 5
+    ("My name is John Doe, born 05/04/1960, ssn 1111", True),
+    ("My name is John Doe, born 04/04/1960, ssn 1111", False),
+    ("My name is John Doe, born 25/04/1960, ssn 1111", False),
+    ("John Doe, 01-01-1960, 1111, I have chest pain", True),
+    ("Actually my date of birth is 01-02-1960", True),
+    ("John Doe, 01-01-1960, 1111. Do you take my insurance?", True),
+    ("My name is Jill Johnson, DOB 01/01/1980, phone (333) 333-3333. I need to reschedule my appointment", False),
+    # symptoms no keyword list would name: anything besides the identity goes to the LLM
+    ("My name is John Smith, dob 01/02/1980, ssn 1234. My son swallowed bleach and is vomiting", True),
+    ("My name is John Smith, dob 01/02/1980, ssn 1234. I have been having a seizure", True),
+    ("I'm Really Scared, dob 01/02/1980, ssn 1234", True),
+    ("John Doe, 01-01-1960, 1111, book me for 2026-01-05 at 1030", True),
+])
+def test_needs_review(text, needs_review):
+    assert extract_identity(text, today=TODAY).needs_review is needs_review
+
+def test_a_leading_name_the_llm_confirmed_is_not_a_guess():
+    assert not extract_identity("John Doe, 01-01-1960, 1111", today=TODAY, confirmed_name="John Doe").needs_review
+    assert extract_identity("Need Help Now, 01-01-1960, 1111", today=TODAY, confirmed_name="John Doe").needs_review
+
+@pytest.mark.anyio
+async def test_collector_skips_the_llm_when_the_message_has_everything(monkeypatch):
+    def llm(params):
+        raise AssertionError("the collector LLM must not be called")
+    monkeypatch.setattr(identity_collector_node, "identity_collector_chain", RunnableLambda(llm))
+
+    out = await identity_collector_node.identity_collector_node({"messages": [HumanMessage(content="My name is John Doe, 01-01-1960, 1111. I'd like to book an appointment")]})
+
+    assert (out["user"].name, out["user"].date_of_birth, out["user"].ssn_last_4) == ("John Doe", "1960-01-01", "1111")
+    assert out["messages"][0].content.startswith("Thank you, John.")
+    assert out["intents"][0].intent == "add_appointment"
+
+@pytest.mark.anyio
+async def test_collector_skips_the_llm_for_the_name_it_confirmed_before(monkeypatch):
+    def llm(params):
+        raise AssertionError("the collector LLM must not be called")
+    monkeypatch.setattr(identity_collector_node, "identity_collector_chain", RunnableLambda(llm))
+    monkeypatch.setattr(identity_collector_node, "intent_chain", RunnableLambda(lambda params: IntentResult(intent="other")))
+    state = {"messages": [HumanMessage(content="John Doe, 01-01-1960, 1111")], "user": User(name="John Doe")}
+
+    out = await identity_collector_node.identity_collector_node(state)
+
+    assert (out["user"].date_of_birth, out["user"].ssn_last_4) == ("1960-01-01", "1111")
+
+@pytest.mark.anyio
+async def test_collector_llm_only_asks_for_what_the_rules_did_not_find(monkeypatch):
+    seen = []
+    def llm(params):
+        seen.append(params)
+        return UpdateInfoWithResponse(response="What is your date of birth?")
+    monkeypatch.setattr(identity_collector_node, "identity_collector_chain", RunnableLambda(llm))
+    monkeypatch.setattr(identity_collector_node, "intent_chain", RunnableLambda(lambda params: IntentResult(intent="other")))
+
+    out = await identity_collector_node.identity_collector_node({"messages": [HumanMessage(content="My name is John Doe, SSN 1111")]})
+
+    assert seen[0]["name"] == "John Doe" and seen[0]["ssn_last_4"] == "1111"
+    assert seen[0]["missing_information"] == ["Date of Birth"]
+    assert out["user"].name == "John Doe"
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("text", [
+    "My name is John Smith, dob 01/02/1980, ssn 1234. My son swallowed bleach and is vomiting",
+    "My name is John Smith, dob 01/02/1980, ssn 1234. I have been having a seizure",
+    "Need Help Now, 01-01-1960, 1111",
+])
+async def test_urgent_message_with_a_full_identity_goes_to_the_urgency_handoff(text, monkeypatch):
+    seen = []
+    def llm(params):
+        seen.append(params)
+        return UpdateInfoWithResponse(urgency_level=10, urgency_reason="poisoning", response="Please hang up and call 911.")
+    monkeypatch.setattr(identity_collector_node, "identity_collector_chain", RunnableLambda(llm))
+    monkeypatch.setattr(identity_collector_node, "intent_chain", RunnableLambda(lambda params: IntentResult(intent="other")))
+
+    out = await identity_collector_node.identity_collector_node({"messages": [HumanMessage(content=text)]})
+
+    assert len(seen) == 1
+    assert out["urgency_level"] == 10
+    assert identity_collector_node.validate_identity_completness(out) == "urgency"
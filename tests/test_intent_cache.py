@@ -0,0 +1,71 @@
+import os
+import pytest
+from langchain_core.runnables import RunnableLambda
+from agents.identity.intent_cache import IntentCache
+from agents.identity.prompts.intent_prompt import IntentResult
+
+# the graph modules build their (unused here) OpenAI client at import
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+import agents.identity.identity_collector_node as identity_collector_node
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def intent(name: str) -> IntentResult:
+    return IntentResult(intent=name, confidence=0.9, original_message="first phrasing")
+
+def test_same_phrasing_hits_whatever_case_punctuation_and_spacing():
+    cache = IntentCache()
+    cache.put("Book an appointment.", intent("add_appointment"))
+
+    hit = cache.get("  book an   appointment!")
+    assert hit.intent == "add_appointment"
+    # the hit describes the message it was asked for
+    assert hit.original_message == "  book an   appointment!"
+    assert cache.get("cancel my appointment") is None
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1, "evictions": 0, "expirations": 0, "hit_ratio": 0.5}
+
+def test_least_recently_used_entry_is_evicted():
+    cache = IntentCache(max_size=2)
+    cache.put("book", intent("add_appointment"))
+    cache.put("cancel", intent("cancel_appointment"))
+    cache.get("book")
+    cache.put("reschedule", intent("reschedule_appointment"))
+
+    assert len(cache) == 2
+    assert cache.get("cancel") is None
+    assert cache.get("book") is not None
+    assert cache.evictions == 1
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = IntentCache(ttl_seconds=60, clock=clock)
+    cache.put("book", intent("add_appointment"))
+
+    clock.now = 60
+    assert cache.get("book") is not None
+    clock.now = 61
+    assert cache.get("book") is None
+    assert cache.expirations == 1 and len(cache) == 0
+
+@pytest.mark.anyio
+async def test_classify_intent_calls_the_llm_once_per_phrasing(monkeypatch):
+    calls = []
+    def llm(inputs: dict) -> IntentResult:
+        calls.append(inputs["text"])
+        return IntentResult(intent="add_appointment", confidence=0.9, original_message=inputs["text"])
+    monkeypatch.setattr(identity_collector_node, "intent_chain", RunnableLambda(llm))
+    monkeypatch.setattr(identity_collector_node, "intent_cache", IntentCache())
+    # the local classifier would answer these without the llm
+    monkeypatch.setattr("agents.intent_classifier.LOCAL_INTENT_THRESHOLD", 1.1)
+
+    first = await identity_collector_node.classify_intent("I'd like to book an appointment")
+    second = await identity_collector_node.classify_intent("i'd like to book an appointment!")
+
+    assert calls == ["I'd like to book an appointment"]
+    assert first.intent == second.intent == "add_appointment"
+    assert identity_collector_node.intent_cache.hit_ratio == 0.5
@@ -0,0 +1,61 @@
+import json
+import pathlib
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from agents.identity.intent_cache import normalize_intent_text
+from agents.intent_classifier import LocalIntentClassifier, detect_intents_from_messages, local_intent_classifier, LOCAL_INTENT_THRESHOLD
+from agents.intent_examples import INTENT_TRAINING_EXAMPLES
+
+FIXTURE = pathlib.Path(__file__).parent / "fixtures" / "intents.jsonl"
+
+def labelled() -> list[dict]:
+    with open(FIXTURE) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def test_fixture_is_held_out():
+    trained = {normalize_intent_text(text) for text, _ in INTENT_TRAINING_EXAMPLES}
+    assert not trained & {normalize_intent_text(row["text"]) for row in labelled()}
+
+def test_confident_answers_are_accurate_and_cover_most_messages():
+    rows = labelled()
+    answered = [(row, local_intent_classifier.classify(row["text"])) for row in rows]
+    answered = [(row, result) for row, result in answered if result.confidence >= LOCAL_INTENT_THRESHOLD]
+
+    correct = sum(result.intent == row["intent"] for row, result in answered)
+    assert correct / len(answered) >= 0.95
+    assert len(answered) / len(rows) >= 0.6
+
+@pytest.mark.parametrize("text, intent", [
+    ("Hi, I'm John Doe, born 1960-01-01. I'd like to book an appointment", "add_appointment"),
+    ("please cancel my appointment and book a new one instead", "reschedule_appointment"),
+    ("can I move my appointment to Friday", "reschedule_appointment"),
+    ("show me my upcoming appointments", "list_appointments"),
+])
+def test_rules(text, intent):
+    assert local_intent_classifier.match_rules(text) == intent
+
+@pytest.mark.parametrize("text", [
+    "Did I book something already?",
+    "How do I cancel my insurance",
+    "Can you cancel my gym membership?",
+    "how do I book an appointment?",
+    "What happens if I cancel?",
+])
+def test_bare_keywords_and_questions_are_left_to_the_model(text):
+    assert local_intent_classifier.match_rules(text) is None
+
+def test_negated_keywords_are_left_to_the_model():
+    assert local_intent_classifier.match_rules("I don't want to cancel, just checking") is None
+
+def test_naive_bayes_posterior():
+    classifier = LocalIntentClassifier([("cancel it", "cancel_appointment"), ("book one", "add_appointment")], rules=[])
+
+    intent, posterior = classifier.predict("please cancel it")
+    assert intent == "cancel_appointment" and 0.5 < posterior < 1
+    # nothing known: the prior
+    assert classifier.predict("hello")[1] == pytest.approx(0.5)
+
+def test_detect_intents_uses_the_last_human_message():
+    messages = [HumanMessage(content="My name is John Doe"), AIMessage(content="How can I help?"), HumanMessage(content="cancel my appointment")]
+    assert [i.intent for i in detect_intents_from_messages(messages)] == ["cancel_appointment"]
+    assert detect_intents_from_messages([HumanMessage(content="hmm")]) == []
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import openai
+import pytest
+import agents.llm_client as llm_client
+from agents.hooks.metrics import GraphMetrics
+from agents.llm_client import LLMTier
+from agents.llms import LimitedChatOpenAI
+
+COMPLETION = {
+    "id": "chatcmpl-1",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4.1-mini",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hello"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 90, "completion_tokens": 10, "total_tokens": 100},
+}
+
+class MockOpenAI(ThreadingHTTPServer):
+    """
+    OpenAI compatible chat completions endpoint: answers with the queued (status, body) failures first,
+    then with COMPLETION after `delay` seconds. Records requests, peak concurrency and client connections.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), MockOpenAIHandler)
+        self.failures: list[tuple[int, dict]] = []
+        self.delay = 0.0
+        self.requests = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.connections: set[int] = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive
+    disable_nagle_algorithm = True # headers and body are written separately
+
+    def do_POST(self):
+        server: MockOpenAI = self.server
+        self.rfile.read(int(self.headers["Content-Length"]))
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+            server.connections.add(self.client_address[1])
+            status, body = server.failures.pop(0) if server.failures else (200, COMPLETION)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def error(status: int, type: str) -> tuple[int, dict]:
+    return status, {"error": {"message": f"mock {status}", "type": type, "code": None, "param": None}}
+
+@pytest.fixture
+def server():
+    server = MockOpenAI()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def metrics(monkeypatch) -> GraphMetrics:
+    metrics = GraphMetrics()
+    monkeypatch.setattr(llm_client, "graph_metrics", metrics)
+    return metrics
+
+def use_tier(monkeypatch, **settings) -> LLMTier:
+    tier = LLMTier("mini", backoff_base=0.001, backoff_max=0.01, **settings)
+    monkeypatch.setitem(llm_client.llm_tiers, "mini", tier)
+    return tier
+
+def model(server: MockOpenAI, http_async_client: httpx.AsyncClient | None = None, **kwargs) -> LimitedChatOpenAI:
+    return LimitedChatOpenAI(model="gpt-4.1-mini", api_key="test", base_url=server.url, max_retries=0, http_async_client=http_async_client, **kwargs)
+
+@pytest.mark.anyio
+async def test_transient_errors_are_retried_with_backoff(server, metrics, monkeypatch):
+    use_tier(monkeypatch)
+    server.failures = [error(429, "rate_limit_error"), error(503, "server_error")]
+
+    async with httpx.AsyncClient() as client:
+        answer = await model(server, client).ainvoke("hi")
+
+    assert answer.content == "Hello"
+    assert server.requests == 3
+    assert metrics.llm_retries.value("mini", "RateLimitError") == 1
+    assert metrics.llm_retries.value("mini", "InternalServerError") == 1
+    # every attempt queued and ran on its own
+    assert metrics.llm_queue_wait.count("mini") == 3
+    assert metrics.llm_request_duration.count("mini") == 3
+
+@pytest.mark.anyio
+async def test_retries_stop_after_max_retries(server, metrics, monkeypatch):
+    use_tier(monkeypatch, max_retries=2)
+    server.failures = [error(429, "rate_limit_error")] * 5
+
+    async with httpx.AsyncClient() as client:
+        with pytest.raises(openai.RateLimitError):
+            await model(server, client).ainvoke("hi")
+
+    assert server.requests == 3
+
+@pytest.mark.anyio
+async def test_client_errors_are_not_retried(server, metrics, monkeypatch):
+    use_tier(monkeypatch)
+    server.failures = [error(400, "invalid_request_error")]
+
+    async with httpx.AsyncClient() as client:
+        with pytest.raises(openai.BadRequestError):
+            await model(server, client).ainvoke("hi")
+
+    assert server.requests == 1
+    assert metrics.llm_retries.render()[2:] == []
+
+@pytest.mark.anyio
+async def test_concurrency_cap_over_kept_alive_connections(server, metrics, monkeypatch):
+    tier = use_tier(monkeypatch, max_concurrency=2)
+    server.delay = 0.05
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=8)) as client:
+        llm = model(server, client)
+        answers = await asyncio.gather(*(llm.ainvoke("hi") for _ in range(6)))
+
+    assert [a.content for a in answers] == ["Hello"] * 6
+    assert server.peak == 2
+    assert tier.limiter.waited == 4
+    # the waiting requests went out on the connections of the finished ones
+    assert len(server.connections) == 2
+    # 4 requests queued for at least one request time, measured apart from it
+    assert metrics.llm_queue_wait.sum("mini") >= 4 * 0.04
+    assert metrics.llm_request_duration.count("mini") == 6
+
+@pytest.mark.anyio
+async def test_token_budget_is_settled_with_the_reported_usage(server, metrics, monkeypatch):
+    tier = use_tier(monkeypatch, tokens_per_minute=60_000)
+
+    async with httpx.AsyncClient() as client:
+        await model(server, client, max_tokens=1000).ainvoke("hi")
+
+    # taken: the prompt estimate + max_tokens, kept: the 100 tokens the server reported (plus the refill since)
+    assert 59_900 <= tier.tokens.level < 59_950
+
+def test_sync_calls_are_retried(server, metrics, monkeypatch):
+    use_tier(monkeypatch)
+    server.failures = [error(429, "rate_limit_error"), error(503, "server_error")]
+
+    with httpx.Client() as client:
+        answer = model(server, http_client=client).invoke("hi")
+
+    assert answer.content == "Hello"
+    assert server.requests == 3
+    assert metrics.llm_retries.value("mini", "RateLimitError") == 1
+    assert metrics.llm_queue_wait.count("mini") == 3
+
+def test_sync_calls_share_the_concurrency_cap(server, metrics, monkeypatch):
+    tier = use_tier(monkeypatch, max_concurrency=2)
+    server.delay = 0.05
+
+    with httpx.Client() as client:
+        llm = model(server, http_client=client)
+        threads = [threading.Thread(target=llm.invoke, args=("hi",)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert server.requests == 6
+    assert server.peak == 2
+    assert tier.limiter.waited == 4
@@ -0,0 +1,116 @@
+import asyncio
+import time
+import pytest
+import agents.llm_client as llm_client
+from agents.llm_client import LLMTier
+from agents.llm_limiter import LLMConcurrencyLimiter, TokenBucket
+from agents.scripted_llm import LimitedScriptedChatModel
+
+def use_limiter(monkeypatch, limit: int) -> LLMConcurrencyLimiter:
+    tier = LLMTier("mini", max_concurrency=limit)
+    monkeypatch.setitem(llm_client.llm_tiers, "mini", tier)
+    return tier.limiter
+
+def delayed_llm(answers: int) -> LimitedScriptedChatModel:
+    return LimitedScriptedChatModel(latency=0.02).load(["Hello"] * answers)
+
+@pytest.mark.anyio
+async def test_requests_over_the_limit_wait_for_a_slot(monkeypatch):
+    limiter = use_limiter(monkeypatch, 2)
+    llm = delayed_llm(6)
+
+    answers = await asyncio.gather(*(llm.ainvoke("hi") for _ in range(6)))
+
+    assert [a.content for a in answers] == ["Hello"] * 6
+    assert limiter.peak == 2
+    assert limiter.waited == 4
+    assert limiter.in_flight == 0
+
+@pytest.mark.anyio
+async def test_streamed_requests_hold_their_slot_until_the_end(monkeypatch):
+    limiter = use_limiter(monkeypatch, 1)
+    llm = delayed_llm(3)
+
+    async def stream() -> str:
+        return "".join([chunk.content async for chunk in llm.astream("hi")])
+
+    assert await asyncio.gather(stream(), stream(), stream()) == ["Hello"] * 3
+    assert limiter.peak == 1
+    assert limiter.waited == 2
+
+@pytest.mark.anyio
+async def test_zero_limit_does_not_cap(monkeypatch):
+    limiter = use_limiter(monkeypatch, 0)
+    llm = delayed_llm(5)
+
+    await asyncio.gather(*(llm.ainvoke("hi") for _ in range(5)))
+
+    assert limiter.waited == 0
+
+@pytest.mark.anyio
+async def test_new_limit_applies_to_later_requests(monkeypatch):
+    limiter = use_limiter(monkeypatch, 4)
+    llm = delayed_llm(8)
+    await asyncio.gather(*(llm.ainvoke("hi") for _ in range(4)))
+
+    limiter.limit, limiter.peak = 1, 0
+    await asyncio.gather(*(llm.ainvoke("hi") for _ in range(4)))
+
+    assert limiter.peak == 1
+
+@pytest.mark.anyio
+async def test_sync_and_async_requests_share_the_limit(monkeypatch):
+    limiter = use_limiter(monkeypatch, 2)
+    llm = delayed_llm(8)
+
+    answers = await asyncio.gather(
+        *(llm.ainvoke("hi") for _ in range(4)),
+        *(asyncio.to_thread(llm.invoke, "hi") for _ in range(4)),
+    )
+
+    assert [a.content for a in answers] == ["Hello"] * 8
+    assert limiter.peak == 2
+    assert limiter.waited == 6
+    assert limiter.in_flight == 0
+
+@pytest.mark.anyio
+async def test_a_cancelled_waiter_gives_its_slot_on(monkeypatch):
+    limiter = LLMConcurrencyLimiter(1)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with limiter.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    cancelled = asyncio.create_task(hold())
+    waiting = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    release.set()
+    await asyncio.gather(holder, waiting)
+
+    assert cancelled.cancelled()
+    assert limiter.in_flight == 0 and limiter.peak == 1
+
+@pytest.mark.anyio
+async def test_token_bucket_waits_for_the_refill():
+    bucket = TokenBucket(per_minute=6000) # 100 per second
+
+    start = time.monotonic()
+    await bucket.acquire(6000)
+    assert time.monotonic() - start < 0.05
+    await bucket.acquire(10)
+    assert time.monotonic() - start >= 0.09
+
+@pytest.mark.anyio
+async def test_token_bucket_debit_delays_the_next_caller():
+    bucket = TokenBucket(per_minute=6000)
+    await bucket.acquire(5990)
+
+    # the request used 10 tokens more than estimated: the next one waits for them too
+    bucket.debit(10)
+    start = time.monotonic()
+    await bucket.acquire(10)
+    assert time.monotonic() - start >= 0.09
@@ -0,0 +1,63 @@
+import json
+import pytest
+from pydantic import BaseModel
+from logging_config import configure_logging, flush_logs, llm_logger, logger, payload, qa_evaluator_logger
+
+class Classification(BaseModel):
+    is_new_patient: bool
+
+@pytest.fixture
+def lines():
+    lines = []
+    yield lines
+    configure_logging()
+
+def test_json_mode_writes_one_line_per_record(lines):
+    configure_logging(lines.append, log_format="json", enqueue=False)
+
+    llm_logger.info("classification: {}", lambda: payload(Classification(is_new_patient=True)))
+    logger.warning("slot taken")
+
+    records = [json.loads(line) for line in lines]
+    assert all(line.count("\n") == 1 for line in lines)
+    assert records[0]["category"] == "llm" and records[0]["message"] == 'classification: {"is_new_patient": true}'
+    assert records[0]["module"] == __name__
+    assert (records[1]["category"], records[1]["level"], records[1]["message"]) == ("app", "WARNING", "slot taken")
+
+def test_category_levels(lines):
+    configure_logging(lines.append, log_format="json", levels={"app": "INFO", "llm": "WARNING", "qa_evaluator": "DEBUG"}, enqueue=False)
+
+    llm_logger.info("dropped")
+    llm_logger.warning("kept llm")
+    qa_evaluator_logger.debug("kept qa")
+    logger.debug("dropped")
+    logger.info("kept app")
+
+    assert [json.loads(line)["message"] for line in lines] == ["kept llm", "kept qa", "kept app"]
+
+def test_payload_is_only_rendered_for_enabled_levels(lines):
+    configure_logging(lines.append, log_format="json", levels={"llm": "WARNING"}, enqueue=False)
+    rendered = []
+    def render():
+        rendered.append(True)
+        return "payload"
+
+    llm_logger.info("response: {}", render)
+    assert rendered == [] and lines == []
+
+    llm_logger.warning("response: {}", render)
+    assert rendered == [True] and json.loads(lines[0])["message"] == "response: payload"
+
+def test_enqueued_records_are_written_in_order(lines):
+    configure_logging(lines.append, log_format="json", enqueue=True)
+
+    for i in range(100):
+        llm_logger.info("response {}", i)
+    flush_logs()
+
+    # written in batches by the writer thread
+    assert [json.loads(line)["message"] for line in "".join(lines).splitlines()] == [f"response {i}" for i in range(100)]
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        configure_logging(log_format="xml")
@@ -0,0 +1,95 @@
+from typing import Annotated, TypedDict
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage
+from langchain_core.tools import tool
+from langgraph.graph import START, END
+from langgraph.graph.message import add_messages
+from langgraph.prebuilt import ToolNode
+import api.metrics_api as metrics_api
+import agents.hooks.metrics as metrics_module
+from agents.hooks.metrics import GraphMetrics, Histogram, MetricsCallbackHandler, TimedStateGraph
+
+class State(TypedDict):
+    messages: Annotated[list[AnyMessage], add_messages]
+
+@tool
+def check_appointment(day: str) -> str:
+    """Checks a day."""
+    return f"{day} is free"
+
+def build_graph(handler: MetricsCallbackHandler):
+    # the callback sits on the model and the tool node, as in agents/llms.py and create_tool_node_with_fallback
+    llm = GenericFakeChatModel(callbacks=[handler], messages=iter([
+        AIMessage(content="", tool_calls=[{"name": "check_appointment", "args": {"day": "Monday"}, "id": "call_1"}], usage_metadata={"input_tokens": 300, "output_tokens": 20, "total_tokens": 320}),
+        AIMessage(content="Monday is free.", usage_metadata={"input_tokens": 350, "output_tokens": 5, "total_tokens": 355}),
+    ]))
+
+    async def assistant(state: State):
+        return {"messages": [await llm.ainvoke(state["messages"])]}
+
+    builder = TimedStateGraph(State)
+    builder.add_node("assistant", assistant)
+    builder.add_node("tools", ToolNode([check_appointment]).with_config(callbacks=[handler]))
+    builder.add_edge(START, "assistant")
+    builder.add_conditional_edges("assistant", lambda s: "tools" if s["messages"][-1].tool_calls else END)
+    builder.add_edge("tools", "assistant")
+    return builder.compile()
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("turn_seconds", "Turn time.", (0.1, 1.0), ("node",))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, 'say "hi"')
+
+    assert histogram.render() == [
+        "# HELP turn_seconds Turn time.",
+        "# TYPE turn_seconds histogram",
+        'turn_seconds_bucket{node="say \\"hi\\"",le="0.1"} 1',
+        'turn_seconds_bucket{node="say \\"hi\\"",le="1"} 3',
+        'turn_seconds_bucket{node="say \\"hi\\"",le="+Inf"} 4',
+        'turn_seconds_sum{node="say \\"hi\\""} 4.05',
+        'turn_seconds_count{node="say \\"hi\\""} 4',
+    ]
+
+@pytest.mark.anyio
+async def test_records_nodes_llm_calls_tokens_and_tools(monkeypatch):
+    metrics = GraphMetrics()
+    monkeypatch.setattr(metrics_module, "graph_metrics", metrics)
+    handler = MetricsCallbackHandler(metrics)
+
+    await build_graph(handler).ainvoke({"messages": [HumanMessage(content="Is Monday free?")]})
+
+    assert metrics.node_duration.count("assistant") == 2
+    assert metrics.node_duration.count("tools") == 1
+    assert metrics.llm_calls.value("assistant", "ok") == 2
+    assert metrics.llm_duration.count("assistant") == 2
+    assert metrics.prompt_tokens.sum("assistant") == 650
+    assert metrics.completion_tokens.sum("assistant") == 25
+    assert metrics.tool_duration.count("tools", "check_appointment") == 1
+    # nothing left in flight
+    assert not (handler._llms or handler._tools)
+
+@pytest.mark.anyio
+async def test_disabled_metrics_record_nothing(monkeypatch):
+    metrics = GraphMetrics(enabled=False)
+    monkeypatch.setattr(metrics_module, "graph_metrics", metrics)
+
+    result = await build_graph(MetricsCallbackHandler(metrics)).ainvoke({"messages": [HumanMessage(content="Is Monday free?")]})
+
+    assert result["messages"][-1].content == "Monday is free."
+    assert metrics.render() == GraphMetrics().render()
+
+def test_metrics_route(monkeypatch):
+    metrics = GraphMetrics()
+    metrics.llm_calls.inc("assistant", "ok")
+    monkeypatch.setattr(metrics_api, "graph_metrics", metrics)
+    app = FastAPI()
+    app.include_router(metrics_api.metrics_router)
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'llm_calls_total{node="assistant",outcome="ok"} 1' in response.text.splitlines()
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import pytest
+from agents.models.appointment import Appointment
+from agents.models.user import User
+from agents.prefetch import IdentityPrefetch
+from agents.tool_cache import ToolResultCache
+from services.user_service import UserService
+
+# the graph modules build their (unused here) OpenAI client at import
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+import agents.appointment.tools.appointment_tools as appointment_tools
+
+JOHN = User(name="John Doe", date_of_birth="1960-01-01", ssn_last_4="1111")
+
+def config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+@pytest.fixture
+def appointments(make_appointment) -> list[Appointment]:
+    return [make_appointment("2030-01-01")]
+
+@pytest.fixture
+def cache(service) -> ToolResultCache:
+    return ToolResultCache(service)
+
+async def prefetched(prefetch: IdentityPrefetch, thread_id: str, user: User) -> User | None:
+    # what the identity collector and the verification node do, then wait for the background context load
+    prefetch.start(thread_id, user)
+    found = await prefetch.verified_user(thread_id, user)
+    await prefetch.context_loaded(thread_id)
+    return found
+
+@pytest.mark.anyio
+async def test_first_appointment_turn_reads_the_prefetched_context(service, cache, monkeypatch):
+    prefetch = IdentityPrefetch(UserService(), cache)
+
+    found = await prefetched(prefetch, "t1", JOHN)
+    monkeypatch.setattr(service, "get_appointments", lambda user_id: pytest.fail("went to the service"))
+    monkeypatch.setattr(service, "list_all_doctors_for_user", lambda user_id: pytest.fail("went to the service"))
+
+    assert found.id == "1"
+    assert [a.date for a in cache.call(config("t1"), "get_appointments", "1")] == ["2030-01-01"]
+    assert cache.call(config("t1"), "list_all_doctors_for_user", "1") == ["Dr. Lang Smith"]
+    assert cache.hits == 2
+
+@pytest.mark.anyio
+async def test_schedule_changes_invalidate_the_context(service, cache, make_appointment):
+    prefetch = IdentityPrefetch(UserService(), cache)
+    await prefetched(prefetch, "t1", JOHN)
+
+    service.add_appointment(make_appointment("2030-01-02", provider="Dr. Usually Free"))
+
+    assert [a.date for a in cache.call(config("t1"), "get_appointments", "1")] == ["2030-01-01", "2030-01-02"]
+    assert sorted(cache.call(config("t1"), "list_all_doctors_for_user", "1")) == ["Dr. Lang Smith", "Dr. Usually Free"]
+    assert cache.hits == 0 and cache.invalidations == 2
+
+@pytest.mark.anyio
+async def test_context_is_per_thread_and_per_user(service, cache):
+    prefetch = IdentityPrefetch(UserService(), cache)
+    await prefetched(prefetch, "t1", JOHN)
+
+    assert cache.call(config("t2"), "get_appointments", "1")[0].date == "2030-01-01"
+    assert cache.call(config("t1"), "get_appointments", "2") == []
+    assert cache.hits == 0 and cache.misses == 2
+
+def test_a_lookup_started_on_another_loop_is_not_awaited(cache):
+    # the prefetch is a module singleton, graph runs may come with a loop of their own (asyncio.run per call)
+    prefetch = IdentityPrefetch(UserService(), cache)
+    async def collector() -> None:
+        prefetch.start("t1", JOHN)
+    asyncio.run(collector())
+
+    assert asyncio.run(prefetched(prefetch, "t1", JOHN)).id == "1"
+    assert asyncio.run(prefetch.verified_user("t1", JOHN)).id == "1"
+
+@pytest.mark.anyio
+async def test_unknown_identity_is_looked_up_again(cache):
+    users = UserService(patients=[])
+    prefetch = IdentityPrefetch(users, cache)
+    assert await prefetched(prefetch, "t1", JOHN) is None
+
+    users.add_user(JOHN.model_copy(update={"id": "1"}))
+
+    assert (await prefetched(prefetch, "t1", JOHN)).id == "1"
+
+@pytest.mark.anyio
+async def test_list_appointments_tool_uses_the_thread_prefetch(cache, monkeypatch):
+    prefetch = IdentityPrefetch(UserService(), cache)
+    monkeypatch.setattr(appointment_tools, "tool_cache", cache)
+    user = await prefetched(prefetch, "t1", JOHN)
+
+    listed = appointment_tools.list_appointments.invoke({"user": user}, config=config("t1"))
+
+    assert [a["date"] for a in listed] == ["2030-01-01"]
+    assert cache.hits == 1
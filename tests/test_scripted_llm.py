@@ -0,0 +1,68 @@
+import asyncio
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+from pydantic import BaseModel
+import pytest
+from agents.scripted_llm import RecordingCallbackHandler, ScriptedChatModel, ScriptExhaustedError
+
+class Intent(BaseModel):
+    intent: str
+
+class Identity(BaseModel):
+    name: str
+
+@tool
+def check_appointment(date: str) -> str:
+    """Checks a date"""
+    return "free"
+
+def test_tool_calls_only_go_to_calls_with_the_tool_bound():
+    llm = ScriptedChatModel().load([ScriptedChatModel.tool_call("check_appointment", date="2030-01-01"), "Hello"])
+
+    # the plain call skips the tool call it could not make
+    assert llm.invoke("hi").content == "Hello"
+    answer = llm.bind_tools([check_appointment]).invoke("book")
+    assert answer.tool_calls[0]["name"] == "check_appointment"
+    assert answer.tool_calls[0]["args"] == {"date": "2030-01-01"}
+    assert llm.remaining == []
+    with pytest.raises(ScriptExhaustedError):
+        llm.invoke("more")
+
+@pytest.mark.anyio
+async def test_structured_output_matches_concurrent_calls_by_schema():
+    llm = ScriptedChatModel().load([Identity(name="John Doe"), Intent(intent="add_appointment")])
+
+    intent, identity = await asyncio.gather(
+        llm.with_structured_output(Intent).ainvoke("book"),
+        llm.with_structured_output(Identity).ainvoke("I'm John"),
+    )
+    assert intent == Intent(intent="add_appointment")
+    assert identity == Identity(name="John Doe")
+
+def test_stream_word_by_word():
+    llm = ScriptedChatModel().load(["Which day works for you?"])
+
+    chunks = [chunk.content for chunk in llm.stream("book")]
+    assert len(chunks) > 1
+    assert "".join(chunks) == "Which day works for you?"
+
+def test_replays_recording(tmp_path):
+    path = str(tmp_path / "recording.jsonl")
+    recorded = ScriptedChatModel(callbacks=[RecordingCallbackHandler(path)]).load([
+        AIMessage(content="Hello"),
+        ScriptedChatModel.tool_call("check_appointment", date="2030-01-01"),
+    ])
+    recorded.invoke([HumanMessage(content="hi")])
+    recorded.bind_tools([check_appointment]).invoke("book")
+
+    replay = ScriptedChatModel().load_recording(path)
+    assert replay.invoke("hi").content == "Hello"
+    assert replay.bind_tools([check_appointment]).invoke("book").tool_calls[0]["args"] == {"date": "2030-01-01"}
+
+def test_repeat_keeps_the_script():
+    llm = ScriptedChatModel(repeat=True).load(["Hello", Identity(name="John")])
+
+    for _ in range(3):
+        assert llm.invoke("hi").content == "Hello"
+        assert llm.with_structured_output(Identity).invoke("who?") == Identity(name="John")
+    assert len(llm.remaining) == 2
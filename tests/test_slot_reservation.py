@@ -0,0 +1,110 @@
+import sys
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from agents.models.appointment import Appointment
+from services.appointment_store import InMemoryAppointmentStore
+from services.appointment_service import AppointmentService, AppointmentConflictError
+from services.slot_reservations import SlotReservations
+
+PARALLEL_COMMITS = 400
+SLOTS = [("Dr. Lang Smith", "2030-01-01", f"{h:02d}:00") for h in range(9, 17)]
+
+def run_in_parallel(fn, n: int) -> list:
+    """
+    Runs fn(i) in n threads that all start at the same moment.
+    """
+    barrier = threading.Barrier(n)
+    def task(i):
+        barrier.wait()
+        try:
+            return fn(i)
+        except AppointmentConflictError:
+            return None
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        return list(pool.map(task, range(n)))
+
+def test_no_double_booking_under_parallel_commits(service):
+    def commit(i):
+        provider, date, time = SLOTS[i % len(SLOTS)]
+        return service.add_appointment(Appointment(user_id=str(i), provider=provider, date=date, time=time), holder=str(i))
+
+    booked = [a for a in run_in_parallel(commit, PARALLEL_COMMITS) if a is not None]
+
+    assert len(booked) == len(SLOTS)
+    assert len({(a.provider, a.date, a.time) for a in booked}) == len(SLOTS)
+    assert len({a.id for a in booked}) == len(SLOTS)
+    assert len(service.list_all_appointments()) == len(SLOTS)
+
+def test_reservation_is_granted_once_and_converted_on_commit(service):
+    provider, date, time = SLOTS[0]
+    def reserve(i):
+        return service.reserve_slot(Appointment(provider=provider, date=date, time=time), holder=str(i))
+
+    holds = [r for r in run_in_parallel(reserve, PARALLEL_COMMITS) if r is not None]
+    assert len(holds) == 1
+    winner = holds[0].holder
+
+    # everyone else is turned away at commit time, the holder converts the reservation
+    loser = "0" if winner != "0" else "1"
+    with pytest.raises(AppointmentConflictError):
+        service.add_appointment(Appointment(user_id=loser, provider=provider, date=date, time=time), holder=loser)
+    booked = service.add_appointment(Appointment(user_id=winner, provider=provider, date=date, time=time), holder=winner)
+    assert booked.user_id == winner
+    with pytest.raises(AppointmentConflictError):
+        service.reserve_slot(Appointment(provider=provider, date=date, time=time), holder=winner)
+
+def test_reservation_expires_and_is_replaced_by_newer_hold():
+    now = [0.0]
+    service = AppointmentService(InMemoryAppointmentStore(), SlotReservations(ttl_seconds=60, clock=lambda: now[0]))
+    first = Appointment(provider="Dr. Lang Smith", date="2030-01-01", time="09:00")
+    second = Appointment(provider="Dr. Lang Smith", date="2030-01-01", time="10:00")
+
+    service.reserve_slot(first, holder="1")
+    with pytest.raises(AppointmentConflictError):
+        service.check_conflict(first, holder="2")
+    service.check_conflict(first, holder="1")
+
+    # the hold runs out
+    now[0] = 61
+    service.reserve_slot(first, holder="2")
+
+    # reserving another slot releases the previous one
+    service.reserve_slot(second, holder="2")
+    service.reserve_slot(first, holder="1")
+
+def test_release_does_not_drop_a_hold_placed_meanwhile_on_another_stripe():
+    # every holder moves to a slot on another stripe while their previous hold is released
+    reservations = SlotReservations(stripes=2)
+    holders = PARALLEL_COMMITS // 2
+    moves = []
+    for k in range(holders):
+        old = ("Dr. Lang Smith", f"2030-01-{k % 28 + 1:02d}", f"{k}:00")
+        new = next(slot for slot in (("Dr. Jim Beam", old[1], f"{k}:{m:02d}") for m in range(60))
+                   if reservations.lock(slot) is not reservations.lock(old))
+        moves.append((str(k), old, new))
+    for holder, old, _ in moves:
+        with reservations.lock(old):
+            reservations.hold(old, holder)
+
+    def move(i):
+        holder, old, new = moves[i // 2]
+        if i % 2:
+            with reservations.lock(new):
+                reservations.hold(new, holder)
+        else:
+            with reservations.lock(old):
+                reservations.release(old, holder)
+    # switch threads as often as possible, so the releases and the holds interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        run_in_parallel(move, 2 * holders)
+    finally:
+        sys.setswitchinterval(interval)
+
+    for holder, old, new in moves:
+        with reservations.lock(new):
+            assert reservations.is_held_by_other(new, "someone else")
+        with reservations.lock(old):
+            assert not reservations.is_held_by_other(old, "someone else")
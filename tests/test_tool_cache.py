@@ -0,0 +1,187 @@
+import os
+import threading
+import pytest
+import agents.tool_cache as tool_cache_module
+from agents.hooks.metrics import GraphMetrics
+from agents.models.appointment import Appointment
+from agents.models.user import User
+from agents.tool_cache import ToolResultCache
+from services.appointment_service import AppointmentService
+
+# the graph modules build their (unused here) OpenAI client at import
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+import agents.appointment.tools.appointment_tools as appointment_tools
+
+def config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+@pytest.fixture
+def appointments(make_appointment) -> list[Appointment]:
+    return [make_appointment("2030-01-01"), make_appointment("2030-01-02")]
+
+@pytest.fixture
+def metrics(monkeypatch) -> GraphMetrics:
+    metrics = GraphMetrics()
+    monkeypatch.setattr(tool_cache_module, "graph_metrics", metrics)
+    return metrics
+
+def counted(service: AppointmentService, monkeypatch, operation: str) -> list[tuple]:
+    calls = []
+    original = getattr(service, operation)
+    def call(*args):
+        calls.append(args)
+        return original(*args)
+    monkeypatch.setattr(service, operation, call)
+    return calls
+
+def test_repeated_reads_in_a_thread_go_to_the_service_once(service, metrics, monkeypatch):
+    cache = ToolResultCache(service)
+    calls = counted(service, monkeypatch, "list_all_doctors_for_user")
+
+    for _ in range(3):
+        assert cache.call(config("t1"), "list_all_doctors_for_user", "1") == ["Dr. Lang Smith"]
+
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.hit_ratio == pytest.approx(2 / 3)
+    assert metrics.tool_cache_lookups.value("list_all_doctors_for_user", "hit") == 2
+    assert metrics.tool_cache_lookups.value("list_all_doctors_for_user", "miss") == 1
+
+def test_results_are_per_thread_and_per_arguments(service, monkeypatch, make_appointment):
+    cache = ToolResultCache(service)
+    calls = counted(service, monkeypatch, "find_appointments_for_user")
+
+    cache.call(config("t1"), "find_appointments_for_user", make_appointment("2030-01-01"))
+    cache.call(config("t1"), "find_appointments_for_user", make_appointment("2030-01-02"))
+    cache.call(config("t2"), "find_appointments_for_user", make_appointment("2030-01-01"))
+    cache.call(config("t1"), "find_appointments_for_user", make_appointment("2030-01-01"))
+
+    assert [args[0].date for args in calls] == ["2030-01-01", "2030-01-02", "2030-01-01"]
+    assert cache.hits == 1
+
+@pytest.mark.parametrize("write", [
+    lambda service, make_appointment: service.add_appointment(make_appointment("2030-01-03")),
+    lambda service, make_appointment: service.cancel_appointment_by_id(service.get_appointments("1")[0].id),
+    lambda service, make_appointment: service.reschedule_appointment(service.get_appointments("1")[0].id, "2030-01-05", "11:00"),
+], ids=["add", "cancel", "reschedule"])
+def test_writes_invalidate_the_results(service, write, make_appointment):
+    cache = ToolResultCache(service)
+    slots = lambda appointments: [(a.date, a.time) for a in appointments]
+    before = slots(cache.call(config("t1"), "get_appointments", "1"))
+
+    write(service, make_appointment)
+    after = slots(cache.call(config("t1"), "get_appointments", "1"))
+
+    assert after != before
+    assert after == slots(service.get_appointments("1"))
+    assert cache.hits == 0 and cache.invalidations == 1
+
+def test_hits_do_not_ask_the_store(service, monkeypatch):
+    now = [0.0]
+    cache = ToolResultCache(service, generation_ttl=1.0, clock=lambda: now[0])
+    reads = counted(service.store, monkeypatch, "generation")
+
+    for _ in range(5):
+        cache.call(config("t1"), "get_appointments", "1")
+    assert len(reads) == 1
+
+    now[0] = 1.5
+    cache.call(config("t1"), "get_appointments", "1")
+    assert len(reads) == 2
+    assert cache.hits == 5
+
+def test_writes_by_other_processes_are_seen_within_the_ttl(service, make_appointment):
+    now = [0.0]
+    cache = ToolResultCache(service, generation_ttl=1.0, clock=lambda: now[0])
+    cache.call(config("t1"), "get_appointments", "1")
+
+    # another worker on the same store: the service here does not see the write
+    service.store.add(make_appointment("2030-01-03"))
+    assert len(cache.call(config("t1"), "get_appointments", "1")) == 2
+
+    now[0] = 1.5
+    assert len(cache.call(config("t1"), "get_appointments", "1")) == 3
+    assert cache.invalidations == 1
+
+def test_other_patients_bookings_keep_the_results(service, make_appointment):
+    cache = ToolResultCache(service)
+    cache.call(config("t1"), "get_appointments", "1")
+    cache.call(config("t1"), "list_all_doctors_for_user", "1")
+
+    service.add_appointment(make_appointment("2030-01-03", user_id="2"))
+
+    cache.call(config("t1"), "get_appointments", "1")
+    cache.call(config("t1"), "list_all_doctors_for_user", "1")
+    assert cache.hits == 2 and cache.invalidations == 0
+
+def test_hit_ratio_under_concurrent_bookings(service, make_appointment):
+    # patient 1 keeps asking while patients 2.. book, cancel and reschedule
+    cache = ToolResultCache(service, generation_ttl=0.0)
+    stop = threading.Event()
+
+    def book(user_id: str) -> None:
+        day = 0
+        while not stop.is_set():
+            day += 1
+            booked = service.add_appointment(make_appointment(f"2031-{day // 28 % 12 + 1:02d}-{day % 28 + 1:02d}", f"{int(user_id):02d}:00", user_id=user_id))
+            service.reschedule_appointment(booked.id, "2032-01-01", f"{int(user_id):02d}:30")
+            service.cancel_appointment_by_id(booked.id)
+
+    bookers = [threading.Thread(target=book, args=(str(user_id),)) for user_id in (2, 3)]
+    for booker in bookers:
+        booker.start()
+    try:
+        for _ in range(500):
+            cache.call(config("t1"), "get_appointments", "1")
+            cache.call(config("t1"), "list_all_doctors_for_user", "1")
+    finally:
+        stop.set()
+        for booker in bookers:
+            booker.join()
+
+    # a check racing a write may cost a spurious invalidation now and then, no more
+    assert service.changes.writes > 0
+    assert cache.hit_ratio > 0.9
+
+def test_results_are_copies(service):
+    cache = ToolResultCache(service)
+    cache.call(config("t1"), "list_open_doctors").append("Dr. Nobody")
+
+    assert "Dr. Nobody" not in cache.call(config("t1"), "list_open_doctors")
+
+def test_uncached_without_a_thread_or_when_disabled(service, monkeypatch):
+    calls = counted(service, monkeypatch, "get_appointments")
+
+    ToolResultCache(service).call(None, "get_appointments", "1")
+    ToolResultCache(service).call(None, "get_appointments", "1")
+    disabled = ToolResultCache(service, max_threads=0)
+    disabled.call(config("t1"), "get_appointments", "1")
+    disabled.call(config("t1"), "get_appointments", "1")
+
+    assert len(calls) == 4
+
+def test_least_recently_used_threads_are_evicted(service):
+    cache = ToolResultCache(service, max_threads=2)
+    for thread_id in ("t1", "t2", "t1", "t3"):
+        cache.call(config(thread_id), "list_open_doctors")
+
+    assert len(cache) == 2
+    cache.call(config("t1"), "list_open_doctors")
+    cache.call(config("t2"), "list_open_doctors")
+    assert (cache.hits, cache.misses) == (2, 4)
+
+def test_only_read_operations_are_cached(service):
+    with pytest.raises(ValueError):
+        ToolResultCache(service).call(config("t1"), "cancel_appointment_by_id", "1")
+
+def test_find_appointment_tool_reuses_the_search(service, monkeypatch):
+    cache = ToolResultCache(service)
+    monkeypatch.setattr(appointment_tools, "tool_cache", cache)
+    user = User(id="1", name="John Doe")
+    search = {"user": user, "appointment": {"date": "2030-01-02"}}
+
+    first = appointment_tools.find_appointment_tool.invoke(search, config=config("t1"))
+    second = appointment_tools.find_appointment_tool.invoke(search, config=config("t1"))
+
+    assert first == second and first["appointment"]["date"] == "2030-01-02"
+    assert cache.hits == 1
@@ -0,0 +1,27 @@
+from agents.models.user import User
+from services.user_service import UserService
+
+def test_get_user_normalizes_input_and_stored_records():
+    service = UserService([
+        User(id="1", name=" John Doe ", phone="(111) 111-1111", date_of_birth="1960-01-01", ssn_last_4="1111"),
+        User(id="2", name="Jim Beam", phone="222-222-2222", date_of_birth="1970-01-01", ssn_last_4="5678"),
+    ])
+
+    assert service.get_user("john doe", "1960-01-01", phone="111.111.1111").id == "1"
+    assert service.get_user("JOHN DOE", " 1960-01-01 ", ssn_last_4="1-111").id == "1"
+    assert service.get_user("Jim Beam", "1970-01-01", phone="000", ssn_last_4="5678").id == "2"
+    assert service.get_user("Jim Beam", "1970-01-01", phone="222-222-2222", ssn_last_4="0000").id == "2"
+
+    assert service.get_user("Jim Beam", "1970-01-02", phone="222-222-2222") is None
+    assert service.get_user("Jim Beam", "1970-01-01") is None
+    assert service.get_user(None, "1970-01-01", phone="222-222-2222") is None
+
+def test_get_user_prefers_the_first_stored_match():
+    service = UserService([
+        User(id="1", name="Sam Lee", phone="555-0001", date_of_birth="1980-01-01", ssn_last_4="1234"),
+        User(id="2", name="Sam Lee", phone="555-0002", date_of_birth="1980-01-01", ssn_last_4="9999"),
+    ])
+    service.add_user(User(id="3", name="Sam Lee", phone="555-0003", date_of_birth="1980-01-01", ssn_last_4="9999"))
+
+    assert service.get_user("Sam Lee", "1980-01-01", phone="555-0001", ssn_last_4="9999").id == "1"
+    assert service.get_user("Sam Lee", "1980-01-01", phone="555-0003").id == "3"